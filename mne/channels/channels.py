@@ -1210,8 +1210,10 @@ def read_ch_adjacency(fname, picks=None):
     don't know the correct file for the neighbor definitions,
     :func:`find_ch_adjacency` can compute the adjacency matrix from 2d
     sensor locations.
+
+    Parsed files are cached in memory until they are modified.
     """
-    from scipy.io import loadmat
+    from ..stats._adjacency import _get_cached_adjacency
     if not op.isabs(fname):
         templates_dir = op.realpath(op.join(op.dirname(__file__),
                                             'data', 'neighbors'))
@@ -1228,19 +1230,29 @@ def read_ch_adjacency(fname, picks=None):
 
         fname = op.join(templates_dir, fname)
 
-    nb = loadmat(fname)['neighbours']
-    ch_names = _recursive_flatten(nb['label'], str)
+    # the parsed file is cached as long as it is not modified
+    stat = os.stat(fname)
+    adjacency, ch_names = _get_cached_adjacency(
+        'neighbors', (op.realpath(fname), stat.st_size, stat.st_mtime_ns),
+        partial(_read_ch_adjacency, fname), disk=False)
     picks = _picks_to_idx(len(ch_names), picks)
-    neighbors = [_recursive_flatten(c, str) for c in
-                 nb['neighblabel'].flatten()]
-    assert len(ch_names) == len(neighbors)
-    adjacency = _ch_neighbor_adjacency(ch_names, neighbors)
     # picking before constructing matrix is buggy
     adjacency = adjacency[picks][:, picks]
     ch_names = [ch_names[p] for p in picks]
     return adjacency, ch_names
 
 
+def _read_ch_adjacency(fname):
+    """Read the full adjacency matrix from a FieldTrip neighbors file."""
+    from scipy.io import loadmat
+    nb = loadmat(fname)['neighbours']
+    ch_names = _recursive_flatten(nb['label'], str)
+    neighbors = [_recursive_flatten(c, str) for c in
+                 nb['neighblabel'].flatten()]
+    assert len(ch_names) == len(neighbors)
+    return _ch_neighbor_adjacency(ch_names, neighbors), ch_names
+
+
 def _ch_neighbor_adjacency(ch_names, neighbors):
     """Compute sensor adjacency matrix.
 
@@ -1315,7 +1327,12 @@ def find_ch_adjacency(info, ch_type):
     is always computed for EEG data and never loaded from a template file. If
     you want to load a template for a given montage use
     :func:`read_ch_adjacency` directly.
+
+    Computed adjacency matrices are cached in memory (and on disk if the
+    ``MNE_CACHE_ADJACENCY`` config variable is ``'true'``), keyed by the
+    channel definitions and digitization points of ``info``.
     """
+    from ..stats._adjacency import _get_cached_adjacency
     if ch_type is None:
         picks = channel_indices_by_type(info)
         if sum([len(p) != 0 for p in picks.values()]) != 1:
@@ -1364,7 +1381,9 @@ def find_ch_adjacency(info, ch_type):
         return read_ch_adjacency(conn_name)
     logger.info('Could not find a adjacency matrix for the data. '
                 'Computing adjacency based on Delaunay triangulations.')
-    return _compute_ch_adjacency(info, ch_type)
+    return _get_cached_adjacency(
+        'delaunay', (ch_type, info['chs'], info['dig']),
+        partial(_compute_ch_adjacency, info, ch_type))
 
 
 def _compute_ch_adjacency(info, ch_type):
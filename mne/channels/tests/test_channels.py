@@ -306,6 +306,58 @@ def test_find_ch_adjacency():
     assert ch_names[0] == 'MEG 001'
 
 
+def test_ch_adjacency_cache(tmpdir, monkeypatch):
+    """Test caching of channel adjacency matrices."""
+    from mne.stats import _adjacency
+    from mne.channels import make_standard_montage
+    _adjacency._adjacency_cache.clear()
+    montage = make_standard_montage('standard_1020')
+    info = create_info(montage.ch_names[:60], 100., 'eeg')
+    info.set_montage(montage)
+    conn, ch_names = find_ch_adjacency(info, 'eeg')
+    assert len(_adjacency._adjacency_cache) == 1
+    conn.data[:] = False  # returned matrices are copies
+    conn_2, ch_names_2 = find_ch_adjacency(info, 'eeg')
+    assert len(_adjacency._adjacency_cache) == 1
+    assert ch_names_2 == ch_names
+    assert_array_equal(conn_2.toarray(),
+                       _compute_ch_adjacency(info, 'eeg')[0].toarray())
+    # other sensor positions are another entry
+    info['chs'][0]['loc'][:3] += 0.01
+    find_ch_adjacency(info, 'eeg')
+    assert len(_adjacency._adjacency_cache) == 2
+
+    # templates are parsed once
+    conn, ch_names = read_ch_adjacency('neuromag306mag')
+    assert len(_adjacency._adjacency_cache) == 3
+    conn_2, ch_names_2 = read_ch_adjacency('neuromag306mag', picks=[0, 2])
+    assert len(_adjacency._adjacency_cache) == 3
+    assert ch_names_2 == [ch_names[0], ch_names[2]]
+    assert_array_equal(conn_2.toarray(), conn[[0, 2]][:, [0, 2]].toarray())
+
+    # disk cache
+    monkeypatch.setenv('MNE_CACHE_ADJACENCY', 'true')
+    monkeypatch.setattr(_adjacency, '_get_extra_data_path',
+                        lambda: str(tmpdir))
+    _adjacency._adjacency_cache.clear()
+    conn, ch_names = find_ch_adjacency(info, 'eeg')
+    assert len(tmpdir.join('tables').listdir()) == 1
+    _adjacency._adjacency_cache.clear()
+    conn_2, ch_names_2 = find_ch_adjacency(info, 'eeg')
+    assert ch_names_2 == ch_names
+    assert_array_equal(conn_2.toarray(), conn.toarray())
+    read_ch_adjacency('neuromag306mag')  # not stored on disk
+    assert len(tmpdir.join('tables').listdir()) == 1
+    _adjacency._adjacency_cache.clear()
+
+    # entries larger than the cache are computed but not stored
+    monkeypatch.setattr(_adjacency._adjacency_cache, 'max_bytes', 100)
+    conn_3, ch_names_3 = find_ch_adjacency(info, 'eeg')
+    assert len(_adjacency._adjacency_cache) == 0
+    assert ch_names_3 == ch_names
+    assert_array_equal(conn_3.toarray(), conn.toarray())
+
+
 def test_drop_channels():
     """Test if dropping channels works with various arguments."""
     raw = read_raw_fif(raw_fname, preload=True).crop(0, 0.1)
@@ -7,13 +7,15 @@
 import numpy as np
 
 from ..filter import next_fast_len
+from ..parallel import parallel_func
 from ..source_estimate import _BaseSourceEstimate
-from ..utils import verbose, _check_combine, _check_option
+from ..utils import verbose, _check_combine, _check_option, logger
+from ..utils.numerics import _MeanAccumulator
 
 
 @verbose
 def envelope_correlation(data, combine='mean', orthogonalize="pairwise",
-                         verbose=None):
+                         n_jobs=1, verbose=None):
     """Compute the envelope correlation.
 
     Parameters
@@ -40,6 +42,10 @@ def envelope_correlation(data, combine='mean', orthogonalize="pairwise",
         absolute values.
 
         .. versionadded:: 0.19
+    %(n_jobs)s
+        The epochs are processed in parallel.
+
+        .. versionadded:: 0.21
     %(verbose)s
 
     Returns
@@ -54,6 +60,14 @@ def envelope_correlation(data, combine='mean', orthogonalize="pairwise",
     This function computes the power envelope correlation between
     orthogonalized signals [1]_ [2]_.
 
+    The orthogonalized envelopes of all pairs of signals are not formed
+    explicitly: their sums, squared sums and correlations with the envelopes
+    are obtained from a few matrix products over the analytic signals. Pairs
+    for which this would be numerically inaccurate (e.g., phase-locked
+    signals) are computed directly. With ``combine='mean'`` the correlation
+    matrices are summed as epochs are processed, so only one of them is
+    kept in memory.
+
     References
     ----------
     .. [1] Hipp JF, Hawellek DJ, Corbetta M, Siegel M, Engel AK (2012)
@@ -64,67 +78,131 @@ def envelope_correlation(data, combine='mean', orthogonalize="pairwise",
            Neuroimage 174:57–68
     """
     _check_option('orthogonalize', orthogonalize, (False, 'pairwise'))
-    from scipy.signal import hilbert
     n_nodes = None
     if combine is not None:
         fun = _check_combine(combine, valid=('mean',))
     else:  # None
         fun = np.array
+    if isinstance(combine, str):  # 'mean'
+        corrs = _MeanAccumulator()
+    else:
+        corrs = list()
+    parallel, my_corr, n_jobs = parallel_func(_epoch_envelope_correlation,
+                                              n_jobs)
 
-    corrs = list()
-    # Note: This is embarassingly parallel, but the overhead of sending
-    # the data to different workers is roughly the same as the gain of
-    # using multiple CPUs. And we require too much GIL for prefer='threading'
-    # to help.
+    epoch_block, n_epochs = list(), 0
     for ei, epoch_data in enumerate(data):
         if isinstance(epoch_data, _BaseSourceEstimate):
             epoch_data = epoch_data.data
         if epoch_data.ndim != 2:
             raise ValueError('Each entry in data must be 2D, got shape %s'
                              % (epoch_data.shape,))
-        n_nodes, n_times = epoch_data.shape
-        if ei > 0 and n_nodes != corrs[0].shape[0]:
+        if ei == 0:
+            n_nodes = epoch_data.shape[0]
+        elif epoch_data.shape[0] != n_nodes:
             raise ValueError('n_nodes mismatch between data[0] and data[%d], '
                              'got %s and %s'
-                             % (ei, n_nodes, corrs[0].shape[0]))
+                             % (ei, epoch_data.shape[0], n_nodes))
         # Get the complex envelope (allowing complex inputs allows people
         # to do raw.apply_hilbert if they want)
-        if epoch_data.dtype in (np.float32, np.float64):
-            n_fft = next_fast_len(n_times)
-            epoch_data = hilbert(epoch_data, N=n_fft, axis=-1)[..., :n_times]
-
-        if epoch_data.dtype not in (np.complex64, np.complex128):
+        if epoch_data.dtype not in (np.float32, np.float64,
+                                    np.complex64, np.complex128):
             raise ValueError('data.dtype must be float or complex, got %s'
                              % (epoch_data.dtype,))
-        data_mag = np.abs(epoch_data)
-        data_conj_scaled = epoch_data.conj()
-        data_conj_scaled /= data_mag
-        # subtract means
-        data_mag_nomean = data_mag - np.mean(data_mag, axis=-1, keepdims=True)
-        # compute variances using linalg.norm (square, sum, sqrt) since mean=0
-        data_mag_std = np.linalg.norm(data_mag_nomean, axis=-1)
-        data_mag_std[data_mag_std == 0] = 1
-        corr = np.empty((n_nodes, n_nodes))
-        for li, label_data in enumerate(epoch_data):
-            if orthogonalize is False:  # the new code
-                label_data_orth = data_mag
-                label_data_orth_std = data_mag_std
-            else:
-                label_data_orth = (label_data * data_conj_scaled).imag
-                label_data_orth -= np.mean(label_data_orth, axis=-1,
-                                           keepdims=True)
-                label_data_orth_std = np.linalg.norm(label_data_orth, axis=-1)
-                label_data_orth_std[label_data_orth_std == 0] = 1
-            # correlation is dot product divided by variances
-            corr[li] = np.dot(label_data_orth, data_mag_nomean[li])
-            corr[li] /= data_mag_std[li]
-            corr[li] /= label_data_orth_std
-        if orthogonalize is not False:
-            # Make it symmetric (it isn't at this point)
-            corr = np.abs(corr)
-            corr = (corr.T + corr) / 2.
-        corrs.append(corr)
-        del corr
-
-    corr = fun(corrs)
+        epoch_block.append(epoch_data)
+        if len(epoch_block) == n_jobs:
+            _accumulate_corrs(corrs, epoch_block, parallel, my_corr,
+                              orthogonalize)
+            n_epochs += len(epoch_block)
+            epoch_block = list()
+    if len(epoch_block) > 0:
+        _accumulate_corrs(corrs, epoch_block, parallel, my_corr,
+                          orthogonalize)
+        n_epochs += len(epoch_block)
+    logger.info('Computed envelope correlations for %d epochs' % n_epochs)
+
+    if isinstance(corrs, _MeanAccumulator):
+        corr = corrs.finalize()
+    else:
+        corr = fun(corrs)
+    return corr
+
+
+def _accumulate_corrs(corrs, epoch_block, parallel, my_corr, orthogonalize):
+    """Compute and store the correlations of a block of epochs."""
+    out = parallel(my_corr(epoch_data, orthogonalize)
+                   for epoch_data in epoch_block)
+    if isinstance(corrs, _MeanAccumulator):
+        corrs.update(np.array(out))
+    else:
+        corrs.extend(out)
+
+
+def _epoch_envelope_correlation(epoch_data, orthogonalize):
+    """Compute the envelope correlation of a single epoch."""
+    from scipy.signal import hilbert
+    n_nodes, n_times = epoch_data.shape
+    if epoch_data.dtype in (np.float32, np.float64):
+        n_fft = next_fast_len(n_times)
+        epoch_data = hilbert(epoch_data, N=n_fft, axis=-1)[..., :n_times]
+    data_mag = np.abs(epoch_data)
+    data_conj_scaled = epoch_data.conj()
+    data_conj_scaled /= data_mag
+    # subtract means
+    data_mag_nomean = data_mag - np.mean(data_mag, axis=-1, keepdims=True)
+    # compute variances using linalg.norm (square, sum, sqrt) since mean=0
+    data_mag_std = np.linalg.norm(data_mag_nomean, axis=-1)
+    data_mag_std[data_mag_std == 0] = 1
+    if orthogonalize is False:
+        # correlation is dot product divided by variances
+        corr = np.dot(data_mag_nomean, data_mag_nomean.T)
+        corr /= data_mag_std[:, np.newaxis]
+        corr /= data_mag_std
+        return corr
+
+    # With x_l = r_l * exp(i * phi_l) and u_k = exp(-i * phi_k), the envelope
+    # of x_l orthogonalized with respect to x_k is Im(x_l * u_k), i.e.,
+    # r_l * sin(phi_l - phi_k), whose square is r_l ** 2 * (1 - Re(x_l ** 2 *
+    # u_k ** 2) / r_l ** 2) / 2. Summing over time gives matrix products.
+    orth_sum = _imag_dot(epoch_data, data_conj_scaled)
+    orth_dot = _imag_dot(epoch_data * data_mag_nomean, data_conj_scaled)
+    mag_sq_sum = np.sum(data_mag * data_mag, axis=-1)
+    orth_var = _real_dot(epoch_data * epoch_data,
+                         data_conj_scaled * data_conj_scaled)
+    orth_var *= -1
+    orth_var += mag_sq_sum[:, np.newaxis]
+    orth_var /= 2.
+    orth_var -= orth_sum * orth_sum / n_times
+    # the subtraction loses precision when the orthogonalized envelope
+    # barely varies (at least on the diagonal), so compute these directly
+    exact = np.where(orth_var < 1e-6 * mag_sq_sum[:, np.newaxis])
+    n_block = max(2 ** 24 // (16 * n_times), 1)
+    for start in range(0, len(exact[0]), n_block):
+        li, ki = (idx[start:start + n_block] for idx in exact)
+        label_data_orth = (epoch_data[li] * data_conj_scaled[ki]).imag
+        label_data_orth -= np.mean(label_data_orth, axis=-1, keepdims=True)
+        orth_var[li, ki] = np.sum(label_data_orth * label_data_orth, axis=-1)
+        orth_dot[li, ki] = np.sum(label_data_orth * data_mag_nomean[li],
+                                  axis=-1)
+    label_data_orth_std = np.sqrt(orth_var, out=orth_var)
+    label_data_orth_std[label_data_orth_std == 0] = 1
+    # correlation is dot product divided by variances
+    corr = orth_dot
+    corr /= data_mag_std[:, np.newaxis]
+    corr /= label_data_orth_std
+    # Make it symmetric (it isn't at this point)
+    corr = np.abs(corr)
+    corr = (corr.T + corr) / 2.
     return corr
+
+
+def _imag_dot(x, y):
+    """Compute np.dot(x, y.T).imag for complex x and y, using real products."""
+    return np.dot(np.concatenate([x.real, x.imag], axis=-1),
+                  np.concatenate([y.imag, y.real], axis=-1).T)
+
+
+def _real_dot(x, y):
+    """Compute np.dot(x, y.T).real for complex x and y, using real products."""
+    return np.dot(np.concatenate([x.real, x.imag], axis=-1),
+                  np.concatenate([y.real, -y.imag], axis=-1).T)
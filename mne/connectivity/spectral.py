@@ -14,8 +14,10 @@ from ..fixes import _get_args, rfftfreq
 from ..parallel import parallel_func
 from ..source_estimate import _BaseSourceEstimate
 from ..epochs import BaseEpochs
+from ..time_frequency.csd import (CrossSpectralDensity, _csd_from_spectra,
+                                  _csd_pairs_from_spectra,
+                                  _normalize_mt_spectra)
 from ..time_frequency.multitaper import (_mt_spectra, _compute_mt_params,
-                                         _psd_from_mt, _csd_from_mt,
                                          _psd_from_mt_adaptive)
 from ..time_frequency.tfr import morlet, cwt
 from ..utils import logger, verbose, _time_mask, warn
@@ -330,7 +332,8 @@ def _epoch_spectral_connectivity(data, sig_idx, tmin_idx, tmax_idx, sfreq,
                                  freq_mask, mt_adaptive, idx_map, block_size,
                                  psd, accumulate_psd, con_method_types,
                                  con_methods, n_signals, n_times,
-                                 accumulate_inplace=True):
+                                 accumulate_inplace=True, csd=None,
+                                 accumulate_csd=False, tril=False):
     """Estimate connectivity for one epoch (see spectral_connectivity)."""
     n_cons = len(idx_map[0])
 
@@ -383,8 +386,10 @@ def _epoch_spectral_connectivity(data, sig_idx, tmin_idx, tmax_idx, sfreq,
                     # hack to so we can sum over axis=-2
                     weights = np.array([1.])[:, None, None]
 
-                if accumulate_psd:
-                    _this_psd = _psd_from_mt(this_x_t, weights)
+            # weight the spectra so that cross-spectra are sums over tapers
+            this_x_t = _normalize_mt_spectra(this_x_t, weights)
+            if accumulate_psd and not mt_adaptive:
+                _this_psd = (this_x_t * this_x_t.conj()).real.sum(axis=-2)
         else:  # mode == 'cwt_morlet'
             if isinstance(this_data, _BaseSourceEstimate):
                 cwt_partial = partial(cwt, Ws=wavelets, use_fft=True,
@@ -414,38 +419,69 @@ def _epoch_spectral_connectivity(data, sig_idx, tmin_idx, tmax_idx, sfreq,
     else:
         psd = None
 
+    # accumulate or return the cross-spectral density between all signals
+    if accumulate_csd:
+        if mode == 'cwt_morlet':
+            this_csd = _csd_from_spectra(x_t.transpose(1, 0, 2))
+            this_csd /= n_times
+        else:
+            this_csd = _csd_from_spectra(x_t.transpose(2, 0, 1))
+        if accumulate_inplace:
+            csd += this_csd
+        else:
+            csd = this_csd
+    else:
+        csd = None
+
     # tell the methods that a new epoch starts
     for method in con_methods:
         method.start_epoch()
 
     # accumulate connectivity scores
-    if mode in ['multitaper', 'fourier']:
-        for i in range(0, n_cons, block_size):
-            con_idx = slice(i, i + block_size)
-            if mt_adaptive:
-                csd = _csd_from_mt(x_t[idx_map[0][con_idx]],
-                                   x_t[idx_map[1][con_idx]],
-                                   weights[idx_map[0][con_idx]],
-                                   weights[idx_map[1][con_idx]])
-            else:
-                csd = _csd_from_mt(x_t[idx_map[0][con_idx]],
-                                   x_t[idx_map[1][con_idx]],
-                                   weights, weights)
+    if tril and mode != 'cwt_morlet':
+        # all-to-all: compute whole rows of the lower triangle at once,
+        # with one matrix product per frequency
+        x_t = np.ascontiguousarray(x_t.transpose(2, 0, 1))
+        x_t_conj = x_t.conj().transpose(0, 2, 1)
+        for rows, con_idx in _tril_blocks(x_t.shape[1], block_size):
+            this_csd = np.matmul(x_t[:, rows], x_t_conj[:, :, :rows.stop - 1])
+            this_csd = this_csd[:, idx_map[0][con_idx] - rows.start,
+                                idx_map[1][con_idx]].T
 
             for method in con_methods:
-                method.accumulate(con_idx, csd)
-    else:  # mode == 'cwt_morlet'  # reminder to add alternative TFR methods
-        for i_block, i in enumerate(range(0, n_cons, block_size)):
+                method.accumulate(con_idx, this_csd)
+    else:
+        if mode == 'cwt_morlet':
+            # one "taper" per time point, the CSD is not summed over time
+            x_t = x_t[:, np.newaxis]
+        for i in range(0, n_cons, block_size):
             con_idx = slice(i, i + block_size)
-            # this codes can be very slow
-            csd = (x_t[idx_map[0][con_idx]] *
-                   x_t[idx_map[1][con_idx]].conjugate())
+            this_csd = _csd_pairs_from_spectra(x_t, idx_map[0][con_idx],
+                                               idx_map[1][con_idx])
 
             for method in con_methods:
-                method.accumulate(con_idx, csd)
+                method.accumulate(con_idx, this_csd)
                 # future estimator types need to be explicitly handled here
 
-    return con_methods, psd
+    return con_methods, psd, csd
+
+
+def _tril_blocks(n_signals, block_size):
+    """Split the lower-triangular connections into blocks of whole rows.
+
+    Yields the slice of rows and the slice of connections (in the order of
+    ``np.tril_indices(n_signals, -1)``) of each block. A block holds at most
+    ``block_size`` connections, unless a single row is longer than that.
+    """
+    start = 1  # the first row has no connection
+    while start < n_signals:
+        stop = start + 1
+        while (stop < n_signals and
+               (stop * (stop + 1) - start * (start - 1)) // 2 <= block_size):
+            stop += 1
+        yield (slice(start, stop),
+               slice(start * (start - 1) // 2, stop * (stop - 1) // 2))
+        start = stop
 
 
 def _get_n_epochs(epochs, n):
@@ -552,7 +588,7 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
                           mt_bandwidth=None, mt_adaptive=False,
                           mt_low_bias=True, cwt_freqs=None,
                           cwt_n_cycles=7, block_size=1000, n_jobs=1,
-                          verbose=None):
+                          return_csd=False, output='dense', verbose=None):
     """Compute frequency- and time-frequency-domain connectivity measures.
 
     The connectivity method(s) are specified using the "method" parameter.
@@ -623,6 +659,22 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
         but require more memory).
     n_jobs : int
         How many epochs to process in parallel.
+    return_csd : bool
+        If True, also return the cross-spectral density between the signals,
+        computed in the same pass from the same spectral estimates as the
+        connectivity. Defaults to False.
+
+        .. versionadded:: 0.21
+    output : 'dense' | 'compact'
+        How to return all-to-all connectivity, i.e., when ``indices`` is None.
+        'dense' (default) returns ``(n_signals, n_signals, ...)`` arrays with
+        the lower-triangular part filled. 'compact' only returns the
+        lower-triangular connections, in an array of shape
+        ``(n_signals * (n_signals - 1) // 2, ...)`` ordered like
+        ``np.tril_indices(n_signals, -1)``, which halves the memory needed
+        for large numbers of signals. Ignored when ``indices`` is given.
+
+        .. versionadded:: 0.21
     %(verbose)s
 
     Returns
@@ -634,7 +686,9 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
         when "indices" is None, or
         (n_con, n_freqs) mode: 'multitaper' or 'fourier'
         (n_con, n_freqs, n_times) mode: 'cwt_morlet'
-        when "indices" is specified and "n_con = len(indices[0])".
+        when "indices" is specified and "n_con = len(indices[0])", or
+        when "output" is 'compact' and
+        "n_con = n_signals * (n_signals - 1) / 2".
     freqs : array
         Frequency points at which the connectivity was computed.
     times : array
@@ -644,6 +698,13 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
     n_tapers : int
         The number of DPSS tapers used. Only defined in 'multitaper' mode.
         Otherwise None is returned.
+    csd : instance of CrossSpectralDensity
+        The cross-spectral density averaged over epochs (and over time in
+        'cwt_morlet' mode), between all signals used by the connections.
+        It is scaled like :func:`mne.time_frequency.csd_array_fourier`,
+        :func:`mne.time_frequency.csd_array_multitaper` and
+        :func:`mne.time_frequency.csd_array_morlet`. Only returned if
+        ``return_csd=True``.
 
     Notes
     -----
@@ -655,10 +716,12 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
 
     By default, the connectivity between all signals is computed (only
     connections corresponding to the lower-triangular part of the
-    connectivity matrix). If one is only interested in the connectivity
-    between some signals, the "indices" parameter can be used. For example,
-    to compute the connectivity between the signal with index 0 and signals
-    "2, 3, 4" (a total of 3 connections) one can use the following::
+    connectivity matrix). These connections are computed in blocks of
+    ``block_size`` connections made of whole rows of the matrix. If one is
+    only interested in the connectivity between some signals, the "indices"
+    parameter can be used. For example, to compute the connectivity between
+    the signal with index 0 and signals "2, 3, 4" (a total of 3 connections)
+    one can use the following::
 
         indices = (np.array([0, 0, 0]),    # row indices
                    np.array([2, 3, 4]))    # col indices
@@ -743,6 +806,7 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
            noise and sample-size bias" NeuroImage, vol. 55, no. 4,
            pp. 1548-1565, Apr. 2011.
     """
+    _check_option('output', output, ('dense', 'compact'))
     if n_jobs != 1:
         parallel, my_epoch_spectral_connectivity, _ = \
             parallel_func(_epoch_spectral_connectivity, n_jobs,
@@ -812,6 +876,13 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
             else:
                 psd = None
 
+            # allocate space to accumulate the cross-spectral density
+            if return_csd:
+                csd = np.zeros((n_freqs, len(sig_idx), len(sig_idx)),
+                               dtype=np.complex128)
+            else:
+                csd = None
+
             # create instances of the connectivity estimators
             con_methods = [mtype(n_cons, n_freqs, n_times_spectrum)
                            for mtype in con_method_types]
@@ -831,10 +902,11 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
             tmax_idx=tmax_idx, sfreq=sfreq, mode=mode,
             freq_mask=freq_mask, idx_map=idx_map, block_size=block_size,
             psd=psd, accumulate_psd=accumulate_psd,
+            csd=csd, accumulate_csd=return_csd,
             mt_adaptive=mt_adaptive,
             con_method_types=con_method_types,
             con_methods=con_methods if n_jobs == 1 else None,
-            n_signals=n_signals, n_times=n_times,
+            n_signals=n_signals, n_times=n_times, tril=indices is None,
             accumulate_inplace=True if n_jobs == 1 else False)
         call_params.update(**spectral_params)
 
@@ -860,6 +932,8 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
                     method.combine(parallel_method)
                 if accumulate_psd:
                     psd += this_out[1]
+                if return_csd:
+                    csd += this_out[2]
 
             epoch_idx += len(epoch_block)
 
@@ -904,7 +978,7 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
 
         con.append(this_con)
 
-    if indices is None:
+    if indices is None and output == 'dense':
         # return all-to-all connectivity matrices
         logger.info('    assembling connectivity matrix '
                     '(filling the upper triangular region of the matrix)')
@@ -923,13 +997,41 @@ def spectral_connectivity(data, method='coh', indices=None, sfreq=2 * np.pi,
         # for a single method return connectivity directly
         con = con[0]
 
+    if return_csd:
+        csd = _assemble_csd(csd, data, mode, sig_idx, sfreq, freqs, times,
+                            n_epochs)
+
     if faverage:
         # for each band we return the frequencies that were averaged
         freqs = freqs_bands
 
+    if return_csd:
+        return con, freqs, times, n_epochs, n_tapers, csd
     return con, freqs, times, n_epochs, n_tapers
 
 
+def _assemble_csd(csd, data, mode, sig_idx, sfreq, freqs, times, n_epochs):
+    """Scale the summed cross-spectra into a CrossSpectralDensity."""
+    n_times = len(times)
+    # scaling by sampling frequency for compatibility with the csd_* functions
+    csd /= n_epochs * sfreq
+    if mode == 'fourier':
+        # scaling by number of samples and compensating for loss of power
+        # due to windowing (see section 11.5.2 in Bendat & Piersol)
+        csd *= 8 / (3. * n_times)
+    if isinstance(data, BaseEpochs):
+        ch_names = [data.ch_names[idx] for idx in sig_idx]
+        projs = data.info['projs']
+    else:
+        ch_names = ['SERIES%03d' % (idx + 1) for idx in sig_idx]
+        projs = None
+    triu = np.triu_indices(len(sig_idx))
+    return CrossSpectralDensity(
+        csd[:, triu[0], triu[1]].T, ch_names=ch_names, frequencies=freqs,
+        n_fft=1 if mode == 'cwt_morlet' else n_times, tmin=times[0],
+        tmax=times[-1], projs=projs)
+
+
 def _prepare_connectivity(epoch_block, tmin, tmax, fmin, fmax, sfreq, indices,
                           mode, fskip, n_bands,
                           cwt_freqs, faverage):
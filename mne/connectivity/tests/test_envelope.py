@@ -72,3 +72,20 @@ def test_envelope_correlation():
     assert_allclose(np.diag(corr_plain_mean), 1)
     np_corr = np.array([np.corrcoef(np.abs(x)) for x in data_hilbert])
     assert_allclose(corr_plain, np_corr)
+
+
+def test_envelope_correlation_blocks():
+    """Test envelope correlation of phase-locked signals and n_jobs."""
+    rng = np.random.RandomState(0)
+    data = rng.randn(3, 6, 64)
+    data[:, 1] = 2 * data[:, 0]  # phase-locked pair
+    data_hilbert = hilbert(data, axis=-1)
+    corr_orig = _compute_corrs_orig(data_hilbert)
+    corr = envelope_correlation(data_hilbert)
+    assert_allclose(corr, corr_orig, atol=1e-12)
+    # generator, in parallel
+    corr = envelope_correlation((d for d in data_hilbert), n_jobs=2)
+    assert_allclose(corr, corr_orig, atol=1e-12)
+    corr = envelope_correlation(data_hilbert, combine=None, n_jobs=2)
+    assert corr.shape == (3, 6, 6)
+    assert_allclose(corr.mean(axis=0), corr_orig, atol=1e-12)
@@ -1,13 +1,16 @@
 import numpy as np
-from numpy.testing import assert_array_almost_equal
+from numpy.testing import (assert_array_almost_equal, assert_allclose,
+                           assert_array_equal)
 import pytest
 
 from mne.connectivity import spectral_connectivity
-from mne.connectivity.spectral import _CohEst, _get_n_epochs
+from mne.connectivity.spectral import _CohEst, _get_n_epochs, _tril_blocks
 
 from mne import SourceEstimate
 from mne.utils import run_tests_if_main
 from mne.filter import filter_data
+from mne.time_frequency import (csd_array_fourier, csd_array_multitaper,
+                                csd_array_morlet)
 
 
 def _stc_gen(data, sfreq, tmin, combo=False):
@@ -212,4 +215,71 @@ def test_spectral_connectivity(method, mode):
     assert (out_lens[0] == 10)
 
 
+@pytest.mark.parametrize('mode', ['multitaper', 'fourier', 'cwt_morlet'])
+def test_spectral_connectivity_csd(mode):
+    """Test the CSD computed in the same pass as the connectivity."""
+    rng = np.random.RandomState(0)
+    sfreq = 100.
+    data = rng.randn(4, 5, 200)
+    indices = (np.array([0, 0, 3]), np.array([1, 4, 1]))
+    cwt_freqs = np.array([10., 20.])
+    kwargs = dict(sfreq=sfreq, mode=mode, indices=indices, fmin=5.,
+                  cwt_freqs=cwt_freqs)
+    con = spectral_connectivity(data, 'coh', **kwargs)[0]
+    con_2, freqs, _, _, _, csd = spectral_connectivity(
+        data, 'coh', return_csd=True, **kwargs)
+    assert_array_almost_equal(con_2, con)
+    assert csd.ch_names == ['SERIES001', 'SERIES002', 'SERIES004',
+                            'SERIES005']
+    assert_array_almost_equal(csd.frequencies, freqs)
+    sel = [0, 1, 3, 4]
+    if mode == 'cwt_morlet':
+        csd_2 = csd_array_morlet(data[:, sel], sfreq, cwt_freqs, n_cycles=7)
+        assert_allclose(csd._data, csd_2._data, rtol=1e-6)
+        return
+    func = dict(multitaper=csd_array_multitaper,
+                fourier=csd_array_fourier)[mode]
+    csd_2 = func(data[:, sel], sfreq, fmin=4.9, fmax=np.inf)
+    idx = np.searchsorted(csd_2.frequencies, freqs)
+    assert_array_almost_equal(csd._data, csd_2._data[:, idx])
+    # coherence from the returned CSD
+    csd_mat = np.array([csd.get_data(index=ii) for ii in range(len(freqs))])
+    coh = np.abs(csd_mat[:, [0, 0, 2], [1, 3, 1]]) / np.sqrt(
+        csd_mat[:, [0, 0, 2], [0, 0, 2]].real *
+        csd_mat[:, [1, 3, 1], [1, 3, 1]].real)
+    assert_array_almost_equal(coh.T, con)
+
+
+@pytest.mark.parametrize('block_size', [1, 7, 1000])
+def test_spectral_connectivity_compact(block_size):
+    """Test blocked all-to-all connectivity and the compact output."""
+    rng = np.random.RandomState(0)
+    n_signals = 9
+    data = rng.randn(3, n_signals, 200)
+    tril = np.tril_indices(n_signals, -1)
+    blocks = list(_tril_blocks(n_signals, block_size))
+    assert blocks[0][1].start == 0
+    assert blocks[-1][1].stop == len(tril[0])
+    for rows, con_idx in blocks:
+        assert_array_equal(np.unique(tril[0][con_idx]),
+                           np.arange(rows.start, rows.stop))
+        assert (con_idx.stop - con_idx.start <= block_size or
+                rows.stop - rows.start == 1)
+    methods = ['coh', 'imcoh', 'wpli']
+    con = spectral_connectivity(data, methods, sfreq=100., fmin=10.,
+                                mode='fourier', block_size=block_size)[0]
+    con_compact = spectral_connectivity(data, methods, sfreq=100., fmin=10.,
+                                        mode='fourier', output='compact',
+                                        block_size=block_size)[0]
+    con_indices = spectral_connectivity(data, methods, sfreq=100., fmin=10.,
+                                        mode='fourier', indices=tril)[0]
+    for this_con, this_compact, this_indices in zip(
+            con, con_compact, con_indices):
+        assert this_compact.shape == (len(tril[0]), this_con.shape[-1])
+        assert_array_equal(this_compact, this_con[tril])
+        assert_allclose(this_compact, this_indices, rtol=1e-7, atol=1e-12)
+    with pytest.raises(ValueError, match='Invalid value'):
+        spectral_connectivity(data, 'coh', sfreq=100., output='sparse')
+
+
 run_tests_if_main()
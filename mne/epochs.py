@@ -16,6 +16,7 @@ from copy import deepcopy
 import json
 import operator
 import os.path as op
+import tempfile
 import warnings
 
 import numpy as np
@@ -56,6 +57,7 @@ from .utils import (_check_fname, check_fname, logger, verbose,
                     _check_combine, ShiftTimeMixin, _build_data_frame,
                     _check_pandas_index_arguments, _convert_times,
                     _scale_dataframe_data, _check_time_format, object_size)
+from .utils.numerics import _MeanAccumulator, _P2Median
 from .utils.docs import fill_doc
 
 
@@ -909,12 +911,20 @@ class BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin, ShiftTimeMixin,
         Parameters
         ----------
         %(picks_all_data)s
-        method : str | callable
+        method : str | callable | object
             How to combine the data. If "mean"/"median", the mean/median
-            are returned.
+            are returned. If "approximate_median", the median is estimated
+            in a single pass over the epochs (see Notes).
             Otherwise, must be a callable which, when passed an array of shape
             (n_epochs, n_channels, n_time) returns an array of shape
-            (n_channels, n_time).
+            (n_channels, n_time), or an object with ``reset()``,
+            ``update(data)`` and ``finalize()`` methods that is reset,
+            then accumulates batches of shape (n_batch, n_channels, n_time)
+            and returns an array of shape (n_channels, n_time),
+            respectively. Callables require the data to be preloaded.
+
+            .. versionadded:: 0.21
+               Support for "approximate_median" and accumulating objects.
             Note that due to file type limitations, the kind for all
             these will be "average".
 
@@ -942,6 +952,18 @@ class BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin, ShiftTimeMixin,
             >>> epochs.average(method=trim)  # doctest:+SKIP
 
         This would compute the trimmed mean.
+
+        When the data are not preloaded, epochs are read one at a time. The
+        exact median needs all the epochs of a channel at once, so large data
+        are first written to a temporary file (as large as the data) and the
+        median is then computed for blocks of channels. With
+        ``method="approximate_median"``, the median is instead approximated
+        in a single pass with the P-square algorithm
+        :footcite:`JainChlamtac1985`, whether or not the data are preloaded.
+
+        References
+        ----------
+        .. footbibliography::
         """
         return self._compute_aggregate(picks=picks, mode=method)
 
@@ -976,7 +998,18 @@ class BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin, ShiftTimeMixin,
         n_channels = len(self.ch_names)
         n_times = len(self.times)
 
-        if self.preload:
+        is_reducer = all(hasattr(mode, attr)
+                         for attr in ('reset', 'update', 'finalize'))
+        if is_reducer or mode == 'approximate_median':
+            # Accumulate in a single pass, only one epoch is in memory at a
+            # time unless the data are preloaded
+            if is_reducer:
+                reducer = mode
+                reducer.reset()
+            else:
+                reducer = _P2Median()
+            data, n_events = self._reduce(reducer, n_channels, n_times)
+        elif self.preload:
             n_events = len(self.events)
             fun = _check_combine(mode, valid=('mean', 'median', 'std'))
             data = fun(self._data)
@@ -986,31 +1019,16 @@ class BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin, ShiftTimeMixin,
                     'You passed a function that resulted n data of shape {}, '
                     'but it should be {}.'.format(
                         data.shape, self._data.shape[1:]))
+        elif mode in ('mean', 'std'):
+            data, n_events = self._reduce(
+                _MeanAccumulator(std=mode == 'std'), n_channels, n_times)
+        elif mode == 'median':
+            data, n_events = self._median_blocks(n_channels, n_times)
         else:
-            if mode not in {"mean", "std"}:
-                raise ValueError("If data are not preloaded, can only compute "
-                                 "mean or standard deviation.")
-            data = np.zeros((n_channels, n_times))
-            n_events = 0
-            for e in self:
-                if np.iscomplexobj(e):
-                    data = data.astype(np.complex128)
-                data += e
-                n_events += 1
-
-            if n_events > 0:
-                data /= n_events
-            else:
-                data.fill(np.nan)
-
-            # convert to stderr if requested, could do in one pass but do in
-            # two (slower) in case there are large numbers
-            if mode == "std":
-                data_mean = data.copy()
-                data.fill(0.)
-                for e in self:
-                    data += (e - data_mean) ** 2
-                data = np.sqrt(data / n_events)
+            raise ValueError('If data are not preloaded, can only compute '
+                             'mean, median or standard deviation, or use '
+                             'an object with reset, update and finalize '
+                             'methods, got %r' % (mode,))
 
         if mode == "std":
             kind = 'standard_error'
@@ -1021,6 +1039,51 @@ class BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin, ShiftTimeMixin,
         return self._evoked_from_epoch_data(data, self.info, picks, n_events,
                                             kind, self._name)
 
+    def _reduce(self, reducer, n_channels, n_times):
+        """Feed the epochs to a reducer and finalize it."""
+        if self.preload:
+            reducer.update(self._data)
+            n_events = len(self._data)
+        else:
+            n_events = 0
+            for e in self:
+                reducer.update(e[np.newaxis])
+                n_events += 1
+        if n_events > 0:
+            data = reducer.finalize()
+        else:
+            data = np.full((n_channels, n_times), np.nan)
+        return data, n_events
+
+    def _median_blocks(self, n_channels, n_times, n_values=2 ** 24):
+        """Compute the exact median of non-preloaded data.
+
+        The epochs are read once, into a channel-major temporary file if they
+        have more than n_values values, and the median is then computed for
+        blocks of channels of about n_values values.
+        """
+        shape = (n_channels, len(self.events), n_times)
+        with tempfile.TemporaryDirectory(prefix='tmp_mne_median') as tmp_dir:
+            if np.prod(shape) <= n_values:
+                values = np.empty(shape)
+            else:
+                values = np.memmap(op.join(tmp_dir, 'epochs.dat'),
+                                   dtype=np.float64, mode='w+', shape=shape)
+            n_events = 0
+            for e in self:
+                values[:, n_events] = e
+                n_events += 1
+            data = np.full((n_channels, n_times), np.nan)
+            n_block = max(n_values // (max(n_events, 1) * n_times), 1)
+            logger.info('Computing the median of %d epochs in %d block(s) of '
+                        'channels' % (n_events, -(-n_channels // n_block)))
+            if n_events > 0:
+                for start in range(0, n_channels, n_block):
+                    data[start:start + n_block] = np.median(
+                        values[start:start + n_block, :n_events], axis=1)
+            del values  # close the file before the directory is removed
+        return data, n_events
+
     @property
     def _name(self):
         """Give a nice string representation based on event ids."""
@@ -2933,6 +2996,16 @@ def _compare_epochs_infos(info1, info2, name):
                          'runs to a common head position.')
 
 
+def _fill_concat_data(data, this_data, n_max, start):
+    """Put the data of one instance into the preallocated output."""
+    if data is None:
+        data = np.empty((n_max,) + this_data.shape[1:], this_data.dtype)
+    elif np.result_type(data, this_data) != data.dtype:  # e.g., complex
+        data = data.astype(np.result_type(data, this_data))
+    data[start:start + len(this_data)] = this_data
+    return data, start + len(this_data)
+
+
 def _concatenate_epochs(epochs_list, with_data=True, add_offset=True):
     """Auxiliary function for concatenating epochs."""
     if not isinstance(epochs_list, (list, tuple)):
@@ -2943,7 +3016,14 @@ def _concatenate_epochs(epochs_list, with_data=True, add_offset=True):
             raise TypeError('epochs_list[%d] must be an instance of Epochs, '
                             'got %s' % (ei, type(epochs)))
     out = epochs_list[0]
-    data = [out.get_data()] if with_data else None
+    if with_data:
+        # Allocate the output once for all the events and fill it one
+        # instance at a time, bad epochs are dropped while reading the data
+        # so the output is trimmed at the end
+        n_max = sum(len(epochs.events) for epochs in epochs_list)
+        data, n_data = _fill_concat_data(None, out.get_data(), n_max, 0)
+    else:
+        data = None
     events = [out.events]
     metadata = [out.metadata]
     baseline, tmin, tmax = out.baseline, out.tmin, out.tmax
@@ -2974,7 +3054,8 @@ def _concatenate_epochs(epochs_list, with_data=True, add_offset=True):
                                             epochs.event_id[key]))
 
         if with_data:
-            data.append(epochs.get_data())
+            data, n_data = _fill_concat_data(data, epochs.get_data(), n_max,
+                                             n_data)
         evs = epochs.events.copy()
         # add offset
         if add_offset:
@@ -2989,6 +3070,11 @@ def _concatenate_epochs(epochs_list, with_data=True, add_offset=True):
         event_id.update(epochs.event_id)
         metadata.append(epochs.metadata)
     events = np.concatenate(events, axis=0)
+    if with_data and n_data < n_max:
+        if data.flags['OWNDATA'] and data.flags['C_CONTIGUOUS']:
+            data.resize((n_data,) + data.shape[1:], refcheck=False)
+        else:
+            data = data[:n_data]
 
     # Create metadata object (or make it None)
     n_have = sum(this_meta is not None for this_meta in metadata)
@@ -3004,8 +3090,6 @@ def _concatenate_epochs(epochs_list, with_data=True, add_offset=True):
             metadata = pd.concat(metadata)
         else:  # dict of dicts
             metadata = sum(metadata, list())
-    if with_data:
-        data = np.concatenate(data, axis=0)
     return (info, data, events, event_id, tmin, tmax, metadata, baseline,
             selection, drop_log, verbose)
 
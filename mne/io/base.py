@@ -247,6 +247,25 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
             self._preload_data(preload)
         self._init_kwargs = _get_argvalues()
 
+    @property
+    def _data(self):
+        """The data array, consolidating appended chunks if necessary."""
+        try:
+            chunks = self.__dict__['_data_chunks']
+        except KeyError:
+            raise AttributeError('_data')
+        if len(chunks) > 1:
+            chunks[:] = [np.concatenate(chunks, axis=1)]
+        return chunks[0]
+
+    @_data.setter
+    def _data(self, data):
+        self.__dict__['_data_chunks'] = [data]
+
+    @_data.deleter
+    def _data(self):
+        del self.__dict__['_data_chunks']
+
     @verbose
     def apply_gradient_compensation(self, grade, verbose=None):
         """Apply CTF gradient compensation.
@@ -649,11 +668,13 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
 
     def __del__(self):  # noqa: D105
         # remove file for memmap
-        if hasattr(self, '_data') and \
-                getattr(self._data, 'filename', None) is not None:
+        # don't use self._data here, it would consolidate appended chunks
+        chunks = self.__dict__.get('_data_chunks', [])
+        if len(chunks) == 1 and \
+                getattr(chunks[0], 'filename', None) is not None:
             # First, close the file out; happens automatically on del
-            filename = self._data.filename
-            del self._data
+            filename = chunks[0].filename
+            del self._data, chunks
             # Now file can be removed
             try:
                 os.remove(filename)
@@ -1557,6 +1578,21 @@ class BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin, SetChannelsMixin,
             if self.preload:
                 self._data = None
             self.preload = False
+        elif preload is True:
+            # keep the segments as a list of chunks that only get
+            # consolidated (once) when the data are actually accessed, so
+            # that appending runs one at a time stays linear in time
+            if not self.preload:
+                self._data = self._read_segment()
+            chunks = self.__dict__['_data_chunks']
+            dtype = chunks[0].dtype
+            for r in raws:
+                if r.preload:
+                    # copy so that later in-place changes to r don't leak
+                    chunks.append(r._data.astype(dtype))
+                else:
+                    chunks.append(r._read_segment().astype(dtype, copy=False))
+            self.preload = True
         else:
             # do the concatenation ourselves since preload might be a string
             nchan = self.info['nchan']
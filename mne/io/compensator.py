@@ -2,6 +2,7 @@ import numpy as np
 from scipy import linalg
 
 from .constants import FIFF
+from ..utils import object_hash, _LRUCache
 
 
 def get_current_comp(info):
@@ -63,6 +64,10 @@ def _make_compensator(info, grade):
                      ' found' % grade)
 
 
+# Compensators are shared across reads of the same system configuration
+_compensator_cache = _LRUCache(8)
+
+
 def make_compensator(info, from_, to, exclude_comp_chs=False):
     """Return compensation matrix eg. for CTF system.
 
@@ -88,7 +93,19 @@ def make_compensator(info, from_, to, exclude_comp_chs=False):
     """
     if from_ == to:
         return None
-
+    key = (object_hash(info['comps']), tuple(info['ch_names']), from_, to,
+           tuple(c['kind'] == FIFF.FIFFV_REF_MEG_CH for c in info['chs'])
+           if exclude_comp_chs else None)
+    try:
+        comp = _compensator_cache[key]
+    except KeyError:
+        comp = _compensator_cache[key] = _compute_compensator(
+            info, from_, to, exclude_comp_chs)
+    return comp.copy()
+
+
+def _compute_compensator(info, from_, to, exclude_comp_chs):
+    """Compute the compensation matrix."""
     #   s_orig = s_from + C1*s_from = (I + C1)*s_from
     #   s_to   = s_orig - C2*s_orig = (I - C2)*s_orig
     #   s_to   = (I - C2)*(I + C1)*s_from = (I + C1 - C2 - C2*C1)*s_from
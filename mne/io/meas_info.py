@@ -191,6 +191,59 @@ def _format_trans(obj, key):
             obj[key] = Transform(t['from'], t['to'], t['trans'])
 
 
+def _copy_chs(chs):
+    """Copy a list of channel info dicts."""
+    # dict shallow copy is fast, so use it then overwrite the mutable loc
+    out = list()
+    for ch in chs:
+        ch = ch.copy()  # shallow
+        ch['loc'] = ch['loc'].copy()
+        out.append(ch)
+    return out
+
+
+def _copy_dig(dig):
+    """Copy a list of dig points."""
+    # as for chs, only r is mutable
+    out = list()
+    for d in dig:
+        d = type(d)(d)  # shallow
+        d['r'] = d['r'].copy()
+        out.append(d)
+    return out
+
+
+def _copy_info_value(key, value, memodict=None):
+    """Copy the value of an Info entry."""
+    # chs is roughly half the time but most are immutable
+    if key == 'chs':
+        return _copy_chs(value)
+    elif key == 'ch_names':
+        # we know it's list of str, shallow okay and saves ~100 µs
+        return value.copy()
+    elif key == 'dig' and value is not None:
+        # can be 10k points
+        return _copy_dig(value)
+    elif key == 'hpi_meas':
+        hms = list()
+        for hm in value:
+            hm = hm.copy()
+            # the only mutable thing here is some entries in coils
+            hm['hpi_coils'] = [coil.copy() for coil in hm['hpi_coils']]
+            # There is a *tiny* risk here that someone could write
+            # raw.info['hpi_meas'][0]['hpi_coils'][1]['epoch'] = ...
+            # and assume that info.copy() will make an actual copy,
+            # but copying these entries has a 2x slowdown penalty so
+            # probably not worth it for such a deep corner case:
+            # for coil in hpi_coils:
+            #     for key in ('epoch', 'slopes', 'corr_coeff'):
+            #         coil[key] = coil[key].copy()
+            hms.append(hm)
+        return hms
+    else:
+        return deepcopy(value, memodict)
+
+
 # XXX Eventually this should be de-duplicated with the MNE-MATLAB stuff...
 class Info(dict, MontageMixin):
     """Measurement information.
@@ -671,39 +724,26 @@ class Info(dict, MontageMixin):
 
     def __deepcopy__(self, memodict):
         """Make a deepcopy."""
+        return self._copy(memodict=memodict)
+
+    def _copy(self, skip=(), memodict=None):
+        """Copy the instance, except for the values of ``skip``.
+
+        The values of ``skip`` are shared with the copy, so callers must
+        replace them.
+        """
         result = Info.__new__(Info)
         for k, v in self.items():
-            # chs is roughly half the time but most are immutable
-            if k == 'chs':
-                # dict shallow copy is fast, so use it then overwrite
-                result[k] = list()
-                for ch in v:
-                    ch = ch.copy()  # shallow
-                    ch['loc'] = ch['loc'].copy()
-                    result[k].append(ch)
-            elif k == 'ch_names':
-                # we know it's list of str, shallow okay and saves ~100 µs
-                result[k] = v.copy()
-            elif k == 'hpi_meas':
-                hms = list()
-                for hm in v:
-                    hm = hm.copy()
-                    # the only mutable thing here is some entries in coils
-                    hm['hpi_coils'] = [coil.copy() for coil in hm['hpi_coils']]
-                    # There is a *tiny* risk here that someone could write
-                    # raw.info['hpi_meas'][0]['hpi_coils'][1]['epoch'] = ...
-                    # and assume that info.copy() will make an actual copy,
-                    # but copying these entries has a 2x slowdown penalty so
-                    # probably not worth it for such a deep corner case:
-                    # for coil in hpi_coils:
-                    #     for key in ('epoch', 'slopes', 'corr_coeff'):
-                    #         coil[key] = coil[key].copy()
-                    hms.append(hm)
-                result[k] = hms
-            else:
-                result[k] = deepcopy(v, memodict)
+            result[k] = v if k in skip else _copy_info_value(k, v, memodict)
+        if '_ch_table' in self.__dict__:  # validated on use, can be shared
+            result._ch_table = self._ch_table
         return result
 
+    def __getstate__(self):  # noqa: D105
+        state = self.__dict__.copy()
+        state.pop('_ch_table', None)
+        return state
+
     def _check_consistency(self, prepend_error=''):
         """Do some self-consistency checks and datatype tweaks."""
         missing = [bad for bad in self['bads'] if bad not in self['ch_names']]
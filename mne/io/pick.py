@@ -6,6 +6,7 @@
 # License: BSD (3-clause)
 
 from copy import deepcopy
+import operator
 import re
 
 import numpy as np
@@ -144,6 +145,63 @@ def channel_type(info, idx):
     return first_kind
 
 
+class _ChannelTable(object):
+    """Columnar representation of info['chs'] used to vectorize picking.
+
+    It is stored on the Info and rebuilt whenever the channel definitions
+    change. It also holds a cache of resolved picks.
+    """
+
+    def __init__(self, key, chs):
+        self.key = key
+        self.names = [ch['ch_name'] for ch in chs]
+        self.name_idx = {name: ii for ii, name in enumerate(self.names)}
+        self.kind = np.array([ch['kind'] for ch in chs], int)
+        self.coil_type = np.array([ch['coil_type'] for ch in chs], int)
+        self.unit = np.array([ch['unit'] for ch in chs], int)
+        types = [_channel_type(ch) for ch in chs]
+        self.unknown = np.array([t is None for t in types], bool)
+        self.types = np.array(types, object)
+        self.picks = dict()
+
+    def get_types(self, info, picks=slice(None)):
+        """Get the channel types, raising an error for unknown types."""
+        unknown = np.arange(len(self.types))[picks][self.unknown[picks]]
+        if len(unknown):
+            channel_type(info, unknown[0])  # raises the proper error
+        return self.types[picks]
+
+    def cache_picks(self, key, picks):
+        if len(self.picks) >= 100:  # only a handful are used in practice
+            self.picks.clear()
+        self.picks[key] = picks
+
+
+_ch_table_getter = operator.itemgetter('ch_name', 'kind', 'coil_type', 'unit')
+
+
+def _get_ch_table(info):
+    """Get the (possibly cached) columnar channel table of an Info."""
+    chs = info['chs']
+    key = list(map(_ch_table_getter, chs))
+    table = getattr(info, '_ch_table', None)
+    if table is None or table.key != key:
+        table = info._ch_table = _ChannelTable(key, chs)
+    return table
+
+
+def _channel_type(ch):
+    """Get the type of a channel dict (None if unknown)."""
+    try:
+        first_kind = _first_rule[ch['kind']]
+        if first_kind in _second_rules:
+            key, second_rule = _second_rules[first_kind]
+            first_kind = second_rule[ch[key]]
+    except KeyError:
+        return None
+    return first_kind
+
+
 def pick_channels(ch_names, include, exclude=[], ordered=False):
     """Pick channels by names.
 
@@ -261,23 +319,6 @@ def _triage_meg_pick(ch, meg):
     return False
 
 
-def _triage_fnirs_pick(ch, fnirs, warned):
-    """Triage an fNIRS pick type."""
-    if fnirs is True:
-        return True
-    elif ch['coil_type'] == FIFF.FIFFV_COIL_FNIRS_HBO and fnirs == 'hbo':
-        return True
-    elif ch['coil_type'] == FIFF.FIFFV_COIL_FNIRS_HBR and fnirs == 'hbr':
-        return True
-    elif ch['coil_type'] == FIFF.FIFFV_COIL_FNIRS_CW_AMPLITUDE and \
-            fnirs in ('fnirs_cw_amplitude', 'fnirs_raw'):  # alias
-        fnirs = _fnirs_raw_dep(fnirs, warned)
-        return True
-    elif ch['coil_type'] == FIFF.FIFFV_COIL_FNIRS_OD and fnirs == 'fnirs_od':
-        return True
-    return False
-
-
 def _check_meg_type(meg, allow_auto=False):
     """Ensure a valid meg type."""
     if isinstance(meg, str):
@@ -376,19 +417,12 @@ def pick_types(info, meg=None, eeg=False, stim=False, eog=False, ecg=False,
     """
     # NOTE: Changes to this function's signature should also be changed in
     # PickChannelsMixin
+    _validate_type(info, "info")
     if meg is None:
         meg = True  # previous default arg
         meg_default_arg = True  # default argument for meg was used
     else:
         meg_default_arg = False
-    # only issue deprecation warning if there are MEG channels in the data and
-    # if the function was called with the default arg for meg
-    deprecation_warn = False
-
-    exclude = _check_info_exclude(info, exclude)
-    nchan = info['nchan']
-    pick = np.zeros(nchan, dtype=bool)
-
     _check_meg_type(ref_meg, allow_auto=True)
     _check_meg_type(meg)
     if isinstance(ref_meg, str) and ref_meg == 'auto':
@@ -402,10 +436,59 @@ def pick_types(info, meg=None, eeg=False, stim=False, eog=False, ecg=False,
                  '"meg", "ref_meg" and "fnirs") must be of type bool, not {}.')
             raise ValueError(w.format(type(param)))
 
-    param_dict = dict(eeg=eeg, stim=stim, eog=eog, ecg=ecg, emg=emg,
-                      misc=misc, resp=resp, chpi=chpi, exci=exci,
-                      ias=ias, syst=syst, seeg=seeg, dipole=dipole,
-                      gof=gof, bio=bio, ecog=ecog, csd=csd)
+    # Picks only depend on the channel definitions, so they are resolved
+    # once and then looked up for as long as the channels and bads are
+    # unchanged
+    table = _get_ch_table(info)
+    types = table.get_types(info)
+    if fnirs == 'fnirs_raw' and (types == 'fnirs_cw_amplitude').any():
+        fnirs = _fnirs_raw_dep(fnirs, [False])
+    key = _pick_types_key(
+        info, exclude, meg=meg, meg_default_arg=meg_default_arg, eeg=eeg,
+        stim=stim, eog=eog, ecg=ecg, emg=emg, ref_meg=ref_meg, misc=misc,
+        resp=resp, chpi=chpi, exci=exci, ias=ias, syst=syst, seeg=seeg,
+        dipole=dipole, gof=gof, bio=bio, ecog=ecog, fnirs=fnirs, csd=csd,
+        include=include, selection=selection)
+    if key in table.picks:
+        sel, deprecation_warn = table.picks[key]
+        sel = sel.copy()
+    else:
+        exclude = _check_info_exclude(info, exclude)
+        table = _get_ch_table(info)  # the check can rename channels
+        table.get_types(info)
+        sel, deprecation_warn = _pick_types_table(
+            table, meg, meg_default_arg, ref_meg, fnirs, include, exclude,
+            selection, eeg=eeg, stim=stim, eog=eog, ecg=ecg, emg=emg,
+            misc=misc, resp=resp, chpi=chpi, exci=exci, ias=ias, syst=syst,
+            seeg=seeg, dipole=dipole, gof=gof, bio=bio, ecog=ecog, csd=csd)
+        if key is not None:
+            table.cache_picks(key, (sel.copy(), deprecation_warn))
+
+    if deprecation_warn:
+        warn("The default of meg=True will change to meg=False in version 0.22"
+             ", set meg explicitly to avoid this warning.", DeprecationWarning)
+    return sel
+
+
+def _pick_types_key(info, exclude, include, selection, **kwargs):
+    """Get a hashable key for a pick_types call (None if not possible)."""
+    if isinstance(exclude, str) and exclude == 'bads':
+        exclude = info.get('bads', [])
+    if not isinstance(exclude, (list, tuple)):
+        return None  # let _check_info_exclude raise the error
+    try:
+        key = (tuple(sorted(kwargs.items())), tuple(include), tuple(exclude),
+               None if selection is None else tuple(selection))
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _pick_types_table(table, meg, meg_default_arg, ref_meg, fnirs, include,
+                      exclude, selection, **param_dict):
+    """Pick channels by type using the columnar channel table."""
+    types = table.types
     # avoid triage if possible
     if isinstance(meg, bool):
         for key in ('grad', 'mag'):
@@ -413,49 +496,52 @@ def pick_types(info, meg=None, eeg=False, stim=False, eog=False, ecg=False,
     if isinstance(fnirs, bool):
         for key in ('hbo', 'hbr', 'fnirs_cw_amplitude', 'fnirs_od'):
             param_dict[key] = fnirs
-    warned = [False]
-    for k in range(nchan):
-        ch_type = channel_type(info, k)
-        if ch_type in ('grad', 'mag') and meg_default_arg:
-            deprecation_warn = True
-        try:
-            pick[k] = param_dict[ch_type]
-        except KeyError:  # not so simple
-            assert ch_type in ('grad', 'mag', 'hbo', 'hbr', 'ref_meg',
-                               'fnirs_cw_amplitude', 'fnirs_od')
-            if ch_type in ('grad', 'mag'):
-                pick[k] = _triage_meg_pick(info['chs'][k], meg)
-                if meg_default_arg:
-                    deprecation_warn = True
-            elif ch_type == 'ref_meg':
-                pick[k] = _triage_meg_pick(info['chs'][k], ref_meg)
-                if meg_default_arg:
-                    deprecation_warn = True
-            else:  # ch_type in ('hbo', 'hbr')
-                pick[k] = _triage_fnirs_pick(info['chs'][k], fnirs, warned)
+    pick = np.zeros(len(types), bool)
+    for ch_type, value in param_dict.items():
+        if value:
+            pick |= types == ch_type
+    is_meg = np.in1d(types, ('grad', 'mag'))
+    if not isinstance(meg, bool):
+        pick |= _triage_meg_picks(table, meg, is_meg)
+    if not isinstance(fnirs, bool):
+        pick |= types == fnirs
+    is_ref = types == 'ref_meg'
+    pick |= _triage_meg_picks(table, ref_meg, is_ref)
+    # only issue deprecation warning if there are MEG channels in the data
+    # and if the function was called with the default arg for meg
+    deprecation_warn = bool(meg_default_arg and (is_meg | is_ref).any())
 
     # restrict channels to selection if provided
     if selection is not None:
         # the selection only restricts these types of channels
         sel_kind = [FIFF.FIFFV_MEG_CH, FIFF.FIFFV_REF_MEG_CH,
                     FIFF.FIFFV_EEG_CH]
-        for k in np.where(pick)[0]:
-            if (info['chs'][k]['kind'] in sel_kind and
-                    info['ch_names'][k] not in selection):
-                pick[k] = False
+        pick &= ~(np.in1d(table.kind, sel_kind) &
+                  ~np.in1d(table.names, list(selection)))
 
-    myinclude = [info['ch_names'][k] for k in range(nchan) if pick[k]]
-    myinclude += include
+    for name in include:
+        if name in table.name_idx:
+            pick[table.name_idx[name]] = True
+    for name in exclude:
+        if name in table.name_idx:
+            pick[table.name_idx[name]] = False
+    return np.where(pick)[0], deprecation_warn
 
-    if len(myinclude) == 0:
-        sel = np.array([], int)
-    else:
-        sel = pick_channels(info['ch_names'], myinclude, exclude)
 
-    if deprecation_warn:
-        warn("The default of meg=True will change to meg=False in version 0.22"
-             ", set meg explicitly to avoid this warning.", DeprecationWarning)
-    return sel
+def _triage_meg_picks(table, meg, mask):
+    """Triage MEG pick types of the channels in mask."""
+    if meg is True:
+        return mask
+    elif meg in ('grad', 'planar1', 'planar2'):
+        mask = mask & (table.unit == FIFF.FIFF_UNIT_T_M)
+        if meg != 'grad':
+            end = '2' if meg == 'planar1' else '3'
+            mask &= np.array([name.endswith(end) for name in table.names],
+                             bool)
+        return mask
+    elif meg == 'mag':
+        return mask & (table.unit == FIFF.FIFF_UNIT_T)
+    return np.zeros_like(mask)
 
 
 @verbose
@@ -479,18 +565,19 @@ def pick_info(info, sel=(), copy=True, verbose=None):
         Info structure restricted to a selection of channels.
     """
     # avoid circular imports
-    from .meas_info import _bad_chans_comp
+    from .meas_info import _bad_chans_comp, _copy_chs
 
     info._check_consistency()
-    info = info.copy() if copy else info
     if sel is None:
-        return info
+        return info.copy() if copy else info
     elif len(sel) == 0:
         raise ValueError('No channels match the selection.')
     n_unique = len(np.unique(np.arange(len(info['ch_names']))[sel]))
     if n_unique != len(sel):
         raise ValueError('Found %d / %d unique names, sel is not unique'
                          % (n_unique, len(sel)))
+    # only the picked channels are copied below
+    info = info._copy(skip=('chs',)) if copy else info
 
     # make sure required the compensation channels are present
     if len(info.get('comps', [])) > 0:
@@ -501,12 +588,14 @@ def pick_info(info, sel=(), copy=True, verbose=None):
                         'not all compensation channels were picked.'
                         % (len(info['comps']),))
             info['comps'] = []
-    info['chs'] = [info['chs'][k] for k in sel]
+    chs = [info['chs'][k] for k in sel]
+    info['chs'] = _copy_chs(chs) if copy else chs
     info._update_redundant()
     info['bads'] = [ch for ch in info['bads'] if ch in info['ch_names']]
 
     if 'comps' in info:
-        comps = deepcopy(info['comps'])
+        # a copied info already has its own comps
+        comps = info['comps'] if copy else deepcopy(info['comps'])
         for c in comps:
             row_idx = [k for k, n in enumerate(c['data']['row_names'])
                        if n in info['ch_names']]
@@ -723,11 +812,9 @@ def channel_indices_by_type(info, picks=None):
                        fnirs_cw_amplitude=list(), fnirs_od=list())
     picks = _picks_to_idx(info, picks,
                           none='all', exclude=(), allow_empty=True)
-    for k in picks:
-        ch_type = channel_type(info, k)
-        for key in idx_by_type.keys():
-            if ch_type == key:
-                idx_by_type[key].append(k)
+    ch_types = _get_ch_table(info).get_types(info, picks)
+    for key in set(ch_types.tolist()) & set(idx_by_type):
+        idx_by_type[key] = picks[ch_types == key].tolist()
     return idx_by_type
 
 
@@ -828,8 +915,7 @@ def _contains_ch_type(info, ch_type):
     if info is None:
         raise ValueError('Cannot check for channels of type "%s" because info '
                          'is None' % (ch_type,))
-    return any(ch_type == channel_type(info, ii)
-               for ii in range(info['nchan']))
+    return bool((_get_ch_table(info).get_types(info) == ch_type).any())
 
 
 def _picks_by_type(info, meg_combined=False, ref_meg=False, exclude='bads'):
@@ -1049,13 +1135,18 @@ def _picks_str_to_idx(info, picks, exclude, with_ref_meg, return_kind,
     # first: check our special cases
     #
 
+    table = _get_ch_table(info)
     picks_generic = list()
     if len(picks) == 1:
         if picks[0] in ('all', 'data', 'data_or_ica'):
             if picks[0] == 'all':
                 use_exclude = info['bads'] if exclude == 'bads' else exclude
-                picks_generic = pick_channels(
-                    info['ch_names'], info['ch_names'], exclude=use_exclude)
+                _check_excludes_includes(use_exclude)
+                picks_generic = np.ones(len(table.names), bool)
+                for name in use_exclude:
+                    if name in table.name_idx:
+                        picks_generic[table.name_idx[name]] = False
+                picks_generic = np.where(picks_generic)[0]
             elif picks[0] == 'data':
                 picks_generic = _pick_data_channels(info, exclude=exclude,
                                                     with_ref_meg=with_ref_meg)
@@ -1075,8 +1166,8 @@ def _picks_str_to_idx(info, picks, exclude, with_ref_meg, return_kind,
     picks_name = list()
     for pick in picks:
         try:
-            picks_name.append(info['ch_names'].index(pick))
-        except ValueError:
+            picks_name.append(table.name_idx[pick])
+        except KeyError:
             bad_name = pick
             break
 
@@ -1157,7 +1248,7 @@ def _get_channel_types(info, picks=None, unique=False, only_data_chs=False):
     """Get the data channel types in an info instance."""
     none = 'data' if only_data_chs else 'all'
     picks = _picks_to_idx(info, picks, none, (), allow_empty=False)
-    ch_types = [channel_type(info, pick) for pick in picks]
+    ch_types = _get_ch_table(info).get_types(info, picks).tolist()
     if only_data_chs:
         ch_types = [ch_type for ch_type in ch_types
                     if ch_type in _DATA_CH_TYPES_SPLIT]
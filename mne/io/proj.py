@@ -19,7 +19,8 @@ from .pick import pick_types, pick_info
 from .write import (write_int, write_float, write_string, write_name_list,
                     write_float_matrix, end_block, start_block)
 from ..defaults import _BORDER_DEFAULT, _EXTRAPOLATE_DEFAULT
-from ..utils import logger, verbose, warn, fill_doc
+from ..utils import (logger, verbose, warn, fill_doc, object_hash,
+                     _LRUCache)
 
 
 class Projection(dict):
@@ -537,6 +538,11 @@ def make_projector(projs, ch_names, bads=(), include_active=True):
     return _make_projector(projs, ch_names, bads, include_active)
 
 
+# Projectors only depend on the vectors, channels and bads, so the operators
+# are shared by all the Raw, Epochs and Evoked instances that need them
+_projector_cache = _LRUCache(16)
+
+
 def _make_projector(projs, ch_names, bads=(), include_active=True,
                     inplace=False):
     """Subselect projs based on ch_names and bads.
@@ -545,11 +551,29 @@ def _make_projector(projs, ch_names, bads=(), include_active=True,
     warning will be raised next time projectors are constructed with
     the given inputs. If inplace=True, no meaningful data are returned.
     """
-    nchan = len(ch_names)
-    if nchan == 0:
+    if len(ch_names) == 0:
         raise ValueError('No channel names specified')
-
-    default_return = (np.eye(nchan, nchan), 0, np.empty((nchan, 0)))
+    if inplace:
+        return _compute_projector(projs, ch_names, bads, include_active,
+                                  inplace)[:3]
+    key = (object_hash(list(projs) if projs is not None else None),
+           tuple(ch_names), tuple(sorted(set(bads))), bool(include_active))
+    try:
+        proj, nproj, U, msgs = _projector_cache[key]
+    except KeyError:
+        proj, nproj, U, msgs = out = _compute_projector(
+            projs, ch_names, bads, include_active, inplace)
+        _projector_cache[key] = out
+    for msg in msgs:
+        warn(msg)
+    return proj.copy(), nproj, U.copy()
+
+
+def _compute_projector(projs, ch_names, bads, include_active, inplace):
+    """Compute the projector and the warning messages it should emit."""
+    nchan = len(ch_names)
+    msgs = list()
+    default_return = (np.eye(nchan, nchan), 0, np.empty((nchan, 0)), msgs)
 
     #   Check trivial cases first
     if projs is None:
@@ -602,14 +626,15 @@ def _make_projector(projs, ch_names, bads=(), include_active=True,
                     if len(vecsel) < 0.9 * orig_n and not inplace and \
                             (p['kind'] != FIFF.FIFFV_PROJ_ITEM_EEG_AVREF or
                              len(vecsel) == 1):
-                        warn('Projection vector "%s" has magnitude %0.2f '
-                             '(should be unity), applying projector with '
-                             '%s/%s of the original channels available may '
-                             'be dangerous, consider recomputing and adding '
-                             'projection vectors for channels that are '
-                             'eventually used. If this is intentional, '
-                             'consider using info.normalize_proj()'
-                             % (p['desc'], psize, len(vecsel), orig_n))
+                        msgs.append(
+                            'Projection vector "%s" has magnitude %0.2f '
+                            '(should be unity), applying projector with '
+                            '%s/%s of the original channels available may '
+                            'be dangerous, consider recomputing and adding '
+                            'projection vectors for channels that are '
+                            'eventually used. If this is intentional, '
+                            'consider using info.normalize_proj()'
+                            % (p['desc'], psize, len(vecsel), orig_n))
                     this_vecs[:, v] /= psize
                     nonzero += 1
             # If doing "inplace" mode, "fix" the projectors to only operate
@@ -637,7 +662,7 @@ def _make_projector(projs, ch_names, bads=(), include_active=True,
         raise RuntimeError('Application of %d projectors for %d channels '
                            'will yield no components.' % (nproj, nchan))
 
-    return proj, nproj, U
+    return proj, nproj, U, msgs
 
 
 def _normalize_proj(info):
@@ -6,6 +6,7 @@
 
 import hashlib
 import os.path as op
+import pickle
 from datetime import datetime, timedelta, timezone
 
 import pytest
@@ -747,6 +748,37 @@ def test_repr():
     assert 'dev_head_t: MEG device -> isotrak transform' in repr(info)
 
 
+def test_copy_independent():
+    """Test that Info copies and picks do not share mutable entries."""
+    montage = make_standard_montage('standard_1020')
+    info = create_info(montage.ch_names, 1000., 'eeg')
+    info.set_montage(montage)
+    # edits of the original after copying do not leak into the copy
+    chs = info['chs']
+    name = chs[0]['ch_name']
+    info_copy = info.copy()
+    chs[0]['ch_name'] = 'X'
+    chs[1]['loc'][0] = 1.
+    info['dig'][0]['r'][0] = 1.
+    assert info_copy['chs'][0]['ch_name'] == name
+    assert info_copy['chs'][1]['loc'][0] != 1.
+    assert info_copy['dig'][0]['r'][0] != 1.
+    assert type(info_copy['dig'][0]) is type(info['dig'][0])
+    chs[0]['ch_name'] = name
+    # and the other way around
+    info_copy['chs'][2]['loc'][0] = 1.
+    assert info['chs'][2]['loc'][0] != 1.
+    # only the picked channels are copied
+    info_2 = pick_info(info, [1, 0])
+    assert info_2.ch_names == info.ch_names[1::-1]
+    assert info_2['chs'][0] is not info['chs'][1]
+    assert_object_equal(info_2['chs'][0], info['chs'][1])
+    info['chs'][1]['ch_name'] = 'Y'
+    assert info_2['chs'][0]['ch_name'] != 'Y'
+    info['chs'][1]['ch_name'] = info_2['chs'][0]['ch_name']
+    assert_object_equal(pickle.loads(pickle.dumps(info.copy())), info)
+
+
 def test_invalid_subject_birthday():
     """Test handling of an invalid birthday in the raw file."""
     with pytest.warns(RuntimeWarning, match='No birthday will be set'):
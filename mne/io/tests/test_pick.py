@@ -570,6 +570,38 @@ def test_pick_types_deprecation():
     assert list(pick_types(info2, eeg=True)) == [0, 1]
 
 
+def test_pick_cache():
+    """Test that cached picks follow changes to channels and bads."""
+    info = create_info(['a', 'b', 'c', 'd'], 1000.,
+                       ['eeg', 'eeg', 'eog', 'mag'])
+    assert_array_equal(pick_types(info, meg=False, eeg=True), [0, 1])
+    assert_array_equal(pick_types(info, meg=False, eeg=True), [0, 1])
+    assert len(info._ch_table.picks) == 1
+    picks = pick_types(info, meg=False, eeg=True)
+    picks[0] = 3  # modifying the result does not modify the cache
+    assert_array_equal(pick_types(info, meg=False, eeg=True), [0, 1])
+    # bads
+    info['bads'].append('b')
+    assert_array_equal(pick_types(info, meg=False, eeg=True), [0])
+    assert_array_equal(pick_types(info, meg=False, eeg=True, exclude=()),
+                       [0, 1])
+    # in-place modification of channels
+    info['chs'][2]['kind'] = FIFF.FIFFV_EEG_CH
+    assert_array_equal(pick_types(info, meg=False, eeg=True), [0, 2])
+    assert _get_channel_types(info) == ['eeg', 'eeg', 'eeg', 'mag']
+    assert channel_indices_by_type(info)['eeg'] == [0, 1, 2]
+    rename_channels(info, {'a': 'x'})
+    assert_array_equal(_picks_to_idx(info, ['x', 'c']), [0, 2])
+    with pytest.raises(ValueError, match='could not be interpreted'):
+        _picks_to_idx(info, ['a'])
+    # copies share the cache but not the bads
+    info_copy = info.copy()
+    assert info_copy._ch_table is info._ch_table
+    info_copy['bads'] = []
+    assert_array_equal(pick_types(info_copy, meg=False, eeg=True), [0, 1, 2])
+    assert_array_equal(pick_types(info, meg=False, eeg=True), [0, 2])
+
+
 @pytest.mark.parametrize('meg', [True, False, 'grad', 'mag'])
 @pytest.mark.parametrize('eeg', [True, False])
 @pytest.mark.parametrize('ordered', [True, False])
@@ -347,6 +347,30 @@ def test_get_data_reject():
     assert np.isnan(data).sum() == 3072  # but NaNs are introduced instead
 
 
+def test_append_chunks():
+    """Test that appended data are only consolidated on access."""
+    info = create_info(3, 100., 'eeg')
+    rng = np.random.RandomState(0)
+    raws = [RawArray(rng.randn(3, 100 * (ii + 1)), info) for ii in range(4)]
+    want = np.concatenate([r.get_data() for r in raws], axis=1)
+    raw = raws[0].copy()
+    for r in raws[1:]:
+        raw.append(r)
+    assert len(raw._data_chunks) == 4
+    assert raw.n_times == want.shape[1]
+    # later changes to the appended instances must not leak through
+    raws[1]._data.fill(0.)
+    assert_array_equal(raw.get_data(), want)
+    assert len(raw._data_chunks) == 1
+    raw_copy = raws[0].copy()
+    raw_copy.append(raws[2:])
+    raw_copy = raw_copy.copy()
+    assert len(raw_copy._data_chunks) == 3
+    assert_array_equal(raw_copy.get_data(),
+                       np.concatenate([r.get_data() for r in
+                                       [raws[0]] + raws[2:]], axis=1))
+
+
 def test_5839():
     """Test concatenating raw objects with annotations."""
     # Global Time 0         1         2         3         4
@@ -2612,11 +2612,12 @@ def _spatio_temporal_src_adjacency_surf(src, n_times):
         raise ValueError('Vertex mask does not match number of vertices')
     masks = np.concatenate(masks)
     missing = 100 * float(len(masks) - np.sum(masks)) / len(masks)
+    msgs = list()
     if missing:
-        warn('%0.1f%% of original source space vertices have been'
-             ' omitted, tri-based adjacency will have holes.\n'
-             'Consider using distance-based adjacency or '
-             'morphing data to all source space vertices.' % missing)
+        msgs.append('%0.1f%% of original source space vertices have been'
+                    ' omitted, tri-based adjacency will have holes.\n'
+                    'Consider using distance-based adjacency or '
+                    'morphing data to all source space vertices.' % missing)
         masks = np.tile(masks, n_times)
         masks = np.where(masks)[0]
         adjacency = adjacency.tocsr()
@@ -2624,7 +2625,7 @@ def _spatio_temporal_src_adjacency_surf(src, n_times):
         adjacency = adjacency[:, masks]
         # return to original format
         adjacency = adjacency.tocoo()
-    return adjacency
+    return adjacency, msgs
 
 
 @verbose
@@ -2653,6 +2654,7 @@ def spatio_temporal_src_adjacency(src, n_times, dist=None, verbose=None):
         vertices are time 1, the nodes from 2 to 2N are the vertices
         during time 2, etc.
     """
+    from .stats._adjacency import _get_cached_adjacency
     # XXX we should compute adjacency for each source space and then
     # use scipy.sparse.block_diag to concatenate them
     if src[0]['type'] == 'vol':
@@ -2660,12 +2662,23 @@ def spatio_temporal_src_adjacency(src, n_times, dist=None, verbose=None):
             raise ValueError('dist must be None for a volume '
                              'source space. Got %s.' % dist)
 
-        adjacency = _spatio_temporal_src_adjacency_vol(src, n_times)
+        def compute():
+            return _spatio_temporal_src_adjacency_vol(src, 1), []
     elif dist is not None:
         # use distances computed and saved in the source space file
-        adjacency = spatio_temporal_dist_adjacency(src, n_times, dist)
+        return spatio_temporal_dist_adjacency(src, n_times, dist)
     else:
-        adjacency = _spatio_temporal_src_adjacency_surf(src, n_times)
+        def compute():
+            return _spatio_temporal_src_adjacency_surf(src, 1)
+    # the spatial adjacency is cached, and extended over time here
+    adjacency, msgs = _get_cached_adjacency(
+        'src', [(s['type'], s['vertno'], s.get('use_tris'), s.get('shape'))
+                for s in src], compute)
+    for msg in msgs:
+        warn(msg)
+    adjacency = adjacency.tocoo()
+    if n_times > 1:
+        adjacency = _get_adjacency_from_edges(adjacency, n_times)
     return adjacency
 
 
@@ -2789,6 +2802,12 @@ def spatial_src_adjacency(src, dist=None, verbose=None):
     -------
     adjacency : ~scipy.sparse.coo_matrix
         The adjacency matrix describing the spatial graph structure.
+
+    Notes
+    -----
+    The spatial adjacency is cached in memory (and on disk if the
+    ``MNE_CACHE_ADJACENCY`` config variable is ``'true'``), keyed by the
+    source space vertices, so repeated calls are cheap.
     """
     return spatio_temporal_src_adjacency(src, 1, dist)
 
@@ -2859,11 +2878,15 @@ def spatial_inter_hemi_adjacency(src, dist, verbose=None):
         existing intra-hemispheric adjacency matrix, e.g. computed
         using geodesic distances.
     """
-    from scipy.spatial.distance import cdist
+    from scipy.spatial import cKDTree
     src = _ensure_src(src, kind='surface')
-    adj = cdist(src[0]['rr'][src[0]['vertno']],
-                src[1]['rr'][src[1]['vertno']])
-    adj = sparse.csr_matrix(adj <= dist, dtype=int)
+    # neighbors are found with KD-trees, without dense distance matrices
+    trees = [cKDTree(s['rr'][s['vertno']]) for s in src[:2]]
+    neighbors = trees[0].query_ball_tree(trees[1], dist)
+    row = np.repeat(np.arange(len(neighbors)), [len(n) for n in neighbors])
+    col = np.array([c for n in neighbors for c in n], int)
+    adj = sparse.csr_matrix((np.ones(len(row), int), (row, col)),
+                            shape=tuple(len(s['vertno']) for s in src[:2]))
     empties = [sparse.csr_matrix((nv, nv), dtype=int) for nv in adj.shape]
     adj = sparse.vstack([sparse.hstack([empties[0], adj]),
                          sparse.hstack([adj.T, empties[1]])])
@@ -4,12 +4,21 @@
 #
 # License: Simplified BSD
 
+import os
+import os.path as op
+
 import numpy as np
 from scipy import sparse
 
-from ..utils import _validate_type, _check_option
+from ..utils import (_validate_type, _check_option, _LRUCache, object_hash,
+                     get_config, logger, _get_extra_data_path)
 from ..utils.check import int_like
 
+# Adjacency matrices and their channel names (or warnings), keyed by a hash
+# of what they are computed from, shared by the channel and source space
+# adjacency functions
+_adjacency_cache = _LRUCache(64, max_bytes=256 * 1024 ** 2)
+
 
 def combine_adjacency(*structure):
     """Create a sparse binary adjacency/neighbors matrix.
@@ -91,3 +100,53 @@ def combine_adjacency(*structure):
     graph = sparse.coo_matrix((weights, edges),
                               (vertices.size, vertices.size))
     return graph
+
+
+def _get_cached_adjacency(kind, key, compute, disk=True):
+    """Get an adjacency matrix from the cache, computing it if needed.
+
+    ``compute()`` must return a sparse matrix and a list of str. If
+    ``disk`` and the ``MNE_CACHE_ADJACENCY`` config variable is ``'true'``,
+    entries are also stored on disk next to the DPSS tables. Callers get
+    a CSR copy.
+    """
+    key = object_hash((kind, key))
+    out = _adjacency_cache.get(key)
+    if out is None:
+        if disk and get_config('MNE_CACHE_ADJACENCY',
+                               'false').lower() == 'true':
+            out = _get_adjacency_table(kind, key, compute)
+        else:
+            adjacency, names = compute()
+            out = (sparse.csr_matrix(adjacency), list(names))
+        _adjacency_cache[key] = out
+    adjacency, names = out
+    return adjacency.copy(), list(names)
+
+
+def _get_adjacency_table(kind, key, compute):
+    """Compute an adjacency matrix, or read it from the disk cache."""
+    fname = op.join(_get_extra_data_path(), 'tables')
+    if not op.isdir(fname):
+        os.makedirs(fname)
+    fname = op.join(fname, 'adjacency_%s_%032x.npz' % (kind, key))
+    if not op.isfile(fname):
+        logger.info('Generating adjacency table...')
+        adjacency, names = compute()
+        adjacency = sparse.csr_matrix(adjacency)
+        # write to a temporary file first so that concurrent readers never
+        # see a partially written table
+        fname_tmp = '%s.%d.tmp' % (fname, os.getpid())
+        with open(fname_tmp, 'wb') as fid:
+            np.savez(fid, data=adjacency.data, indices=adjacency.indices,
+                     indptr=adjacency.indptr, shape=np.array(adjacency.shape),
+                     names=np.array(names, str))
+        os.replace(fname_tmp, fname)
+    else:
+        logger.info('Reading adjacency table...')
+        with np.load(fname) as table:
+            adjacency = sparse.csr_matrix(
+                (table['data'], table['indices'], table['indptr']),
+                shape=tuple(table['shape']))
+            names = table['names'].tolist()
+    return adjacency, list(names)
@@ -13,270 +13,87 @@
 import numpy as np
 from scipy import sparse
 
-from .parametric import f_oneway, ttest_1samp_no_p
+from .parametric import f_oneway, ttest_1samp_no_p, ttest_ind_no_p
+from ..externals.h5io import read_hdf5, write_hdf5
 from ..parallel import parallel_func, check_n_jobs
-from ..fixes import jit, has_numba
-from ..utils import (split_list, logger, verbose, ProgressBar, warn, _pl,
-                     check_random_state, _check_option, _validate_type)
+from ..fixes import jit
+from ..utils import (logger, verbose, ProgressBar, warn, _pl,
+                     check_random_state, _check_option, _validate_type,
+                     _check_fname)
 from ..source_estimate import SourceEstimate
 
 
-def _get_buddies_fallback(r, s, neighbors, indices=None):
-    if indices is None:
-        buddies = np.where(r)[0]
-    else:
-        buddies = indices[r[indices]]
-    buddies = buddies[np.in1d(s[buddies], neighbors, assume_unique=True)]
-    r[buddies] = False
-    return buddies.tolist()
-
-
-def _get_selves_fallback(r, s, ind, inds, t, t_border, max_step):
-    start = t_border[max(t[ind] - max_step, 0)]
-    stop = t_border[min(t[ind] + max_step + 1, len(t_border) - 1)]
-    indices = inds[start:stop]
-    selves = indices[r[indices]]
-    selves = selves[s[ind] == s[selves]]
-    r[selves] = False
-    return selves.tolist()
-
-
-def _where_first_fallback(x):
-    # this is equivalent to np.where(r)[0] for these purposes, but it's
-    # a little bit faster. Unfortunately there's no way to tell numpy
-    # just to find the first instance (to save checking every one):
-    next_ind = int(np.argmax(x))
-    if next_ind == 0:
-        next_ind = -1
-    return next_ind
-
-
-if has_numba:  # pragma: no cover
-    @jit()
-    def _get_buddies(r, s, neighbors, indices=None):
-        buddies = list()
-        # At some point we might be able to use the sorted-ness of s or
-        # neighbors to further speed this up
-        if indices is None:
-            n_check = len(r)
-        else:
-            n_check = len(indices)
-        for ii in range(n_check):
-            if indices is None:
-                this_idx = ii
-            else:
-                this_idx = indices[ii]
-            if r[this_idx]:
-                this_s = s[this_idx]
-                for ni in range(len(neighbors)):
-                    if this_s == neighbors[ni]:
-                        buddies.append(this_idx)
-                        r[this_idx] = False
-                        break
-        return buddies
-
-    @jit()
-    def _get_selves(r, s, ind, inds, t, t_border, max_step):
-        selves = list()
-        start = t_border[max(t[ind] - max_step, 0)]
-        stop = t_border[min(t[ind] + max_step + 1, len(t_border) - 1)]
-        for ii in range(start, stop):
-            this_idx = inds[ii]
-            if r[this_idx] and s[ind] == s[this_idx]:
-                selves.append(this_idx)
-                r[this_idx] = False
-        return selves
-
-    @jit()
-    def _where_first(x):
-        for ii in range(len(x)):
-            if x[ii]:
-                return ii
-        return -1
-else:  # pragma: no cover
-    # fastest ways we've found with NumPy
-    _get_buddies = _get_buddies_fallback
-    _get_selves = _get_selves_fallback
-    _where_first = _where_first_fallback
-
-
-@jit()
-def _masked_sum(x, c):
-    return np.sum(x[c])
-
-
-@jit()
-def _masked_sum_power(x, c, t_power):
-    return np.sum(np.sign(x[c]) * np.abs(x[c]) ** t_power)
-
-
 @jit()
 def _sum_cluster_data(data, tstep):
     return np.sign(data) * np.logical_not(data == 0) * tstep
 
 
-def _get_clusters_spatial(s, neighbors):
-    """Form spatial clusters using neighbor lists.
+class _STAdjacency(object):
+    """Implicit spatio-temporal adjacency.
 
-    This is equivalent to _get_components with n_times = 1, with a properly
-    reconfigured adjacency matrix (formed as "neighbors" list)
+    The spatial graph (in CSR form) is repeated at each time point, and each
+    vertex is connected to itself up to ``max_step`` time points apart. The
+    full (n_times * n_vertices) graph is never built.
     """
-    # s is a vector of spatial indices that are significant, like:
-    #     s = np.where(x_in)[0]
-    # for x_in representing a single time-instant
-    r = np.ones(s.shape, bool)
-    clusters = list()
-    next_ind = 0 if s.size > 0 else -1
-    while next_ind >= 0:
-        # put first point in a cluster, adjust remaining
-        t_inds = [next_ind]
-        r[next_ind] = 0
-        icount = 1  # count of nodes in the current cluster
-        while icount <= len(t_inds):
-            ind = t_inds[icount - 1]
-            # look across other vertices
-            buddies = _get_buddies(r, s, neighbors[s[ind]])
-            t_inds.extend(buddies)
-            icount += 1
-        next_ind = _where_first(r)
-        clusters.append(s[t_inds])
-    return clusters
-
-
-def _reassign(check, clusters, base, num):
-    """Reassign cluster numbers."""
-    # reconfigure check matrix
-    check[check == num] = base
-    # concatenate new values into clusters array
-    clusters[base - 1] = np.concatenate((clusters[base - 1],
-                                         clusters[num - 1]))
-    clusters[num - 1] = np.array([], dtype=int)
 
-
-def _get_clusters_st_1step(keepers, neighbors):
-    """Directly calculate clusters.
-
-    This uses knowledge that time points are
-    only adjacent to immediate neighbors for data organized as time x space.
-
-    This algorithm time increases linearly with the number of time points,
-    compared to with the square for the standard (graph) algorithm.
-
-    This algorithm creates clusters for each time point using a method more
-    efficient than the standard graph method (but otherwise equivalent), then
-    combines these clusters across time points in a reasonable way.
-    """
-    n_src = len(neighbors)
-    n_times = len(keepers)
-    # start cluster numbering at 1 for diffing convenience
-    enum_offset = 1
-    check = np.zeros((n_times, n_src), dtype=int)
-    clusters = list()
-    for ii, k in enumerate(keepers):
-        c = _get_clusters_spatial(k, neighbors)
-        for ci, cl in enumerate(c):
-            check[ii, cl] = ci + enum_offset
-        enum_offset += len(c)
-        # give them the correct offsets
-        c = [cl + ii * n_src for cl in c]
-        clusters += c
-
-    # now that each cluster has been assigned a unique number, combine them
-    # by going through each time point
-    for check1, check2, k in zip(check[:-1], check[1:], keepers[:-1]):
-        # go through each one that needs reassignment
-        inds = k[check2[k] - check1[k] > 0]
-        check1_d = check1[inds]
-        n = check2[inds]
-        nexts = np.unique(n)
-        for num in nexts:
-            prevs = check1_d[n == num]
-            base = np.min(prevs)
-            for pr in np.unique(prevs[prevs != base]):
-                _reassign(check1, clusters, base, pr)
-            # reassign values
-            _reassign(check2, clusters, base, num)
-    # clean up clusters
-    clusters = [cl for cl in clusters if len(cl) > 0]
-    return clusters
-
-
-def _get_clusters_st_multistep(keepers, neighbors, max_step=1):
-    """Directly calculate clusters.
-
-    This uses knowledge that time points are
-    only adjacent to immediate neighbors for data organized as time x space.
-
-    This algorithm time increases linearly with the number of time points,
-    compared to with the square for the standard (graph) algorithm.
+    def __init__(self, spatial, n_times):
+        # we claim to only use upper triangular part... not true here
+        spatial = (spatial + spatial.transpose()).tocsr()
+        self.indptr = spatial.indptr
+        self.indices = spatial.indices
+        self.n_vertices = spatial.shape[0]
+        self.n_times = n_times
+
+    def spatial_edges(self):
+        """Get the (row, col) edges of the spatial graph."""
+        row = np.repeat(np.arange(self.n_vertices), np.diff(self.indptr))
+        return row, self.indices
+
+
+def _labels_to_clusters(idx, labels):
+    """Split point indices into clusters of points sharing the same label."""
+    order = np.argsort(labels, kind='stable')
+    idx = idx[order]
+    bounds = np.flatnonzero(np.diff(labels[order])) + 1
+    bounds = [0] + bounds.tolist() + [len(idx)]
+    return [idx[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def _get_clusters_st(x_in, adjacency, max_step=1):
+    """Get spatio-temporal clusters from a mask and an implicit adjacency.
+
+    The graph of the suprathreshold points is assembled directly: spatial
+    neighbors at the same time point, and the same vertex up to ``max_step``
+    time points apart. Clusters are its connected components, ordered by
+    their first point.
     """
-    n_src = len(neighbors)
-    n_times = len(keepers)
-    t_border = list()
-    t_border.append(0)
-    for ki, k in enumerate(keepers):
-        keepers[ki] = k + ki * n_src
-        t_border.append(t_border[ki] + len(k))
-    t_border = np.array(t_border)
-    keepers = np.concatenate(keepers)
-    v = keepers
-    t, s = divmod(v, n_src)
-
-    r = np.ones(t.shape, dtype=bool)
-    clusters = list()
-    inds = np.arange(t_border[0], t_border[n_times])
-    next_ind = 0 if s.size > 0 else -1
-    while next_ind >= 0:
-        # put first point in a cluster, adjust remaining
-        t_inds = [next_ind]
-        r[next_ind] = False
-        icount = 1  # count of nodes in the current cluster
-        # look for significant values at the next time point,
-        # same sensor, not placed yet, and add those
-        while icount <= len(t_inds):
-            ind = t_inds[icount - 1]
-            selves = _get_selves(r, s, ind, inds, t, t_border, max_step)
-
-            # look at current time point across other vertices
-            these_inds = inds[t_border[t[ind]]:t_border[t[ind] + 1]]
-            buddies = _get_buddies(r, s, neighbors[s[ind]], these_inds)
-
-            t_inds += buddies + selves
-            icount += 1
-        next_ind = _where_first(r)
-        clusters.append(v[t_inds])
-
-    return clusters
-
-
-def _get_clusters_st(x_in, neighbors, max_step=1):
-    """Choose the most efficient version."""
-    n_src = len(neighbors)
-    n_times = x_in.size // n_src
-    cl_goods = np.where(x_in)[0]
-    if len(cl_goods) > 0:
-        keepers = [np.array([], dtype=int)] * n_times
-        row, col = np.unravel_index(cl_goods, (n_times, n_src))
-        lims = [0]
-        if isinstance(row, int):
-            row = [row]
-            col = [col]
-        else:
-            order = np.argsort(row)
-            row = row[order]
-            col = col[order]
-            lims += (np.where(np.diff(row) > 0)[0] + 1).tolist()
-            lims.append(len(row))
-
-        for start, end in zip(lims[:-1], lims[1:]):
-            keepers[row[start]] = np.sort(col[start:end])
-        if max_step == 1:
-            return _get_clusters_st_1step(keepers, neighbors)
-        else:
-            return _get_clusters_st_multistep(keepers, neighbors,
-                                              max_step)
-    else:
+    from scipy.sparse.csgraph import connected_components
+    n_src = adjacency.n_vertices
+    idx = np.flatnonzero(x_in)
+    if len(idx) == 0:
         return []
+    t, s = divmod(idx, n_src)
+    pos = np.full(x_in.size, -1)
+    pos[idx] = np.arange(len(idx))
+    # spatial neighbors of each point, at the same time point
+    indptr, indices = adjacency.indptr, adjacency.indices
+    n_neighbors = indptr[s + 1] - indptr[s]
+    row = np.repeat(np.arange(len(idx)), n_neighbors)
+    offsets = np.arange(len(row)) - np.repeat(
+        np.cumsum(n_neighbors) - n_neighbors, n_neighbors)
+    col = pos[t[row] * n_src + indices[indptr[s[row]] + offsets]]
+    rows, cols = [row[col >= 0]], [col[col >= 0]]
+    # the same vertex at later time points
+    for step in range(1, max_step + 1):
+        this_row = np.flatnonzero(idx + step * n_src < x_in.size)
+        col = pos[idx[this_row] + step * n_src]
+        rows.append(this_row[col >= 0])
+        cols.append(col[col >= 0])
+    row, col = np.concatenate(rows), np.concatenate(cols)
+    graph = sparse.coo_matrix((np.ones(len(row)), (row, col)),
+                              shape=(len(idx), len(idx)))
+    _, labels = connected_components(graph)
+    return _labels_to_clusters(idx, labels)
 
 
 def _get_components(x_in, adjacency, return_list=True):
@@ -297,15 +114,9 @@ def _get_components(x_in, adjacency, return_list=True):
         adjacency = sparse.coo_matrix((data, (row, col)), shape=shape)
         _, components = connected_components(adjacency)
     if return_list:
-        start = np.min(components)
-        stop = np.max(components)
-        comp_list = [list() for i in range(start, stop + 1, 1)]
-        mask = np.zeros(len(comp_list), dtype=bool)
-        for ii, comp in enumerate(components):
-            comp_list[comp].append(ii)
-            mask[comp] += x_in[ii]
-        clusters = [np.array(k) for k, m in zip(comp_list, mask) if m]
-        return clusters
+        # points outside the mask are not connected to any other point
+        idx = np.flatnonzero(x_in)
+        return _labels_to_clusters(idx, components[idx])
     else:
         return components
 
@@ -327,17 +138,17 @@ def _find_clusters(x, threshold, tail=0, adjacency=None, max_step=1,
         threshold-free cluster enhancement.
     tail : -1 | 0 | 1
         Type of comparison
-    adjacency : scipy.sparse.coo_matrix, None, or list
+    adjacency : scipy.sparse.coo_matrix, None, or _STAdjacency
         Defines adjacency between features. The matrix is assumed to
         be symmetric and only the upper triangular half is used.
-        If adjacency is a list, it is assumed that each entry stores the
-        indices of the spatial neighbors in a spatio-temporal dataset x.
+        If adjacency is a _STAdjacency, it defines the spatial adjacency of
+        a spatio-temporal dataset x.
         Default is None, i.e, a regular lattice adjacency.
         False means no adjacency.
     max_step : int
-        If adjacency is a list, this defines the maximal number of steps
-        between vertices along the second dimension (typically time) to be
-        considered adjacent.
+        If adjacency is a _STAdjacency, this defines the maximal number of
+        steps between vertices along the second dimension (typically time) to
+        be considered adjacent.
     include : 1D bool array or None
         Mask to apply to the data of points to cluster. If None, all points
         are used.
@@ -419,10 +230,29 @@ def _find_clusters(x, threshold, tail=0, adjacency=None, max_step=1,
     if tail == -1 and not np.all(np.diff(thresholds) < 0):
         raise ValueError('Thresholds must be monotonically decreasing')
 
+    if tfce:
+        # the score of each point is the sum of the h^H * e^E for each
+        # supporting section "rectangle" h x e.
+        hs = np.abs(np.diff(np.concatenate([[0.], thresholds]))) ** h_power
+        # 1D clusters without adjacency are 1-tuples of slices, whose extent
+        # has always been taken as len(c) == 1, i.e., as if not adjacent
+        edges = _get_tfce_edges(
+            x.shape, False if adjacency is None and x.ndim == 1 else adjacency,
+            max_step, partitions)
+        include = include.ravel()
+        # loop over tails, a point can only be supported by one of them
+        signs = [1, -1] if tail == 0 else [tail]
+        levels = -thresholds if tail == -1 else thresholds
+        for sign in signs:
+            x_sign = np.where(include, sign * x.ravel(), -np.inf)
+            x_sign[np.isnan(x_sign)] = -np.inf
+            _tfce_sweep(x_sign, levels, hs, edges, e_power, scores)
+        thresholds = list()  # no need to find the clusters of each level
+
     # set these here just in case thresholds == []
     clusters = list()
     sums = list()
-    for ti, thresh in enumerate(thresholds):
+    for thresh in thresholds:
         # these need to be reset on each run
         clusters = list()
         if tail == 0:
@@ -440,25 +270,6 @@ def _find_clusters(x, threshold, tail=0, adjacency=None, max_step=1,
                                                 ndimage)
                 clusters += out[0]
                 sums.append(out[1])
-        if tfce:
-            # the score of each point is the sum of the h^H * e^E for each
-            # supporting section "rectangle" h x e.
-            if ti == 0:
-                h = abs(thresh)
-            else:
-                h = abs(thresh - thresholds[ti - 1])
-            h = h ** h_power
-            for c in clusters:
-                # triage based on cluster storage type
-                if isinstance(c, slice):
-                    len_c = c.stop - c.start
-                elif isinstance(c, tuple):
-                    len_c = len(c)
-                elif c.dtype == bool:
-                    len_c = np.sum(c)
-                else:
-                    len_c = len(c)
-                scores[c] += h * (len_c ** e_power)
     # turn sums into array
     sums = np.concatenate(sums) if sums else np.array([])
     if tfce:
@@ -478,12 +289,89 @@ def _find_clusters(x, threshold, tail=0, adjacency=None, max_step=1,
     return clusters, sums
 
 
+def _get_tfce_edges(shape, adjacency, max_step, partitions):
+    """Get the edges of the graph in which TFCE clusters are formed.
+
+    Returns two arrays of (raveled) point indices. Points in different
+    partitions are never connected.
+    """
+    n_tests = int(np.prod(shape))
+    if adjacency is None:  # regular lattice, as in ndimage.label
+        idx = np.arange(n_tests).reshape(shape)
+        edges = [(idx.take(np.arange(n - 1), axis=ai).ravel(),
+                  idx.take(np.arange(1, n), axis=ai).ravel())
+                 for ai, n in enumerate(shape)]
+    elif adjacency is False:
+        edges = list()
+    elif isinstance(adjacency, _STAdjacency):  # spatial edges at each time
+        n_src = adjacency.n_vertices
+        spatial = adjacency.spatial_edges()
+        offsets = np.arange(0, n_tests, n_src)[:, np.newaxis]
+        edges = [((offsets + spatial[0]).ravel(),
+                  (offsets + spatial[1]).ravel())]
+        for step in range(1, max_step + 1):  # same vertex across time
+            idx = np.arange(max(n_tests - step * n_src, 0))
+            edges.append((idx, idx + step * n_src))
+    elif isinstance(adjacency, sparse.spmatrix):
+        edges = [(adjacency.row, adjacency.col)]
+    else:
+        raise ValueError('adjacency must be a sparse matrix or '
+                         '_STAdjacency')
+    edges = [np.concatenate([e[ii] for e in edges]) if edges else
+             np.array([], int) for ii in range(2)]
+    if partitions is not None:
+        mask = partitions[edges[0]] == partitions[edges[1]]
+        edges = [e[mask] for e in edges]
+    return edges
+
+
+def _tfce_sweep(x, levels, hs, edges, e_power, scores):
+    """Add the TFCE scores of the points above increasing levels in place.
+
+    The points are sorted once. As the level increases, the points above it
+    are a shrinking prefix of the sorted points, and the edges between them
+    a shrinking prefix of the edges sorted by their lower point. The
+    clusters of each level are the connected components of these prefixes.
+    """
+    from scipy.sparse.csgraph import connected_components
+    order = np.argsort(-x, kind='stable')
+    rank = np.empty(len(x), int)
+    rank[order] = np.arange(len(x))
+    # number of points above each level
+    n_points = np.searchsorted(-x[order], -levels)
+    if len(n_points) == 0 or n_points[0] == 0:
+        return
+    # an edge is present once both of its points are above the level
+    edge_rank = np.maximum(rank[edges[0]], rank[edges[1]])
+    keep = np.where(edge_rank < n_points[0])[0]
+    keep = keep[np.argsort(edge_rank[keep], kind='stable')]
+    row, col = rank[edges[0][keep]], rank[edges[1][keep]]
+    n_edges = np.searchsorted(edge_rank[keep], n_points)
+    for h, n_point, n_edge in zip(hs, n_points, n_edges):
+        if n_point == 0:
+            break
+        graph = sparse.coo_matrix(
+            (np.ones(n_edge), (row[:n_edge], col[:n_edge])),
+            shape=(n_point, n_point))
+        _, labels = connected_components(graph)
+        scores[order[:n_point]] += h * np.bincount(labels)[labels] ** e_power
+
+
 def _find_clusters_1dir_parts(x, x_in, adjacency, max_step, partitions,
                               t_power, ndimage):
     """Deal with partitions, and pass the work to _find_clusters_1dir."""
     if partitions is None:
         clusters, sums = _find_clusters_1dir(x, x_in, adjacency, max_step,
                                              t_power, ndimage)
+    elif adjacency is not None:
+        # partitions are disjoint in the graph, so cluster everything at once
+        # and order the clusters as if each partition had been done in turn
+        clusters, sums = _find_clusters_1dir(x, x_in, adjacency, max_step,
+                                             t_power, ndimage)
+        order = np.argsort([partitions[c[0]] for c in clusters],
+                           kind='stable')
+        clusters = [clusters[ii] for ii in order]
+        sums = sums[order]
     else:
         # cluster each partition separately
         clusters = list()
@@ -535,14 +423,22 @@ def _find_clusters_1dir(x, x_in, adjacency, max_step, t_power, ndimage):
                             "to define clusters.")
         if isinstance(adjacency, sparse.spmatrix) or adjacency is False:
             clusters = _get_components(x_in, adjacency)
-        elif isinstance(adjacency, list):  # use temporal adjacency
+        elif isinstance(adjacency, _STAdjacency):  # use temporal adjacency
             clusters = _get_clusters_st(x_in, adjacency, max_step)
         else:
-            raise ValueError('adjacency must be a sparse matrix or list')
-        if t_power == 1:
-            sums = [_masked_sum(x, c) for c in clusters]
+            raise ValueError('adjacency must be a sparse matrix or '
+                             '_STAdjacency')
+        # sum all clusters at once
+        if len(clusters) > 0:
+            idx = np.concatenate(clusters)
+            labels = np.repeat(np.arange(len(clusters)),
+                               [len(c) for c in clusters])
+            x_sum = x[idx]
+            if t_power != 1:
+                x_sum = np.sign(x_sum) * np.abs(x_sum) ** t_power
+            sums = np.bincount(labels, x_sum, len(clusters))
         else:
-            sums = [_masked_sum_power(x, c, t_power) for c in clusters]
+            sums = list()
 
     return clusters, np.atleast_1d(sums)
 
@@ -596,14 +492,99 @@ def _setup_adjacency(adjacency, n_tests, n_times):
                 'the fwd["src"] or inv["src"] as some original source space '
                 'vertices can be excluded during forward computation'
                 % (adjacency.shape[0], n_tests))
-        # we claim to only use upper triangular part... not true here
-        adjacency = (adjacency + adjacency.transpose()).tocsr()
-        adjacency = [
-            adjacency.indices[adjacency.indptr[i]:adjacency.indptr[i + 1]]
-            for i in range(len(adjacency.indptr) - 1)]
+        adjacency = _STAdjacency(adjacency, n_times)
     return adjacency
 
 
+def _get_batch_stat_fun(stat_fun, slices):
+    """Get a function evaluating stat_fun for a block of permutations.
+
+    Only the default statistics are supported; for these the statistic of
+    each permutation can be obtained from per-group sums, which for a block
+    of permutations are a single matrix product with the data. Returns None
+    for other statistics.
+    """
+    if slices is None:
+        if stat_fun is not ttest_1samp_no_p:
+            return None
+
+        def batch_fun(X, orders):
+            n_samp = X.shape[0]
+            signs = 2. * np.array(orders, float) - 1.
+            mean = np.dot(signs, X) / n_samp
+            # the variance needs a second pass over the samples, the sum of
+            # squares minus the squared mean is inaccurate for large offsets
+            var = np.zeros_like(mean)
+            for sign, x in zip(signs.T, X):
+                var += (sign[:, np.newaxis] * x - mean) ** 2
+            var /= n_samp - 1
+            return mean / np.sqrt(var / n_samp)
+    else:
+        if not (stat_fun is f_oneway or
+                (stat_fun is ttest_ind_no_p and len(slices) == 2)):
+            return None
+        n_per = np.array([s.stop - s.start for s in slices], float)
+        assert len(n_per) > 1
+
+        def batch_fun(X, orders):
+            n_samp = X.shape[0]
+            orders = np.array(orders)
+            # the statistics do not change with an offset, removing it keeps
+            # the sums of squares below accurate
+            X = X - np.mean(X, axis=0)
+            # indicator of group membership under each permutation
+            groups = np.zeros((len(orders), len(slices), n_samp))
+            perm_idx = np.arange(len(orders))[:, np.newaxis]
+            for gi, s in enumerate(slices):
+                groups[perm_idx, gi, orders[:, s]] = 1.
+            sums = np.dot(groups.reshape(-1, n_samp), X)
+            sums.shape = (len(orders), len(slices), X.shape[1])
+            # the total sums do not change with relabeling
+            sum_all = np.sum(X, axis=0)
+            ss_all = np.sum(X * X, axis=0) - sum_all * sum_all / n_samp
+            ssbn = np.sum(sums * sums / n_per[:, np.newaxis], axis=1)
+            ssbn -= sum_all * sum_all / n_samp
+            sswn = ss_all - ssbn
+            if stat_fun is f_oneway:
+                out = ssbn / (len(slices) - 1)
+                out /= sswn / (n_samp - len(slices))
+            else:
+                var = sswn / (n_samp - 2.) * (1. / n_per[0] + 1. / n_per[1])
+                out = sums[:, 0] / n_per[0] - sums[:, 1] / n_per[1]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    out /= np.sqrt(var)
+            return out
+    return batch_fun
+
+
+def _get_n_block(X):
+    """Get the number of orders whose statistics are computed together."""
+    # about 8 MB per array of statistics (or of signs or group indicators),
+    # and at most 128 orders so they still split evenly between jobs/shards
+    return min(max(2 ** 20 // max(X.shape), 1), 128)
+
+
+def _split_orders(orders, n_splits, n_block):
+    """Split the orders in contiguous parts, at multiples of n_block.
+
+    This keeps the blocks of batched statistics the same however the orders
+    are split (between jobs or shards), so the results are identical.
+    """
+    n_blocks = -(-len(orders) // n_block)
+    bounds = np.minimum(
+        n_block * (np.arange(n_splits + 1) * n_blocks // n_splits),
+        len(orders))
+    return [(np.arange(start, stop), orders[start:stop])
+            for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def _iter_batch_stats(X, orders, batch_fun, n_block):
+    """Yield the statistic for each order, computed in blocks of orders."""
+    for start in range(0, len(orders), n_block):
+        for t_obs_surr in batch_fun(X, orders[start:start + n_block]):
+            yield t_obs_surr
+
+
 def _do_permutations(X_full, slices, threshold, tail, adjacency, stat_fun,
                      max_step, include, partitions, t_power, orders,
                      sample_shape, buffer_size, progress_bar):
@@ -620,12 +601,19 @@ def _do_permutations(X_full, slices, threshold, tail, adjacency, stat_fun,
         X_buffer = [np.empty((len(X_full[s]), buffer_size), dtype=X_full.dtype)
                     for s in slices]
 
+    batch_fun = _get_batch_stat_fun(stat_fun, slices)
+    if batch_fun is not None:
+        batch_stats = _iter_batch_stats(X_full, orders, batch_fun,
+                                        _get_n_block(X_full))
+
     for seed_idx, order in enumerate(orders):
         # shuffle sample indices
         assert order is not None
         idx_shuffle_list = [order[s] for s in slices]
 
-        if buffer_size is None:
+        if batch_fun is not None:
+            t_obs_surr = next(batch_stats)
+        elif buffer_size is None:
             # shuffle all data at once
             X_shuffle_list = [X_full[idx, :] for idx in idx_shuffle_list]
             t_obs_surr = stat_fun(*X_shuffle_list)
@@ -683,6 +671,10 @@ def _do_1samp_permutations(X, slices, threshold, tail, adjacency, stat_fun,
         # allocate a buffer so we don't need to allocate memory in loop
         X_flip_buffer = np.empty((n_samp, buffer_size), dtype=X.dtype)
 
+    batch_fun = _get_batch_stat_fun(stat_fun, slices)
+    if batch_fun is not None:
+        batch_stats = _iter_batch_stats(X, orders, batch_fun, _get_n_block(X))
+
     for seed_idx, order in enumerate(orders):
         assert isinstance(order, np.ndarray)
         # new surrogate data with specified sign flip
@@ -691,7 +683,9 @@ def _do_1samp_permutations(X, slices, threshold, tail, adjacency, stat_fun,
         if not np.all(np.equal(np.abs(signs), 1)):
             raise ValueError('signs from rng must be +/- 1')
 
-        if buffer_size is None:
+        if batch_fun is not None:
+            t_obs_surr = next(batch_stats)
+        elif buffer_size is None:
             # be careful about non-writable memmap (GH#1507)
             if X.flags.writeable:
                 X *= signs
@@ -774,8 +768,13 @@ def bin_perm_rep(ndim, a=0, b=1):
     return perms
 
 
-def _get_1samp_orders(n_samples, n_permutations, tail, rng):
-    """Get the 1samp orders."""
+def _get_1samp_orders(n_samples, n_permutations, tail, rng, codes=False):
+    """Get the 1samp orders.
+
+    If codes is True and n_samples <= 20, the orders are returned as an array
+    of integers whose binary representations are the orders (see
+    _codes_to_orders), which uses much less memory.
+    """
     max_perms = 2 ** (n_samples - (tail == 0)) - 1
     extra = ''
     if isinstance(n_permutations, str):
@@ -787,11 +786,17 @@ def _get_1samp_orders(n_samples, n_permutations, tail, rng):
         # omit first perm b/c accounted for in H0.append() later;
         # convert to binary array representation
         extra = ' (exact test)'
-        orders = bin_perm_rep(n_samples)[1:max_perms + 1]
+        if codes and n_samples <= 20:
+            orders = np.arange(1, max_perms + 1)
+        else:
+            orders = bin_perm_rep(n_samples)[1:max_perms + 1]
     elif n_samples <= 20:  # fast way to do it for small(ish) n_samples
         orders = rng.choice(max_perms, n_permutations - 1, replace=False)
-        orders = [np.fromiter(np.binary_repr(s + 1, n_samples), dtype=int)
-                  for s in orders]
+        if codes:
+            orders = orders + 1
+        else:
+            orders = [np.fromiter(np.binary_repr(s + 1, n_samples), dtype=int)
+                      for s in orders]
     else:  # n_samples >= 64
         # Here we can just use the hash-table (w/collision detection)
         # functionality of a dict to ensure uniqueness
@@ -815,10 +820,15 @@ def _get_1samp_orders(n_samples, n_permutations, tail, rng):
     return orders, n_permutations, extra
 
 
+def _codes_to_orders(codes, n_samples):
+    """Convert integer codes to orders (their binary representations)."""
+    return (codes[:, np.newaxis] >> np.arange(n_samples - 1, -1, -1)) & 1
+
+
 def _permutation_cluster_test(X, threshold, n_permutations, tail, stat_fun,
                               adjacency, n_jobs, seed, max_step,
                               exclude, step_down_p, t_power, out_type,
-                              check_disjoint, buffer_size):
+                              check_disjoint, buffer_size, shard=None):
     n_jobs = check_n_jobs(n_jobs)
     """Aux Function.
 
@@ -834,6 +844,14 @@ def _permutation_cluster_test(X, threshold, n_permutations, tail, stat_fun,
                 tail == 0 and threshold < 0):
             raise ValueError('incompatible tail and threshold signs, got '
                              '%s and %s' % (tail, threshold))
+    if shard is not None:
+        _validate_type(shard, tuple, 'shard')
+        if len(shard) != 2 or not 0 <= shard[0] < shard[1]:
+            raise ValueError('shard must be a tuple (index, n_shards) with '
+                             '0 <= index < n_shards, got %s' % (shard,))
+        if step_down_p > 0:
+            raise ValueError('step_down_p must be 0 when using shard, got %s'
+                             % (step_down_p,))
 
     # check dimensions for each group in X (a list at this stage).
     X = [x[:, np.newaxis] if x.ndim == 1 else x for x in X]
@@ -943,9 +961,22 @@ def _permutation_cluster_test(X, threshold, n_permutations, tail, stat_fun,
     del rng
     parallel, my_do_perm_func, _ = parallel_func(
         do_perm_func, n_jobs, verbose=False)
+    if _get_batch_stat_fun(stat_fun, slices) is None:
+        n_block = 1
+    else:
+        n_block = _get_n_block(X_full)
+    if shard is not None:
+        # each shard takes a contiguous part of the same permutations
+        n_orders = len(orders)
+        orders = _split_orders(orders, shard[1], n_block)[shard[0]][1]
+        out = dict(t_obs=t_obs, clusters=list(), cluster_stats=np.array([]),
+                   H0=np.array([]), tail=tail, shard=shard[0],
+                   n_shards=shard[1], n_permutations=n_orders + 1)
 
     if len(clusters) == 0:
         warn('No clusters found, returning empty H0, clusters, and cluster_pv')
+        if shard is not None:
+            return out
         return t_obs, np.array([]), np.array([]), np.array([])
 
     # Step 2: If we have some clusters, repeat process on permuted data
@@ -972,16 +1003,12 @@ def _permutation_cluster_test(X, threshold, n_permutations, tail, stat_fun,
                                 stat_fun, max_step, this_include, partitions,
                                 t_power, order, sample_shape, buffer_size,
                                 progress_bar.subset(idx))
-                for idx, order in split_list(orders, n_jobs, idx=True))
-        # include original (true) ordering
-        if tail == -1:  # up tail
-            orig = cluster_stats.min()
-        elif tail == 1:
-            orig = cluster_stats.max()
-        else:
-            orig = abs(cluster_stats).max()
-        H0.insert(0, [orig])
-        H0 = np.concatenate(H0)
+                for idx, order in _split_orders(orders, n_jobs, n_block))
+        if shard is not None:  # p-values need the H0 of all shards
+            out.update(clusters=_reshape_clusters(clusters, sample_shape),
+                       cluster_stats=cluster_stats, H0=np.concatenate(H0))
+            return out
+        H0 = _get_h0(cluster_stats, H0, tail)
         logger.info('Computing cluster p-values')
         cluster_pv = _pval_from_histogram(cluster_stats, H0, tail)
 
@@ -1007,6 +1034,17 @@ def _permutation_cluster_test(X, threshold, n_permutations, tail, stat_fun,
     return t_obs, clusters, cluster_pv, H0
 
 
+def _get_h0(cluster_stats, H0_parts, tail):
+    """Combine the H0 parts with the statistic of the original ordering."""
+    if tail == -1:  # up tail
+        orig = cluster_stats.min()
+    elif tail == 1:
+        orig = cluster_stats.max()
+    else:
+        orig = abs(cluster_stats).max()
+    return np.concatenate([[orig]] + list(H0_parts))
+
+
 def _check_fun(X, stat_fun, threshold, tail=0, kind='within'):
     """Check the stat_fun and threshold values."""
     from scipy import stats
@@ -1046,7 +1084,7 @@ def permutation_cluster_test(
         X, threshold=None, n_permutations=1024, tail=0, stat_fun=None,
         adjacency=None, n_jobs=1, seed=None, max_step=1, exclude=None,
         step_down_p=0, t_power=1, out_type=None, check_disjoint=False,
-        buffer_size=1000, connectivity=None, verbose=None):
+        buffer_size=1000, connectivity=None, shard=None, verbose=None):
     """Cluster-level statistical permutation test.
 
     For a list of :class:`NumPy arrays <numpy.ndarray>` of data,
@@ -1089,6 +1127,7 @@ def permutation_cluster_test(
     %(clust_disjoint)s
     %(clust_buffer)s
     %(clust_con_dep)s
+    %(clust_shard)s
     %(verbose)s
 
     Returns
@@ -1118,7 +1157,7 @@ def permutation_cluster_test(
         stat_fun=stat_fun, adjacency=adjacency, n_jobs=n_jobs, seed=seed,
         max_step=max_step, exclude=exclude, step_down_p=step_down_p,
         t_power=t_power, out_type=out_type, check_disjoint=check_disjoint,
-        buffer_size=buffer_size)
+        buffer_size=buffer_size, shard=shard)
 
 
 @verbose
@@ -1127,7 +1166,7 @@ def permutation_cluster_1samp_test(
         adjacency=None, n_jobs=1, seed=None, max_step=1,
         exclude=None, step_down_p=0, t_power=1, out_type=None,
         check_disjoint=False, buffer_size=1000, connectivity=None,
-        verbose=None):
+        shard=None, verbose=None):
     """Non-parametric cluster-level paired t-test.
 
     Parameters
@@ -1157,6 +1196,7 @@ def permutation_cluster_1samp_test(
     %(clust_disjoint)s
     %(clust_buffer)s
     %(clust_con_dep)s
+    %(clust_shard)s
     %(verbose)s
 
     Returns
@@ -1210,7 +1250,7 @@ def permutation_cluster_1samp_test(
         stat_fun=stat_fun, adjacency=adjacency, n_jobs=n_jobs, seed=seed,
         max_step=max_step, exclude=exclude, step_down_p=step_down_p,
         t_power=t_power, out_type=out_type, check_disjoint=check_disjoint,
-        buffer_size=buffer_size)
+        buffer_size=buffer_size, shard=shard)
 
 
 @verbose
@@ -1219,7 +1259,7 @@ def spatio_temporal_cluster_1samp_test(
         stat_fun=None, adjacency=None, n_jobs=1, seed=None,
         max_step=1, spatial_exclude=None, step_down_p=0, t_power=1,
         out_type='indices', check_disjoint=False, buffer_size=1000,
-        connectivity=None, verbose=None):
+        connectivity=None, shard=None, verbose=None):
     """Non-parametric cluster-level paired t-test for spatio-temporal data.
 
     This function provides a convenient wrapper for
@@ -1248,6 +1288,7 @@ def spatio_temporal_cluster_1samp_test(
     %(clust_disjoint)s
     %(clust_buffer)s
     %(clust_con_dep)s
+    %(clust_shard)s
     %(verbose)s
 
     Returns
@@ -1278,7 +1319,8 @@ def spatio_temporal_cluster_1samp_test(
         n_permutations=n_permutations, adjacency=adjacency,
         n_jobs=n_jobs, seed=seed, max_step=max_step, exclude=exclude,
         step_down_p=step_down_p, t_power=t_power, out_type=out_type,
-        check_disjoint=check_disjoint, buffer_size=buffer_size)
+        check_disjoint=check_disjoint, buffer_size=buffer_size,
+        shard=shard)
 
 
 def _dep_con(adjacency, connectivity):
@@ -1295,7 +1337,7 @@ def spatio_temporal_cluster_test(
         adjacency=None, n_jobs=1, seed=None, max_step=1,
         spatial_exclude=None, step_down_p=0, t_power=1, out_type='indices',
         check_disjoint=False, buffer_size=1000, connectivity=None,
-        verbose=None):
+        shard=None, verbose=None):
     """Non-parametric cluster-level test for spatio-temporal data.
 
     This function provides a convenient wrapper for
@@ -1327,6 +1369,7 @@ def spatio_temporal_cluster_test(
     %(clust_disjoint)s
     %(clust_buffer)s
     %(clust_con_dep)s
+    %(clust_shard)s
     %(verbose)s
 
     Returns
@@ -1357,7 +1400,123 @@ def spatio_temporal_cluster_test(
         n_permutations=n_permutations, adjacency=adjacency,
         n_jobs=n_jobs, seed=seed, max_step=max_step, exclude=exclude,
         step_down_p=step_down_p, t_power=t_power, out_type=out_type,
-        check_disjoint=check_disjoint, buffer_size=buffer_size)
+        check_disjoint=check_disjoint, buffer_size=buffer_size,
+        shard=shard)
+
+
+def _slices_to_dicts(obj):
+    """Replace slices in (nested) clusters by dicts, to write them to HDF5."""
+    if isinstance(obj, slice):
+        return dict(start=obj.start, stop=obj.stop, step=obj.step)
+    elif isinstance(obj, (list, tuple)):
+        return type(obj)(_slices_to_dicts(o) for o in obj)
+    return obj
+
+
+def _dicts_to_slices(obj):
+    """Restore the slices replaced by _slices_to_dicts."""
+    if isinstance(obj, dict):
+        return slice(obj['start'], obj['stop'], obj['step'])
+    elif isinstance(obj, (list, tuple)):
+        return type(obj)(_dicts_to_slices(o) for o in obj)
+    return obj
+
+
+def write_cluster_shard(fname, shard, overwrite=False):
+    """Write a shard of a cluster-level permutation test to disk.
+
+    Parameters
+    ----------
+    fname : str
+        The file name, which should end with ``.h5``.
+    shard : dict
+        The shard, as returned by the cluster-level permutation tests when
+        using their ``shard`` parameter.
+    overwrite : bool
+        If True, overwrite the file (if it exists).
+
+    See Also
+    --------
+    merge_cluster_shards
+
+    Notes
+    -----
+    .. versionadded:: 0.21
+    """
+    _validate_type(shard, dict, 'shard')
+    fname = _check_fname(fname, overwrite=overwrite)
+    shard = shard.copy()
+    shard['clusters'] = _slices_to_dicts(shard['clusters'])
+    write_hdf5(fname, shard, overwrite=overwrite, title='mnepython')
+
+
+@verbose
+def merge_cluster_shards(shards, verbose=None):
+    """Merge the shards of a cluster-level permutation test.
+
+    Parameters
+    ----------
+    shards : list of dict | list of str
+        All the shards of the test, as returned by the cluster-level
+        permutation tests when using their ``shard`` parameter, or the names
+        of the files they were written to with
+        :func:`mne.stats.write_cluster_shard`.
+    %(verbose)s
+
+    Returns
+    -------
+    t_obs : array
+        Statistic observed for all variables.
+    clusters : list
+        The observed clusters.
+    cluster_pv : array
+        P-value for each cluster.
+    H0 : array, shape (n_permutations,)
+        Max cluster level stats observed under permutation.
+
+    See Also
+    --------
+    write_cluster_shard
+
+    Notes
+    -----
+    The outputs are identical to those of a single run of the test with the
+    same parameters (and ``shard=None``).
+
+    .. versionadded:: 0.21
+    """
+    _validate_type(shards, (list, tuple), 'shards')
+    shards = list(shards)
+    for si, shard in enumerate(shards):
+        if not isinstance(shard, dict):
+            fname = _check_fname(shard, overwrite='read', must_exist=True)
+            shard = read_hdf5(fname, title='mnepython')
+            shard['clusters'] = _dicts_to_slices(shard['clusters'])
+            shards[si] = shard
+    if len(shards) == 0:
+        raise ValueError('At least one shard must be provided')
+    shards = sorted(shards, key=lambda shard: shard['shard'])
+    n_shards = shards[0]['n_shards']
+    if [shard['shard'] for shard in shards] != list(range(n_shards)):
+        raise ValueError('Each of the %d shards must be provided exactly '
+                         'once, got shards %s'
+                         % (n_shards, [shard['shard'] for shard in shards]))
+    first = shards[0]
+    for shard in shards[1:]:
+        if shard['n_shards'] != n_shards or \
+                shard['n_permutations'] != first['n_permutations'] or \
+                shard['tail'] != first['tail'] or \
+                not np.array_equal(shard['t_obs'], first['t_obs']):
+            raise ValueError('The shards do not come from the same test')
+    logger.info('Merging %d shards of %d permutations'
+                % (n_shards, first['n_permutations']))
+    t_obs, cluster_stats = first['t_obs'], first['cluster_stats']
+    if len(cluster_stats) == 0:
+        return t_obs, np.array([]), np.array([]), np.array([])
+    H0 = _get_h0(cluster_stats, [shard['H0'] for shard in shards],
+                 first['tail'])
+    cluster_pv = _pval_from_histogram(cluster_stats, H0, first['tail'])
+    return t_obs, first['clusters'], cluster_pv, H0
 
 
 def _st_mask_from_s_inds(n_times, n_vertices, vertices, set_as=True):
@@ -1395,12 +1554,11 @@ def _st_mask_from_s_inds(n_times, n_vertices, vertices, set_as=True):
 @verbose
 def _get_partitions_from_adjacency(adjacency, n_times, verbose=None):
     """Specify disjoint subsets (e.g., hemispheres) based on adjacency."""
-    if isinstance(adjacency, list):
-        test = np.ones(len(adjacency))
-        test_adj = np.zeros((len(adjacency), len(adjacency)), dtype='bool')
-        for vi in range(len(adjacency)):
-            test_adj[adjacency[vi], vi] = True
-        test_adj = sparse.coo_matrix(test_adj, dtype='float')
+    if isinstance(adjacency, _STAdjacency):
+        test = np.ones(adjacency.n_vertices)
+        row, col = adjacency.spatial_edges()
+        test_adj = sparse.coo_matrix(
+            (np.ones(len(row)), (row, col)), shape=(len(test),) * 2)
     else:
         test = np.ones(adjacency.shape[0])
         test_adj = adjacency
@@ -1412,7 +1570,7 @@ def _get_partitions_from_adjacency(adjacency, n_times, verbose=None):
         partitions = np.zeros(len(test), dtype='int')
         for ii, pc in enumerate(part_clusts):
             partitions[pc] = ii
-        if isinstance(adjacency, list):
+        if isinstance(adjacency, _STAdjacency):
             partitions = np.tile(partitions, n_times)
     else:
         logger.info('No disjoint adjacency sets found')
@@ -246,8 +246,8 @@ def _get_contrast_indices(effect_idx, n_factors):  # noqa: D401
     return np.array([int(i) for i in binrepr], dtype=int)
 
 
-def _iter_contrasts(n_subjects, factor_levels, effect_picks):
-    """Set up contrasts."""
+def _get_contrasts(factor_levels, effect_picks):
+    """Set up the contrasts of all effects, stacked column-wise."""
     from scipy.signal import detrend
     sc = []
     n_factors = len(factor_levels)
@@ -261,15 +261,57 @@ def _iter_contrasts(n_subjects, factor_levels, effect_picks):
         sc.append([np.ones([n_levels, 1]),
                    detrend(np.eye(n_levels), type='constant')])
 
+    contrasts, slices, df1s = [], [], []
+    n_columns = 0
     for this_effect in effect_picks:
         contrast_idx = _get_contrast_indices(this_effect + 1, n_factors)
         c_ = sc[0][contrast_idx[n_factors - 1]]
         for i_contrast in range(1, n_factors):
             this_contrast = contrast_idx[(n_factors - 1) - i_contrast]
             c_ = np.kron(c_, sc[i_contrast][this_contrast])
-        df1 = np.linalg.matrix_rank(c_)
-        df2 = df1 * (n_subjects - 1)
-        yield c_, df1, df2
+        contrasts.append(c_)
+        slices.append(slice(n_columns, n_columns + c_.shape[1]))
+        df1s.append(np.linalg.matrix_rank(c_))
+        n_columns += c_.shape[1]
+    return np.concatenate(contrasts, axis=1), slices, df1s
+
+
+def _iter_contrasts(n_subjects, factor_levels, effect_picks):
+    """Set up contrasts."""
+    contrasts, slices, df1s = _get_contrasts(factor_levels, effect_picks)
+    for sl, df1 in zip(slices, df1s):
+        yield contrasts[:, sl], df1, df1 * (n_subjects - 1)
+
+
+def _f_mway_rm(data, contrasts, slices, df1s, correction=False):
+    """Compute F-values and sphericity epsilons over chunks of tests.
+
+    ``data`` has shape (n_tests, n_subjects, n_conditions). All contrasts
+    are applied with one matrix product per chunk of tests, so only the
+    projections of a chunk are held in memory.
+    """
+    n_tests, n_subjects = data.shape[:2]
+    fvalues = np.empty((len(slices), n_tests))
+    epsilons = np.empty((len(slices), n_tests)) if correction else None
+    n_chunk = max(2 ** 20 // (n_subjects * contrasts.shape[1]), 1)
+    for start in range(0, n_tests, n_chunk):
+        stop = min(start + n_chunk, n_tests)
+        y_all = np.dot(data[start:stop], contrasts)
+        for ii, (sl, df1) in enumerate(zip(slices, df1s)):
+            y = y_all[:, :, sl]
+            b = np.mean(y, axis=1)[:, np.newaxis, :]
+            ss = np.sum(np.sum(y * b, axis=2), axis=1)
+            mse = (np.sum(np.sum(y * y, axis=2), axis=1) - ss) / (
+                n_subjects - 1)
+            fvalues[ii, start:stop] = ss / mse
+            if correction:
+                # sample covariances, leave off "/ (y.shape[1] - 1)" norm
+                # because it falls out.
+                v = np.matmul(np.swapaxes(y, 1, 2), y)
+                epsilons[ii, start:stop] = (
+                    np.trace(v, axis1=1, axis2=2) ** 2 /
+                    (df1 * np.sum(np.sum(v * v, axis=2), axis=1)))
+    return fvalues, epsilons
 
 
 def f_threshold_mway_rm(n_subjects, factor_levels, effects='A*B',
@@ -391,30 +433,19 @@ def f_mway_rm(data, factor_levels, effects='all',
     n_replications = data.shape[0]
 
     # put last axis in front to 'iterate' over mass univariate instances.
-    data = np.rollaxis(data, 2)
-    fvalues, pvalues = [], []
-    for c_, df1, df2 in _iter_contrasts(n_replications, factor_levels,
-                                        effect_picks):
-        y = np.dot(data, c_)
-        b = np.mean(y, axis=1)[:, np.newaxis, :]
-        ss = np.sum(np.sum(y * b, axis=2), axis=1)
-        mse = (np.sum(np.sum(y * y, axis=2), axis=1) - ss) / (df2 / df1)
-        fvals = ss / mse
-        fvalues.append(fvals)
-        if correction:
-            # sample covariances, leave off "/ (y.shape[1] - 1)" norm because
-            # it falls out.
-            v = np.array([np.dot(y_.T, y_) for y_ in y])
-            v = (np.array([np.trace(vv) for vv in v]) ** 2 /
-                 (df1 * np.sum(np.sum(v * v, axis=2), axis=1)))
-            eps = v
-
+    contrasts, slices, df1s = _get_contrasts(factor_levels, effect_picks)
+    fvalues, epsilons = _f_mway_rm(np.rollaxis(data, 2), contrasts, slices,
+                                   df1s, correction)
+    pvalues = []
+    for ii, (fvals, df1) in enumerate(zip(fvalues, df1s)):
+        df2 = df1 * (n_replications - 1)
         df1, df2 = np.zeros(n_obs) + df1, np.zeros(n_obs) + df2
         if correction:
             # numerical imprecision can cause eps=0.99999999999999989
             # even with a single category, so never let our degrees of
             # freedom drop below 1.
-            df1, df2 = [np.maximum(d[None, :] * eps, 1.) for d in (df1, df2)]
+            df1, df2 = [np.maximum(d[None, :] * epsilons[ii], 1.)
+                        for d in (df1, df2)]
 
         if return_pvals:
             pvals = f(df1, df2).sf(fvals)
@@ -426,6 +457,54 @@ def f_mway_rm(data, factor_levels, effects='all',
     return [np.squeeze(np.asarray(vv)) for vv in (fvalues, pvalues)]
 
 
+def make_f_mway_rm_stat_fun(factor_levels, effects='all'):
+    """Make a repeated measures ANOVA ``stat_fun`` for cluster-level tests.
+
+    The contrasts of the requested effects are computed once, so the
+    returned function can be called cheaply for every permutation.
+
+    Parameters
+    ----------
+    factor_levels : list-like
+        The number of levels per factor.
+    effects : str | list
+        The effects to compute, see :func:`f_mway_rm`. Cluster-level tests
+        need a single effect per ``stat_fun``.
+
+    Returns
+    -------
+    stat_fun : callable
+        A function taking one array of shape (n_subjects, ...) per
+        condition, ordered as the columns of the ``data`` passed to
+        :func:`f_mway_rm`, and returning the F-values of the effect(s) as
+        an array of shape (...) or (n_effects, ...).
+
+    See Also
+    --------
+    f_mway_rm
+    f_threshold_mway_rm
+    permutation_cluster_test
+
+    Notes
+    -----
+    .. versionadded:: 0.21
+    """
+    effect_picks, _ = _map_effects(len(factor_levels), effects)
+    contrasts, slices, df1s = _get_contrasts(factor_levels, effect_picks)
+
+    def stat_fun(*args):
+        if len(args) != contrasts.shape[0]:
+            raise ValueError('Expected %d conditions, got %d'
+                             % (contrasts.shape[0], len(args)))
+        shape = args[0].shape[1:]
+        data = np.array([arg.reshape(len(arg), -1) for arg in args]).T
+        fvalues, _ = _f_mway_rm(data, contrasts, slices, df1s)
+        fvalues = fvalues.reshape((len(df1s),) + shape)
+        return fvalues[0] if len(df1s) == 1 else fvalues
+
+    return stat_fun
+
+
 def _parametric_ci(arr, ci=.95):
     """Calculate the `ci`% parametric confidence interval for `arr`."""
     mean = arr.mean(0)
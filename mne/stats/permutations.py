@@ -7,7 +7,7 @@
 from math import sqrt
 import numpy as np
 
-from ..utils import check_random_state, verbose, logger
+from ..utils import check_random_state, verbose, logger, fill_doc
 from ..parallel import parallel_func
 
 
@@ -20,6 +20,23 @@ def _max_stat(X, X2, perms, dof_scaling):
     return max_abs
 
 
+def _max_stat_blocks(X, X2, orders, dof_scaling, block_size):
+    """Compute the max stats of the orders, one block of sign flips at a time.
+
+    Orders are either integer codes or 0/1 arrays (see _get_1samp_orders).
+    """
+    from .cluster_level import _codes_to_orders
+    max_abs = np.empty(len(orders))
+    for start in range(0, len(orders), block_size):
+        block = orders[start:start + block_size]
+        if block.ndim == 1:
+            block = _codes_to_orders(block, len(X))
+        perms = 2 * block - 1  # from 0, 1 -> 1, -1
+        max_abs[start:start + len(block)] = _max_stat(X, X2, perms,
+                                                      dof_scaling)
+    return max_abs
+
+
 @verbose
 def permutation_t_test(X, n_permutations=10000, tail=0, n_jobs=1,
                        seed=None, verbose=None):
@@ -83,25 +100,62 @@ def permutation_t_test(X, n_permutations=10000, tail=0, n_jobs=1,
     std0 = np.sqrt(X2 - mu0 ** 2) * dof_scaling  # get std with var splitting
     T_obs = np.mean(X, axis=0) / (std0 / sqrt(n_samples))
     rng = check_random_state(seed)
-    orders, _, extra = _get_1samp_orders(n_samples, n_permutations, tail, rng)
-    perms = 2 * np.array(orders) - 1  # from 0, 1 -> 1, -1
+    orders, _, extra = _get_1samp_orders(n_samples, n_permutations, tail, rng,
+                                         codes=True)
     logger.info('Permuting %d times%s...' % (len(orders), extra))
-    parallel, my_max_stat, n_jobs = parallel_func(_max_stat, n_jobs)
-    max_abs = np.concatenate(parallel(my_max_stat(X, X2, p, dof_scaling)
-                                      for p in np.array_split(perms, n_jobs)))
+    # stream the sign flips in blocks of about 8 MB of statistics
+    block_size = max(2 ** 20 // n_tests, 1)
+    parallel, my_max_stat, n_jobs = parallel_func(_max_stat_blocks, n_jobs)
+    max_abs = np.concatenate(parallel(
+        my_max_stat(X, X2, o, dof_scaling, block_size)
+        for o in np.array_split(orders, n_jobs)))
     max_abs = np.concatenate((max_abs, [np.abs(T_obs).max()]))
     H0 = np.sort(max_abs)
+    # H0 is sorted, so count the larger values instead of comparing all
     if tail == 0:
-        p_values = (H0 >= np.abs(T_obs[:, np.newaxis])).mean(-1)
+        p_values = np.searchsorted(H0, np.abs(T_obs))
     elif tail == 1:
-        p_values = (H0 >= T_obs[:, np.newaxis]).mean(-1)
+        p_values = np.searchsorted(H0, T_obs)
     elif tail == -1:
-        p_values = (-H0 <= T_obs[:, np.newaxis]).mean(-1)
+        p_values = np.searchsorted(H0, -T_obs)
+    p_values = (len(H0) - p_values) / float(len(H0))
     return T_obs, p_values, H0
 
 
+def _bootstrap_ci(arr, boot_indices, stat_fun, ci):
+    """Get the CI of the mean or median of some columns of arr.
+
+    Bootstrap samples are gathered into arrays of shape
+    (n_samples, n_block, n_columns) and reduced along the first axis,
+    except for means that are computed from the bootstrap counts.
+    """
+    n_samples, n_columns = arr.shape
+    n_bootstraps = len(boot_indices)
+    if stat_fun == 'mean':  # weighted sums of the samples: a single GEMM
+        counts = np.bincount(
+            (np.arange(n_bootstraps)[:, np.newaxis] * n_samples +
+             boot_indices).ravel(), minlength=n_bootstraps * n_samples)
+        counts = counts.reshape(n_bootstraps, n_samples)
+        stat = np.dot(counts, arr) / n_samples
+    else:
+        assert stat_fun == 'median'
+        n_block = max(2 ** 20 // (n_samples * n_columns), 1)
+        stat = np.empty((n_bootstraps, n_columns))
+        for start in range(0, n_bootstraps, n_block):
+            inds = boot_indices[start:start + n_block]
+            stat[start:start + len(inds)] = np.median(arr[inds.T], axis=0)
+    return np.percentile(stat, ci, axis=0)
+
+
+def _bootstrap_stats(arr, boot_indices, stat_fun):
+    """Apply stat_fun to each bootstrap sample of arr."""
+    return np.array([stat_fun(arr[inds]) for inds in boot_indices])
+
+
+@fill_doc
 def bootstrap_confidence_interval(arr, ci=.95, n_bootstraps=2000,
-                                  stat_fun='mean', random_state=None):
+                                  stat_fun='mean', random_state=None,
+                                  n_jobs=1):
     """Get confidence intervals from non-parametric bootstrap.
 
     Parameters
@@ -116,6 +170,11 @@ def bootstrap_confidence_interval(arr, ci=.95, n_bootstraps=2000,
         Can be "mean", "median", or a callable operating along ``axis=0``.
     random_state : int | float | array_like | None
         The seed at which to initialize the bootstrap.
+    %(n_jobs)s
+        For "mean" and "median" the columns of ``arr`` are split across the
+        jobs, for a callable the bootstraps are.
+
+        .. versionadded:: 0.21
 
     Returns
     -------
@@ -123,31 +182,43 @@ def bootstrap_confidence_interval(arr, ci=.95, n_bootstraps=2000,
         Containing the lower boundary of the CI at ``cis[0, ...]`` and the
         upper boundary of the CI at ``cis[1, ...]``.
     """
-    if stat_fun == "mean":
-        def stat_fun(x):
-            return x.mean(axis=0)
-    elif stat_fun == 'median':
-        def stat_fun(x):
-            return np.median(x, axis=0)
-    elif not callable(stat_fun):
+    if not callable(stat_fun) and stat_fun not in ('mean', 'median'):
         raise ValueError("stat_fun must be 'mean', 'median' or callable.")
     n_trials = arr.shape[0]
     indices = np.arange(n_trials, dtype=int)  # BCA would be cool to have too
     rng = check_random_state(random_state)
     boot_indices = rng.choice(indices, replace=True,
                               size=(n_bootstraps, len(indices)))
-    stat = np.array([stat_fun(arr[inds]) for inds in boot_indices])
     ci = (((1 - ci) / 2) * 100, ((1 - ((1 - ci) / 2))) * 100)
-    ci_low, ci_up = np.percentile(stat, ci, axis=0)
-    return np.array([ci_low, ci_up])
-
-
-def _ci(arr, ci=.95, method="bootstrap", n_bootstraps=2000, random_state=None):
+    if callable(stat_fun):
+        # called once per bootstrap sample, as its output can have any shape
+        parallel, my_bootstrap_stats, n_jobs = parallel_func(
+            _bootstrap_stats, n_jobs)
+        stat = np.concatenate(parallel(
+            my_bootstrap_stats(arr, inds, stat_fun)
+            for inds in np.array_split(boot_indices, n_jobs)))
+        return np.percentile(stat, ci, axis=0)
+    # the bootstrap statistics of a chunk of columns are held in memory
+    # together, chunks are split across jobs
+    shape = arr.shape[1:]
+    arr = arr.reshape(n_trials, -1)
+    n_chunk = max(2 ** 20 // n_bootstraps, 1)
+    parallel, my_bootstrap_ci, _ = parallel_func(_bootstrap_ci, n_jobs)
+    cis = parallel(my_bootstrap_ci(arr[:, start:start + n_chunk],
+                                   boot_indices, stat_fun, ci)
+                   for start in range(0, arr.shape[1], n_chunk))
+    return np.concatenate(cis, axis=1).reshape((2,) + shape)
+
+
+def _ci(arr, ci=.95, method="bootstrap", n_bootstraps=2000, random_state=None,
+        stat_fun='mean', n_jobs=1):
     """Calculate confidence interval. Aux function for plot_compare_evokeds."""
     if method == "bootstrap":
         return bootstrap_confidence_interval(arr, ci=ci,
                                              n_bootstraps=n_bootstraps,
-                                             random_state=random_state)
+                                             stat_fun=stat_fun,
+                                             random_state=random_state,
+                                             n_jobs=n_jobs)
     else:
         from . import _parametric_ci
         return _parametric_ci(arr, ci=ci)
@@ -13,10 +13,11 @@ import numpy as np
 from scipy import linalg, sparse
 
 from ..source_estimate import SourceEstimate
-from ..epochs import BaseEpochs
+from ..epochs import BaseEpochs, _is_good
 from ..evoked import Evoked, EvokedArray
 from ..utils import logger, _reject_data_segments, warn, fill_doc
-from ..io.pick import pick_types, pick_info, _picks_to_idx
+from ..io.pick import (pick_types, pick_info, _picks_to_idx,
+                       channel_indices_by_type)
 
 
 def linear_regression(inst, design_matrix, names=None):
@@ -151,7 +152,7 @@ def _fit_lm(data, design_matrix, names):
 @fill_doc
 def linear_regression_raw(raw, events, event_id=None, tmin=-.1, tmax=1,
                           covariates=None, reject=None, flat=None, tstep=1.,
-                          decim=1, picks=None, solver='cholesky'):
+                          decim=1, picks=None, solver='cholesky', alpha=0.):
     """Estimate regression-based evoked potentials/fields by linear modeling.
 
     This models the full M/EEG time course, including correction for
@@ -226,15 +227,24 @@ def linear_regression_raw(raw, events, event_id=None, tmin=-.1, tmax=1,
         matrix b; or a string.
         X is of shape (n_times, n_predictors * time_window_length).
         y is of shape (n_channels, n_times).
-        If str, must be ``'cholesky'``, in which case the solver used is
-        ``linalg.solve(dot(X.T, X), dot(X.T, y))``.
+        If str, must be ``'cholesky'``, in which case the normal equations
+        ``dot(X.T, X)`` and ``dot(X.T, y)`` are accumulated over chunks of
+        the data (read from disk if ``raw`` is not preloaded) and solved
+        with a single factorization of ``dot(X.T, X)``.
+    alpha : float | array-like of float
+        Ridge penalty added to the diagonal of ``dot(X.T, X)``. If
+        array-like, one solution is returned per penalty, all obtained from
+        a single eigendecomposition. Only used with ``solver='cholesky'``.
+
+        .. versionadded:: 0.21
 
     Returns
     -------
-    evokeds : dict
+    evokeds : dict | list of dict
         A dict where the keys correspond to conditions and the values are
         Evoked objects with the ER[F/P]s. These can be used exactly like any
         other Evoked object, including e.g. plotting or statistics.
+        A list of such dicts (one per penalty) if ``alpha`` is array-like.
 
     References
     ----------
@@ -245,52 +255,61 @@ def linear_regression_raw(raw, events, event_id=None, tmin=-.1, tmax=1,
     if isinstance(solver, str):
         if solver not in {"cholesky"}:
             raise ValueError("No such solver: {}".format(solver))
-        if solver == 'cholesky':
-            def solver(X, y):
-                a = (X.T * X).toarray()  # dot product of sparse matrices
-                return linalg.solve(a, X.T * y, sym_pos=True,
-                                    overwrite_a=True, overwrite_b=True).T
-    elif callable(solver):
-        pass
-    else:
+    elif not callable(solver):
         raise TypeError("The solver must be a str or a callable.")
+    alphas = np.atleast_1d(np.array(alpha, float))
+    if alphas.ndim != 1 or (alphas < 0).any():
+        raise ValueError('alpha must be a non-negative float or a 1D '
+                         'array-like of such, got %s' % (alpha,))
 
-    # build data
-    data, info, events = _prepare_rerp_data(raw, events, picks=picks,
-                                            decim=decim)
+    # build events
+    picks, info, events = _prepare_rerp_data(raw, events, picks=picks,
+                                             decim=decim)
+    n_samples = len(range(0, raw.n_times, decim))
 
     if event_id is None:
         event_id = {str(v): v for v in set(events[:, 2])}
 
     # build predictors
     X, conds, cond_length, tmin_s, tmax_s = _prepare_rerp_preds(
-        n_samples=data.shape[1], sfreq=info["sfreq"], events=events,
+        n_samples=n_samples, sfreq=info["sfreq"], events=events,
         event_id=event_id, tmin=tmin, tmax=tmax, covariates=covariates)
 
-    # remove "empty" and contaminated data points
-    X, data = _clean_rerp_input(X, data, reject, flat, decim, info, tstep)
-
-    # solve linear system
-    coefs = solver(X, data.T)
-    if coefs.shape[0] != data.shape[0]:
-        raise ValueError("solver output has unexcepted shape. Supply a "
-                         "function that returns coefficients in the form "
-                         "(n_targets, n_features), where targets == channels.")
+    if isinstance(solver, str):
+        # accumulate and solve the normal equations chunk by chunk
+        normal = _accumulate_rerp(raw, picks, X, reject, flat, decim, info,
+                                  tstep)
+        all_coefs = [normal.solve(alpha_) for alpha_ in alphas]
+    else:
+        if len(alphas) != 1 or alphas[0] != 0:
+            raise ValueError('alpha can only be used with a str solver')
+        data = raw[picks][0][:, ::decim]
+        # remove "empty" and contaminated data points
+        X, data = _clean_rerp_input(X, data, reject, flat, decim, info,
+                                    tstep)
+
+        # solve linear system
+        coefs = solver(X, data.T)
+        if coefs.shape[0] != data.shape[0]:
+            raise ValueError("solver output has unexcepted shape. Supply a "
+                             "function that returns coefficients in the form "
+                             "(n_targets, n_features), where targets == "
+                             "channels.")
+        all_coefs = [coefs]
 
     # construct Evoked objects to be returned from output
-    evokeds = _make_evokeds(coefs, conds, cond_length, tmin_s, tmax_s, info)
+    evokeds = [_make_evokeds(coefs, conds, cond_length, tmin_s, tmax_s, info)
+               for coefs in all_coefs]
 
-    return evokeds
+    return evokeds[0] if np.ndim(alpha) == 0 else evokeds
 
 
 def _prepare_rerp_data(raw, events, picks=None, decim=1):
-    """Prepare events and data, primarily for `linear_regression_raw`."""
+    """Prepare picks and events, primarily for `linear_regression_raw`."""
     picks = _picks_to_idx(raw.info, picks)
     info = pick_info(raw.info, picks)
     decim = int(decim)
     info["sfreq"] /= decim
-    data, times = raw[:]
-    data = data[picks, ::decim]
     if len(set(events[:, 0])) < len(events[:, 0]):
         raise ValueError("`events` contains duplicate time points. Make "
                          "sure all entries in the first column of `events` "
@@ -306,7 +325,7 @@ def _prepare_rerp_data(raw, events, picks=None, decim=1):
                          "different events, drop close events, or choose a "
                          "different decimation factor.")
 
-    return data, info, events
+    return picks, info, events
 
 
 def _prepare_rerp_preds(n_samples, sfreq, events, event_id=None, tmin=-.1,
@@ -381,6 +400,84 @@ def _clean_rerp_input(X, data, reject, flat, decim, info, tstep):
     return X.tocsr()[has_val], data[:, has_val]
 
 
+class _NormalEquations(object):
+    """Normal equations ``dot(X.T, X) b = dot(X.T, Y)`` of a linear model.
+
+    They are accumulated over chunks of rows of ``X`` and ``Y`` and each
+    factorization of ``dot(X.T, X)`` is computed once, so solutions for
+    several ridge penalties are cheap.
+    """
+
+    def __init__(self, n_features):
+        self.XtX = np.zeros((n_features, n_features))
+        self.XtY = None
+        self._cho = None
+        self._eigh = None
+
+    def update(self, X, Y):
+        """Add the rows of sparse ``X`` and dense ``Y``."""
+        XtY = X.T * Y
+        self.XtY = XtY if self.XtY is None else self.XtY + XtY
+        self.XtX += (X.T * X).toarray()
+        self._cho = self._eigh = None
+
+    def solve(self, alpha=0.):
+        """Solve for all the columns of ``Y`` with ridge ``alpha``."""
+        if alpha == 0:
+            if self._cho is None:
+                self._cho = linalg.cho_factor(self.XtX)
+            return linalg.cho_solve(self._cho, self.XtY).T
+        # one eigendecomposition serves all (positive) penalties
+        if self._eigh is None:
+            self._eigh = linalg.eigh(self.XtX)
+        eigval, eigvec = self._eigh
+        return np.dot(eigvec, np.dot(eigvec.T, self.XtY) /
+                      (eigval + alpha)[:, np.newaxis]).T
+
+
+def _accumulate_rerp(raw, picks, X, reject, flat, decim, info, tstep):
+    """Accumulate the rERP normal equations over chunks of the data.
+
+    Rows where no predictor is nonzero, and ``tstep`` windows rejected by
+    ``reject`` and ``flat``, are left out as in `_clean_rerp_input`.
+    """
+    X = X.tocsr()
+    n_samples = X.shape[0]
+    has_val = np.zeros(n_samples, bool)
+    has_val[X.nonzero()[0]] = True
+    n_chunk = max(2 ** 20 // len(picks), 1)
+    if reject is not None:
+        idx_by_type = channel_indices_by_type(info)
+        step = int(np.ceil(tstep * info['sfreq']))
+        # chunks must contain whole rejection windows
+        n_chunk = -(-n_chunk // step) * step
+        any_good = False
+    normal = _NormalEquations(X.shape[1])
+    for start in range(0, n_samples, n_chunk):
+        stop = min(start + n_chunk, n_samples)
+        data = raw[picks, start * decim:min(stop * decim, raw.n_times)][0]
+        data = data[:, ::decim]
+        keep = has_val[start:stop].copy()
+        if reject is not None:
+            for first in range(0, stop - start, step):
+                last = first + step
+                if start + last > n_samples:
+                    break  # end of the time segment
+                if _is_good(data[:, first:last], info['ch_names'],
+                            idx_by_type, reject, flat,
+                            ignore_chs=info['bads']):
+                    any_good = any_good or data[:, first:last].any()
+                else:
+                    logger.info("Artifact detected in [%d, %d]"
+                                % (start + first, start + last))
+                    keep[first:last] = False
+        normal.update(X[start:stop][keep], data[:, keep].T)
+    if reject is not None and not any_good:
+        raise RuntimeError('No clean segment found. Please consider updating '
+                           'your rejection thresholds.')
+    return normal
+
+
 def _make_evokeds(coefs, conds, cond_length, tmin_s, tmax_s, info):
     """Create a dictionary of Evoked objects.
 
@@ -12,32 +12,16 @@ from numpy.testing import (assert_equal, assert_array_equal,
                            assert_array_almost_equal, assert_allclose)
 import pytest
 
-from mne.fixes import has_numba
 from mne.parallel import _force_serial
-from mne.stats import cluster_level, ttest_ind_no_p, combine_adjacency
+from mne.stats import (cluster_level, ttest_ind_no_p, combine_adjacency,
+                       merge_cluster_shards, write_cluster_shard)
 from mne.stats.cluster_level import (permutation_cluster_test, f_oneway,
                                      permutation_cluster_1samp_test,
                                      spatio_temporal_cluster_test,
                                      spatio_temporal_cluster_1samp_test,
                                      ttest_1samp_no_p, summarize_clusters_stc)
 from mne.utils import (run_tests_if_main, catch_logging, check_version,
-                       requires_sklearn)
-
-
-@pytest.fixture(scope="function", params=('Numba', 'NumPy'))
-def numba_conditional(monkeypatch, request):
-    """Test both code paths on machines that have Numba."""
-    assert request.param in ('Numba', 'NumPy')
-    if request.param == 'NumPy' and has_numba:
-        monkeypatch.setattr(
-            cluster_level, '_get_buddies', cluster_level._get_buddies_fallback)
-        monkeypatch.setattr(
-            cluster_level, '_get_selves', cluster_level._get_selves_fallback)
-        monkeypatch.setattr(
-            cluster_level, '_where_first', cluster_level._where_first_fallback)
-    if request.param == 'Numba' and not has_numba:
-        pytest.skip('Numba not installed')
-    yield request.param
+                       requires_sklearn, requires_h5py)
 
 
 n_space = 50
@@ -66,7 +50,7 @@ def _get_conditions():
     return condition1_1d, condition2_1d, condition1_2d, condition2_2d
 
 
-def test_thresholds(numba_conditional):
+def test_thresholds():
     """Test automatic threshold calculations."""
     # within subjects
     rng = np.random.RandomState(0)
@@ -118,7 +102,7 @@ def test_thresholds(numba_conditional):
                 buffer_size=None, out_type='mask')
 
 
-def test_cache_dir(tmpdir, numba_conditional):
+def test_cache_dir(tmpdir):
     """Test use of cache dir."""
     tempdir = str(tmpdir)
     orig_dir = os.getenv('MNE_CACHE_DIR', None)
@@ -156,7 +140,7 @@ def test_cache_dir(tmpdir, numba_conditional):
             del os.environ['MNE_MEMMAP_MIN_SIZE']
 
 
-def test_permutation_large_n_samples(numba_conditional):
+def test_permutation_large_n_samples():
     """Test that non-replacement works with large N."""
     X = np.random.RandomState(0).randn(72, 1) + 1
     for n_samples in (11, 72):
@@ -168,7 +152,7 @@ def test_permutation_large_n_samples(numba_conditional):
             assert len(np.unique(H0)) >= 1024 - (H0 == 0).sum()
 
 
-def test_permutation_step_down_p(numba_conditional):
+def test_permutation_step_down_p():
     """Test cluster level permutations with step_down_p."""
     rng = np.random.RandomState(0)
     # subjects, time points, spatial points
@@ -197,7 +181,7 @@ def test_permutation_step_down_p(numba_conditional):
     assert_allclose(p_next, 0.015625, atol=1e-6)
 
 
-def test_cluster_permutation_test(numba_conditional):
+def test_cluster_permutation_test():
     """Test cluster level permutations tests."""
     condition1_1d, condition2_1d, condition1_2d, condition2_2d = \
         _get_conditions()
@@ -236,7 +220,7 @@ def test_cluster_permutation_test(numba_conditional):
     ttest_1samp_no_p,
     partial(ttest_1samp_no_p, sigma=1e-1)
 ])
-def test_cluster_permutation_t_test(numba_conditional, stat_fun):
+def test_cluster_permutation_t_test(stat_fun):
     """Test cluster level permutations T-test."""
     condition1_1d, condition2_1d, condition1_2d, condition2_2d = \
         _get_conditions()
@@ -292,7 +276,7 @@ def test_cluster_permutation_t_test(numba_conditional, stat_fun):
 
 
 @requires_sklearn
-def test_cluster_permutation_with_adjacency(numba_conditional):
+def test_cluster_permutation_with_adjacency():
     """Test cluster level permutations with adjacency matrix."""
     from sklearn.feature_extraction.image import grid_to_graph
     condition1_1d, condition2_1d, condition1_2d, condition2_2d = \
@@ -489,7 +473,7 @@ def test_permutation_cluster_signs(threshold, kind):
 
 
 @requires_sklearn
-def test_permutation_adjacency_equiv(numba_conditional):
+def test_permutation_adjacency_equiv():
     """Test cluster level permutations with and without adjacency."""
     from sklearn.feature_extraction.image import grid_to_graph
     rng = np.random.RandomState(0)
@@ -560,7 +544,7 @@ def test_permutation_adjacency_equiv(numba_conditional):
 
 
 @requires_sklearn
-def test_spatio_temporal_cluster_adjacency(numba_conditional):
+def test_spatio_temporal_cluster_adjacency():
     """Test spatio-temporal cluster permutations."""
     from sklearn.feature_extraction.image import grid_to_graph
     condition1_1d, condition2_1d, condition1_2d, condition2_2d = \
@@ -622,7 +606,7 @@ def test_summarize_clusters():
     pytest.raises(RuntimeError, summarize_clusters_stc, clu)
 
 
-def test_permutation_test_H0(numba_conditional):
+def test_permutation_test_H0():
     """Test that H0 is populated properly during testing."""
     rng = np.random.RandomState(0)
     data = rng.rand(7, 10, 1) - 0.5
@@ -644,7 +628,7 @@ def test_permutation_test_H0(numba_conditional):
         assert_equal(len(h0), 2 ** (7 - (tail == 0)))  # exact test
 
 
-def test_tfce_thresholds(numba_conditional):
+def test_tfce_thresholds():
     """Test TFCE thresholds."""
     rng = np.random.RandomState(0)
     data = rng.randn(7, 10, 1) - 0.5
@@ -663,4 +647,198 @@ def test_tfce_thresholds(numba_conditional):
             data, tail=1, out_type='mask', threshold=dict(start=1, step=-0.5))
 
 
+@pytest.mark.parametrize('tail', [-1, 0, 1])
+@pytest.mark.parametrize('max_step', [1, 2])
+def test_tfce_sweep(tail, max_step):
+    """Test TFCE scores against clustering each threshold separately."""
+    rng = np.random.RandomState(0)
+    n_src, n_times = 30, 6
+    adjacency = sparse.random(n_src, n_src, density=0.1, random_state=0)
+    adjacency = ((adjacency + adjacency.T) > 0).astype(int).tocoo()
+    x = rng.randn(n_times * n_src)
+    include = rng.rand(len(x)) > 0.1
+    step = -0.3 if tail == -1 else 0.3
+    threshold = dict(start=0., step=step, h_power=1.5, e_power=0.7)
+    st_adjacency = cluster_level._setup_adjacency(
+        adjacency, n_times * n_src, n_times)
+    scores = cluster_level._find_clusters(
+        x, threshold, tail, st_adjacency, max_step=max_step,
+        include=include)[1]
+    # a full spatio-temporal adjacency matrix gives the same graph
+    time_adjacency = sparse.diags(
+        [1.] * (2 * max_step),
+        [-ii for ii in range(1, max_step + 1)] +
+        list(range(1, max_step + 1)), (n_times, n_times))
+    full_adjacency = (sparse.kron(sparse.eye(n_times), adjacency) +
+                      sparse.kron(time_adjacency, sparse.eye(n_src))).tocoo()
+    want = np.zeros(len(x))
+    stop = dict([(-1, x.min()), (0, np.abs(x).max()), (1, x.max())])[tail]
+    thresholds = np.arange(0., stop, step)
+    for ti, thresh in enumerate(thresholds):
+        h = abs(thresh - (thresholds[ti - 1] if ti else 0.)) ** 1.5
+        clusters = cluster_level._find_clusters(
+            x, thresh, tail, full_adjacency, include=include)[0]
+        for c in clusters:
+            want[c] += h * len(c) ** 0.7
+    assert_allclose(scores, want)
+    scores_2 = cluster_level._find_clusters(
+        x, threshold, tail, full_adjacency, include=include)[1]
+    assert_allclose(scores_2, want)
+
+
+@pytest.mark.parametrize('stat_fun, n_groups', [
+    (ttest_1samp_no_p, 1),
+    (ttest_ind_no_p, 2),
+    (f_oneway, 2),
+    (f_oneway, 3),
+])
+def test_batch_stat_fun(stat_fun, n_groups):
+    """Test computing statistics for blocks of permutations."""
+    rng = np.random.RandomState(0)
+    X = rng.randn(5 * n_groups + 2, 20) + 1.
+    n_perm = 7
+    if n_groups == 1:
+        slices = None
+        orders = (rng.rand(n_perm, len(X)) < 0.5).astype(int)
+        want = [stat_fun(X * (2 * order[:, np.newaxis] - 1))
+                for order in orders]
+    else:
+        edges = np.linspace(0, len(X), n_groups + 1).astype(int)
+        slices = [slice(start, stop)
+                  for start, stop in zip(edges[:-1], edges[1:])]
+        orders = [rng.permutation(len(X)) for _ in range(n_perm)]
+        want = [stat_fun(*[X[order[s]] for s in slices]) for order in orders]
+    batch_fun = cluster_level._get_batch_stat_fun(stat_fun, slices)
+    for n_block in (1, 3, n_perm):
+        got = list(cluster_level._iter_batch_stats(
+            X, orders, batch_fun, n_block))
+        assert_allclose(got, want, rtol=1e-10, atol=1e-12)
+    other_fun = partial(stat_fun)
+    assert cluster_level._get_batch_stat_fun(other_fun, slices) is None
+
+
+def test_batch_stat_fun_offset():
+    """Test that batched statistics are accurate for data with an offset."""
+    rng = np.random.RandomState(0)
+    X = 1e5 + rng.randn(10, 30)
+    kwargs = dict(threshold=2, tail=1, n_permutations='all', out_type='mask',
+                  adjacency=combine_adjacency(30))
+    p_batch = permutation_cluster_1samp_test(X, **kwargs)[2]
+    p_want = permutation_cluster_1samp_test(
+        X, stat_fun=partial(ttest_1samp_no_p), **kwargs)[2]
+    assert len(p_want) > 0
+    assert_allclose(p_batch, p_want)
+    assert_allclose(p_batch.min(), 2. / 1023.)
+    for stat_fun, n_groups in ((ttest_ind_no_p, 2), (f_oneway, 3)):
+        groups = [1e5 + rng.randn(6, 30) + (ii == 0)
+                  for ii in range(n_groups)]
+        edges = np.cumsum([0] + [len(g) for g in groups])
+        slices = [slice(start, stop)
+                  for start, stop in zip(edges[:-1], edges[1:])]
+        orders = [rng.permutation(edges[-1]) for _ in range(5)]
+        X = np.concatenate(groups)
+        # the statistics do not depend on the offset
+        want = [stat_fun(*[X[order[s]] - 1e5 for s in slices])
+                for order in orders]
+        batch_fun = cluster_level._get_batch_stat_fun(stat_fun, slices)
+        got = list(cluster_level._iter_batch_stats(X, orders, batch_fun, 2))
+        assert_allclose(got, want, rtol=1e-7)
+
+
+@pytest.mark.parametrize('max_step', [1, 2])
+def test_st_clusters_graph(max_step):
+    """Test spatio-temporal clusters against the full adjacency graph."""
+    rng = np.random.RandomState(0)
+    n_src, n_times = 40, 10
+    adjacency = sparse.random(n_src, n_src, density=0.08, random_state=0)
+    adjacency = ((adjacency + adjacency.T) > 0).astype(int).tocsr()
+    adjacency = sparse.block_diag([adjacency[:20, :20],
+                                   adjacency[20:, 20:]]).tocoo()
+    # a dense mask, so that clusters merge across many time points
+    x = rng.randn(n_times * n_src)
+    st_adjacency = cluster_level._setup_adjacency(
+        adjacency, n_times * n_src, n_times)
+    time_adjacency = sparse.diags(
+        [1.] * (2 * max_step),
+        [-ii for ii in range(1, max_step + 1)] +
+        list(range(1, max_step + 1)), (n_times, n_times))
+    full_adjacency = (sparse.kron(sparse.eye(n_times), adjacency) +
+                      sparse.kron(time_adjacency, sparse.eye(n_src))).tocoo()
+    for tail, threshold in ((0, 0.5), (1, 0.), (-1, 0.)):
+        clusters, sums = cluster_level._find_clusters(
+            x, threshold, tail, st_adjacency, max_step=max_step)
+        want_clusters, want_sums = cluster_level._find_clusters(
+            x, threshold, tail, full_adjacency)
+        assert len(clusters) == len(want_clusters)
+        for c, want_c in zip(clusters, want_clusters):
+            assert_array_equal(c, want_c)
+        assert_allclose(sums, want_sums)
+    # disjoint sets are found from the spatial graph alone
+    partitions = cluster_level._get_partitions_from_adjacency(
+        st_adjacency, n_times)
+    want_partitions = cluster_level._get_partitions_from_adjacency(
+        full_adjacency, n_times)
+    assert partitions.max() > 0
+    assert_array_equal(partitions, want_partitions)
+
+
+@pytest.mark.parametrize('one_sample', (True, False))
+def test_cluster_shards(one_sample):
+    """Test merging shards of the permutations of a cluster test."""
+    condition1_1d, condition2_1d, condition1_2d, condition2_2d = \
+        _get_conditions()
+    kwargs = dict(seed=0, out_type='indices')
+    if one_sample:
+        func, X = permutation_cluster_1samp_test, condition1_2d
+    else:
+        func, X = permutation_cluster_test, [condition1_2d, condition2_2d]
+        kwargs['tail'] = 1
+    kwargs['n_permutations'] = 100
+    want = func(X, **kwargs)
+    assert len(want[1]) > 0
+    shards = [func(X, shard=(ii, 3), **kwargs) for ii in range(3)]
+    assert sum(len(shard['H0']) for shard in shards) == len(want[3]) - 1
+    got = merge_cluster_shards(shards[::-1])
+    assert_array_equal(got[0], want[0])
+    assert len(got[1]) == len(want[1])
+    for c, want_c in zip(got[1], want[1]):
+        assert_array_equal(c, want_c)
+    assert_array_equal(got[2], want[2])
+    assert_array_equal(got[3], want[3])
+    # blocks of batched statistics must not depend on the shards
+    for n_shards in (2, 7):
+        got = merge_cluster_shards([func(X, shard=(ii, n_shards), **kwargs)
+                                    for ii in range(n_shards)])
+        assert_array_equal(got[3], want[3])
+    with pytest.raises(ValueError, match='exactly once'):
+        merge_cluster_shards(shards[:2])
+    with pytest.raises(ValueError, match='same test'):
+        kwargs['n_permutations'] = 50
+        merge_cluster_shards(shards[:2] + [func(X, shard=(2, 3), **kwargs)])
+    with pytest.raises(ValueError, match='step_down_p must be 0'):
+        func(X, shard=(0, 3), step_down_p=0.05, **kwargs)
+    with pytest.raises(ValueError, match='0 <= index'):
+        func(X, shard=(3, 3), **kwargs)
+
+
+@requires_h5py
+def test_cluster_shards_io(tmpdir):
+    """Test writing and reading shards of a cluster test."""
+    condition1_1d = _get_conditions()[0]
+    kwargs = dict(n_permutations=50, seed=0, out_type='mask')
+    want = permutation_cluster_1samp_test(condition1_1d, **kwargs)
+    fnames = list()
+    for ii in range(2):
+        fnames.append(str(tmpdir.join('shard%d.h5' % ii)))
+        write_cluster_shard(fnames[-1], permutation_cluster_1samp_test(
+            condition1_1d, shard=(ii, 2), **kwargs))
+    with pytest.raises(FileExistsError, match='overwrite'):
+        write_cluster_shard(fnames[-1], permutation_cluster_1samp_test(
+            condition1_1d, shard=(1, 2), **kwargs))
+    got = merge_cluster_shards(fnames)
+    assert got[1] == want[1]  # slices
+    for g, w in zip(got[::2] + (got[3],), want[::2] + (want[3],)):
+        assert_array_equal(g, w)
+
+
 run_tests_if_main()
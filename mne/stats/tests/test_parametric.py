@@ -9,7 +9,7 @@ import scipy.stats
 
 import mne
 from mne.stats.parametric import (f_mway_rm, f_threshold_mway_rm,
-                                  _map_effects)
+                                  _map_effects, make_f_mway_rm_stat_fun)
 
 # hardcoded external test results, manually transferred
 test_external = {
@@ -118,6 +118,39 @@ def test_f_twoway_rm():
     assert_array_almost_equal(fvals, test_external['r_fvals_1way'], 5)
 
 
+def test_f_mway_rm_stat_fun():
+    """Test the repeated measures ANOVA stat_fun factory."""
+    rng = np.random.RandomState(0)
+    # enough tests to span several chunks
+    data = rng.randn(10, 6, 30000)
+    for effects in ('A', 'A:B', 'all'):
+        stat_fun = make_f_mway_rm_stat_fun([2, 3], effects)
+        fvals = stat_fun(*np.swapaxes(data, 0, 1))
+        assert_allclose(fvals, f_mway_rm(data, [2, 3], effects,
+                                         return_pvals=False)[0], rtol=1e-12)
+    assert fvals.shape == (3, 30000)
+    fvals = stat_fun(*np.swapaxes(data[..., :60].reshape(10, 6, 6, 10), 0, 1))
+    assert fvals.shape == (3, 6, 10)
+    with pytest.raises(ValueError, match='Expected 6 conditions, got 5'):
+        stat_fun(*np.swapaxes(data, 0, 1)[:5])
+
+    # drop-in replacement for the wrapper used in cluster-level tests
+    def stat_fun_wrapped(*args):
+        return f_mway_rm(np.swapaxes(args, 1, 0), [2, 2], 'A:B',
+                         return_pvals=False)[0]
+
+    X = list(rng.randn(4, 8, 50))
+    X[0][:, 20:30] += 2
+    kwargs = dict(threshold=5., tail=1, n_permutations=50, seed=0,
+                  adjacency=mne.stats.combine_adjacency(50), out_type='mask')
+    t_obs, _, _, h0 = mne.stats.permutation_cluster_test(
+        X, stat_fun=make_f_mway_rm_stat_fun([2, 2], 'A:B'), **kwargs)
+    t_obs_, _, _, h0_ = mne.stats.permutation_cluster_test(
+        X, stat_fun=stat_fun_wrapped, **kwargs)
+    assert_allclose(t_obs, t_obs_, rtol=1e-12)
+    assert_allclose(h0, h0_, rtol=1e-12)
+
+
 @pytest.mark.parametrize('kind, kwargs', [
     ('1samp', {}),
     ('ind', {}),  # equal_var=True is the default
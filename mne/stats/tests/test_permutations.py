@@ -2,13 +2,18 @@
 #
 # License: BSD (3-clause)
 
+from functools import partial
+
 from numpy.testing import assert_array_equal, assert_allclose
 import numpy as np
+import pytest
 from scipy import stats, sparse
 
 from mne.stats import permutation_cluster_1samp_test
+from mne.stats.cluster_level import _get_1samp_orders, _codes_to_orders
 from mne.stats.permutations import (permutation_t_test, _ci,
-                                    bootstrap_confidence_interval)
+                                    bootstrap_confidence_interval,
+                                    _max_stat, _max_stat_blocks)
 from mne.utils import run_tests_if_main, check_version
 
 
@@ -64,6 +69,31 @@ def test_permutation_t_test():
     assert_allclose(p_values[0], p_values_scipy, rtol=1e-2)
 
 
+def test_permutation_t_test_blocks():
+    """Test streaming the sign flips of permutation_t_test in blocks."""
+    rng = np.random.RandomState(0)
+    X = rng.randn(8, 20)
+    X2 = np.mean(X ** 2, axis=0)
+    dof_scaling = np.sqrt(8 / 7.)
+    for n_permutations, tail in (('all', 0), ('all', 1), (50, 0)):
+        orders = _get_1samp_orders(8, n_permutations, tail,
+                                   np.random.RandomState(0))[0]
+        codes = _get_1samp_orders(8, n_permutations, tail,
+                                  np.random.RandomState(0), codes=True)[0]
+        assert_array_equal(_codes_to_orders(codes, 8), orders)
+        want = _max_stat(X, X2, 2 * np.array(orders) - 1, dof_scaling)
+        for block_size in (1, 7, len(codes)):
+            assert_allclose(_max_stat_blocks(X, X2, codes, dof_scaling,
+                                             block_size), want, rtol=1e-12)
+    # more samples use explicit orders
+    X = rng.randn(25, 20)
+    X2 = np.mean(X ** 2, axis=0)
+    orders = _get_1samp_orders(25, 20, 0, rng, codes=True)[0]
+    assert orders.shape == (19, 25)
+    got = _max_stat_blocks(X, X2, orders, dof_scaling, 3)
+    assert_allclose(got, _max_stat(X, X2, 2 * orders - 1, dof_scaling))
+
+
 def test_ci():
     """Test confidence intervals."""
     # isolated test of CI functions
@@ -81,4 +111,45 @@ def test_ci():
         bootstrap_confidence_interval(arr, random_state=random_state)
 
 
+@pytest.mark.parametrize('stat_fun', ('mean', 'median', 'std'))
+def test_bootstrap_blocks(stat_fun):
+    """Test bootstrap CIs computed over blocks of bootstraps and columns."""
+    rng = np.random.RandomState(0)
+    # several column chunks and bootstrap blocks
+    arr = rng.randn(30, 3, 200)
+    funs = dict(mean=np.mean, median=np.median, std=np.std)
+    fun = funs[stat_fun]
+    boot_indices = np.random.RandomState(1).choice(
+        np.arange(30), replace=True, size=(2000, 30))
+    want = np.percentile([fun(arr[inds], axis=0) for inds in boot_indices],
+                         (2.5, 97.5), axis=0)
+    if stat_fun == 'std':
+        stat_fun = partial(np.std, axis=0)
+    got = bootstrap_confidence_interval(arr, stat_fun=stat_fun,
+                                        random_state=1)
+    assert got.shape == (2, 3, 200)
+    assert_allclose(got, want, rtol=1e-12)
+    assert_allclose(_ci(arr, stat_fun=stat_fun, random_state=1), want,
+                    rtol=1e-12)
+
+
+def test_bootstrap_callable():
+    """Test that callables get one bootstrap sample of the data at a time."""
+    rng = np.random.RandomState(0)
+    arr = rng.randn(20, 4, 50)
+
+    def stat_fun(x):  # e.g. the GFP of the mean
+        assert x.shape == arr.shape
+        return x.mean(0).std(0)
+
+    boot_indices = np.random.RandomState(1).choice(
+        np.arange(20), replace=True, size=(100, 20))
+    want = np.percentile([stat_fun(arr[inds]) for inds in boot_indices],
+                         (2.5, 97.5), axis=0)
+    got = bootstrap_confidence_interval(arr, n_bootstraps=100,
+                                        stat_fun=stat_fun, random_state=1)
+    assert got.shape == (2, 50)
+    assert_allclose(got, want, rtol=1e-12)
+
+
 run_tests_if_main()
@@ -7,6 +7,7 @@
 import os.path as op
 
 import numpy as np
+from scipy import linalg
 from numpy.testing import assert_array_equal, assert_allclose, assert_equal
 import pytest
 
@@ -153,4 +154,63 @@ def test_continuous_regression_with_overlap():
     pytest.raises(TypeError, linear_regression_raw, raw, events, solver=0)
 
 
+def test_continuous_regression_streamed(tmpdir):
+    """Test regression with normal equations accumulated over chunks."""
+    rng = np.random.RandomState(0)
+    n_channels, n_times = 64, 40000  # several chunks of data
+    data = rng.randn(n_channels, n_times)
+    data[3, 20000:20050] += 100.
+    raw = RawArray(data, mne.create_info(n_channels, 100., 'eeg'),
+                   first_samp=10)
+    fname = op.join(str(tmpdir), 'test_raw.fif')
+    raw.save(fname)
+    raw = mne.io.read_raw_fif(fname)
+    assert not raw.preload
+    events = np.sort(rng.choice(np.arange(5, n_times // 2 - 50), 500,
+                                replace=False)) * 2 + raw.first_samp
+    events = np.c_[events, np.zeros(500, int), rng.randint(1, 3, 500)]
+    event_id = dict(a=1, b=2)
+    covariates = dict(c=rng.randn(500))
+
+    def solver(X, y):
+        return linalg.solve((X.T * X).toarray(), X.T * y).T
+
+    for kwargs in (dict(), dict(decim=2, reject=dict(eeg=50.), tstep=.3)):
+        want = linear_regression_raw(raw, events, event_id, tmin=-.1,
+                                     tmax=.3, covariates=covariates,
+                                     solver=solver, **kwargs)
+        got = linear_regression_raw(raw, events, event_id, tmin=-.1,
+                                    tmax=.3, covariates=covariates, **kwargs)
+        assert set(got) == set(want)
+        for cond in want:
+            assert_allclose(got[cond].data, want[cond].data, rtol=1e-10,
+                            atol=1e-12)
+
+    # ridge penalties share one factorization
+    alphas = [0., 1., 100.]
+    got = linear_regression_raw(raw, events, event_id, tmin=-.1, tmax=.3,
+                                alpha=alphas)
+    assert isinstance(got, list) and len(got) == len(alphas)
+    for alpha, evokeds in zip(alphas, got):
+        want = linear_regression_raw(
+            raw, events, event_id, tmin=-.1, tmax=.3,
+            solver=lambda X, y: linalg.solve(
+                (X.T * X).toarray() + alpha * np.eye(X.shape[1]),
+                X.T * y).T)
+        for cond in want:
+            assert_allclose(evokeds[cond].data, want[cond].data,
+                            rtol=1e-10, atol=1e-12)
+    assert_allclose(got[0]['a'].data, linear_regression_raw(
+        raw, events, event_id, tmin=-.1, tmax=.3)['a'].data)
+    assert np.abs(got[2]['a'].data).max() < np.abs(got[0]['a'].data).max()
+
+    with pytest.raises(ValueError, match='non-negative'):
+        linear_regression_raw(raw, events, event_id, alpha=-1.)
+    with pytest.raises(ValueError, match='str solver'):
+        linear_regression_raw(raw, events, event_id, alpha=1.,
+                              solver=solver)
+    with pytest.raises(RuntimeError, match='No clean segment'):
+        linear_regression_raw(raw, events, event_id, reject=dict(eeg=1.))
+
+
 run_tests_if_main()
@@ -2482,6 +2482,36 @@ def test_concatenate_epochs_large():
     assert np.max(many_epochs_cat.events[:, 0]) < max_expected_sample_index
 
 
+def test_concatenate_epochs_read_once(monkeypatch):
+    """Test that concatenating non-preloaded epochs reads them once."""
+    info = create_info(3, 1000., 'eeg')
+    data = np.random.RandomState(0).randn(3, 5000) * 1e-6
+    data[0, 2600] = 1e-3  # rejected
+    raw = RawArray(data, info)
+    events = np.array([np.arange(100, 4800, 500),
+                       np.zeros(10, int), np.ones(10, int)]).T
+    kwargs = dict(tmax=0.1, reject=dict(eeg=1e-4))
+    want = concatenate_epochs([Epochs(raw, events, preload=True, **kwargs),
+                               Epochs(raw, events[1:], preload=True,
+                                      **kwargs)])
+    assert len(want) == 16
+    n_reads = list()
+    orig_read = Epochs._get_epoch_from_raw
+
+    def _count_read(self, idx, verbose=None):
+        n_reads.append(idx)
+        return orig_read(self, idx, verbose=verbose)
+
+    monkeypatch.setattr(Epochs, '_get_epoch_from_raw', _count_read)
+    got = concatenate_epochs([Epochs(raw, events, preload=False, **kwargs),
+                              Epochs(raw, events[1:], preload=True,
+                                     **kwargs)])
+    assert len(n_reads) == 2 * len(events) - 1  # once for each
+    assert_array_equal(got.get_data(), want.get_data())
+    assert_array_equal(got.events, want.events)
+    assert got.drop_log == want.drop_log
+
+
 def test_add_channels():
     """Test epoch splitting / re-appending channel types."""
     raw, events, picks = _get_data()
@@ -2875,6 +2905,101 @@ def test_average_methods():
         assert_array_equal(evoked_data, fun(data))
 
 
+def test_average_streaming(monkeypatch):
+    """Test averaging non-preloaded epochs in a single pass."""
+    sfreq = 1000.
+    info = create_info(5, sfreq, 'eeg')
+    raw = RawArray(rng.randn(5, 5000) * 1e-6, info)
+    events = np.array([np.arange(100, 4800, 200),
+                       np.zeros(24, int), np.ones(24, int)]).T
+    epochs = Epochs(raw, events, tmax=0.1, preload=False)
+    epochs_pre = Epochs(raw, events, tmax=0.1, preload=True)
+    data = epochs_pre.get_data()
+    for method in ('mean', 'std'):
+        evoked = epochs.average(method=method)
+        evoked_pre = epochs_pre.average(method=method)
+        assert evoked.nave == evoked_pre.nave == len(data)
+        assert_allclose(evoked.data, evoked_pre.data, rtol=1e-7, atol=1e-20)
+    # the median is exact, also when read in blocks of channels
+    median = epochs.average(method='median')
+    assert median.nave == len(data)
+    assert_array_equal(median.data, np.median(data, axis=0))
+    n_reads = list()
+    orig_read = Epochs._get_epoch_from_raw
+
+    def _count_read(self, idx, verbose=None):
+        n_reads.append(idx)
+        return orig_read(self, idx, verbose=verbose)
+
+    monkeypatch.setattr(Epochs, '_get_epoch_from_raw', _count_read)
+    median, n_events = epochs._median_blocks(5, data.shape[2],
+                                             n_values=data[:, :2].size)
+    assert len(n_reads) == len(events)  # once, through a temporary file
+    assert n_events == len(data)
+    assert_array_equal(median, np.median(data, axis=0))
+    monkeypatch.undo()
+    # the approximation is opt-in, and the same whether preloaded or not
+    approx = epochs.average(method='approximate_median')
+    assert approx.nave == len(data)
+    assert_array_equal(
+        approx.data, epochs_pre.average(method='approximate_median').data)
+    for ci, ti in ((0, 0), (2, 50), (4, 100)):
+        assert_allclose(approx.data[ci, ti], _p2_median(data[:, ci, ti]),
+                        rtol=1e-12)
+    with pytest.raises(ValueError, match='can only compute mean'):
+        epochs.average(method=lambda x: x.mean(0))
+
+    class MaxReducer(object):
+        def reset(self):
+            self.max = None
+
+        def update(self, data):
+            m = data.max(axis=0)
+            self.max = m if self.max is None else np.maximum(self.max, m)
+
+        def finalize(self):
+            return self.max
+
+    for inst in (epochs, epochs_pre):
+        evoked = inst.average(method=MaxReducer())
+        assert_allclose(evoked.data, data.max(axis=0))
+    # reused objects are reset first
+    reducer = MaxReducer()
+    epochs.average(method=reducer)
+    evoked = epochs[-12:].average(method=reducer)
+    assert_allclose(evoked.data, data[-12:].max(axis=0))
+
+
+def _p2_median(x):
+    """Get the P-square estimate of the median of a sequence."""
+    q = sorted(x[:5])
+    pos = [0, 1, 2, 3, 4]
+    for n, xi in enumerate(x[5:], 6):
+        if xi < q[0]:
+            q[0] = xi
+        if xi > q[4]:
+            q[4] = xi
+        k = sum(xi >= qi for qi in q[1:4])
+        for ii in range(k + 1, 5):
+            pos[ii] += 1
+        for ii in range(1, 4):
+            d = (n - 1) * ii / 4. - pos[ii]
+            if (d >= 1 and pos[ii + 1] - pos[ii] > 1) or \
+                    (d <= -1 and pos[ii - 1] - pos[ii] < -1):
+                s = 1 if d > 0 else -1
+                q_new = q[ii] + s / (pos[ii + 1] - pos[ii - 1]) * (
+                    (pos[ii] - pos[ii - 1] + s) * (q[ii + 1] - q[ii]) /
+                    (pos[ii + 1] - pos[ii]) +
+                    (pos[ii + 1] - pos[ii] - s) * (q[ii] - q[ii - 1]) /
+                    (pos[ii] - pos[ii - 1]))
+                if not q[ii - 1] < q_new < q[ii + 1]:
+                    q_new = q[ii] + s * (q[ii + s] - q[ii]) / (
+                        pos[ii + s] - pos[ii])
+                q[ii] = q_new
+                pos[ii] += s
+    return q[2]
+
+
 @pytest.mark.parametrize('relative', (True, False))
 def test_shift_time(relative):
     """Test the timeshift method."""
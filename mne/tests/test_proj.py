@@ -14,6 +14,7 @@ from mne import (compute_proj_epochs, compute_proj_evoked, compute_proj_raw,
 from mne.cov import regularize, compute_whitener
 from mne.datasets import testing
 from mne.io import read_raw_fif, RawArray
+from mne.io.constants import FIFF
 from mne.io.proj import (make_projector, activate_proj,
                          _needs_eeg_average_ref_proj)
 from mne.preprocessing import maxwell_filter
@@ -371,6 +372,33 @@ def test_needs_eeg_average_ref_proj():
     assert not _needs_eeg_average_ref_proj(raw.info)
 
 
+def test_projector_cache():
+    """Test that projectors are cached and safe to modify."""
+    from mne.io.proj import _projector_cache
+    info = create_info(['a', 'b', 'c', 'd'], 1000., 'eeg')
+    proj = make_eeg_average_ref_proj(info, activate=False)
+    _projector_cache.clear()
+    P, n_proj, U = make_projector([proj], info['ch_names'])
+    assert n_proj == 1
+    assert len(_projector_cache) == 1
+    P[:] = 0.
+    P_2, _, U_2 = make_projector([proj], info['ch_names'])
+    assert len(_projector_cache) == 1
+    assert_allclose(P_2, np.eye(4) - 0.25)
+    assert_allclose(U_2, U)
+    # different bads or vectors give different operators
+    P_3 = make_projector([proj], info['ch_names'], bads=['d'])[0]
+    assert len(_projector_cache) == 2
+    assert_allclose(P_3[:3, :3], np.eye(3) - 1. / 3.)
+    proj['kind'] = FIFF.FIFFV_PROJ_ITEM_FIELD
+    with pytest.warns(RuntimeWarning, match='magnitude'):
+        make_projector([proj], info['ch_names'][:3])
+    assert len(_projector_cache) == 3
+    with pytest.warns(RuntimeWarning, match='magnitude'):  # warns again
+        make_projector([proj], info['ch_names'][:3])
+    assert len(_projector_cache) == 3
+
+
 def test_sss_proj():
     """Test `meg` proj option."""
     raw = read_raw_fif(raw_fname)
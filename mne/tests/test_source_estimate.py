@@ -999,6 +999,45 @@ def test_spatio_temporal_src_adjacency():
     assert_equal(grade_to_tris(5).shape, [40960, 3])
 
 
+def test_src_adjacency_cache():
+    """Test caching of source space adjacency and inter-hemi adjacency."""
+    from scipy.spatial.distance import cdist
+    from mne.stats import _adjacency
+    from mne.surface import _get_ico_surface
+    _adjacency._adjacency_cache.clear()
+    ico = _get_ico_surface(2)
+    src = SourceSpaces([
+        dict(type='surf', rr=ico['rr'] * 0.08 + [off, 0., 0.],
+             use_tris=ico['tris'], vertno=np.arange(len(ico['rr'])),
+             dist=None) for off in (-0.07, 0.07)])
+    src[0]['vertno'] = src[0]['vertno'][5:]  # holes in the adjacency
+    with pytest.warns(RuntimeWarning, match='will have holes'):
+        adjacency = spatial_src_adjacency(src)
+    assert len(_adjacency._adjacency_cache) == 1
+    # the warning is emitted on cache hits, too
+    with pytest.warns(RuntimeWarning, match='will have holes'):
+        adjacency_2 = spatio_temporal_src_adjacency(src, 3)
+    assert len(_adjacency._adjacency_cache) == 1
+    _adjacency._adjacency_cache.clear()
+    with pytest.warns(RuntimeWarning, match='will have holes'):
+        adjacency_3 = spatio_temporal_src_adjacency(src, 3)
+    assert_array_equal(adjacency_2.toarray(), adjacency_3.toarray())
+    assert_array_equal(adjacency_2.toarray()[:adjacency.shape[0],
+                                             :adjacency.shape[0]],
+                       adjacency.toarray())
+
+    # KD-tree inter-hemisphere neighbors match the dense distances
+    for dist in (5e-6, 0.08, 1.):
+        adj = spatial_inter_hemi_adjacency(src, dist).toarray()
+        want = cdist(src[0]['rr'][src[0]['vertno']],
+                     src[1]['rr'][src[1]['vertno']]) <= dist
+        n_0 = len(src[0]['vertno'])
+        assert_array_equal(adj[:n_0, n_0:], want)
+        assert_array_equal(adj[n_0:, :n_0], want.T)
+        assert not adj[:n_0, :n_0].any() and not adj[n_0:, n_0:].any()
+    _adjacency._adjacency_cache.clear()
+
+
 @requires_pandas
 def test_to_data_frame():
     """Test stc Pandas exporter."""
@@ -1,8 +1,43 @@
 from math import ceil
 import numpy as np
 
-from ..fixes import fft, ifft, fftfreq
-from ..utils import logger, verbose
+from ..fixes import rfft, irfft, fftfreq
+from ..utils import logger, verbose, _LRUCache
+
+# Sine windows and normalizations of the overlap-added signal, keyed by
+# (kind, wsize, tstep, n_step)
+_window_cache = _LRUCache(32, max_bytes=32 * 1024 ** 2)
+
+
+def _get_window_norm(kind, wsize, tstep, n_step):
+    """Get the sine window and the normalization of the framed signal.
+
+    Each sample of the framed (or overlap-added) signal is divided by the
+    root of the sum of the squared windows of the frames that overlap it.
+    """
+    key = (kind, wsize, tstep, n_step)
+    out = _window_cache.get(key)
+    if out is None:
+        # Defining sine window
+        win = np.sin(np.arange(.5, wsize + .5) / wsize * np.pi)
+        # Sum of the squared windows of the overlapping frames
+        swin = np.zeros((n_step + wsize // tstep - 1, tstep))
+        for j, win2 in enumerate((win ** 2).reshape(-1, tstep)):
+            swin[j:j + n_step] += win2
+        swin = swin.ravel()
+        swin = np.sqrt(wsize * swin) if kind == 'stft' else \
+            np.sqrt(swin / wsize)
+        win.flags.writeable = swin.flags.writeable = False
+        out = _window_cache[key] = (win, swin)
+    return out
+
+
+def _frames(x, wsize, tstep, n_step):
+    """Get a (n_step, wsize) view of overlapping frames along the last axis."""
+    shape = x.shape[:-1] + (n_step, wsize)
+    strides = x.strides[:-1] + (tstep * x.strides[-1], x.strides[-1])
+    return np.lib.stride_tricks.as_strided(x, shape, strides,
+                                           writeable=False)
 
 
 @verbose
@@ -70,29 +105,14 @@ def stft(x, wsize, tstep=None, verbose=None):
     if n_signals == 0:
         return X
 
-    # Defining sine window
-    win = np.sin(np.arange(.5, wsize + .5) / wsize * np.pi)
-    win2 = win ** 2
-
-    swin = np.zeros((n_step - 1) * tstep + wsize)
-    for t in range(n_step):
-        swin[t * tstep:t * tstep + wsize] += win2
-    swin = np.sqrt(wsize * swin)
-
     # Zero-padding and Pre-processing for edges
-    xp = np.zeros((n_signals, wsize + (n_step - 1) * tstep),
-                  dtype=x.dtype)
+    xp = np.zeros((n_signals, wsize + (n_step - 1) * tstep))
     xp[:, (wsize - tstep) // 2: (wsize - tstep) // 2 + T] = x
-    x = xp
-
-    for t in range(n_step):
-        # Framing
-        wwin = win / swin[t * tstep: t * tstep + wsize]
-        frame = x[:, t * tstep: t * tstep + wsize] * wwin[None, :]
-        # FFT
-        fframe = fft(frame)
-        X[:, :, t] = fframe[:, :n_freq]
+    win, swin = _get_window_norm('stft', wsize, tstep, n_step)
+    xp /= swin
 
+    # Framing (all frames of all signals at once) and FFT
+    X[:] = rfft(_frames(xp, wsize, tstep, n_step) * win).transpose(0, 2, 1)
     return X
 
 
@@ -148,25 +168,19 @@ def istft(X, tstep=None, Tx=None):
     if n_signals == 0:
         return x[:, :Tx]
 
-    # Defining sine window
-    win = np.sin(np.arange(.5, wsize + .5) / wsize * np.pi)
-    # win = win / norm(win);
-
-    # Pre-processing for edges
-    swin = np.zeros(T + wsize - tstep, dtype=np.float64)
-    for t in range(n_step):
-        swin[t * tstep:t * tstep + wsize] += win ** 2
-    swin = np.sqrt(swin / wsize)
-
-    fframe = np.empty((n_signals, n_win + wsize // 2 - 1), dtype=X.dtype)
-    for t in range(n_step):
-        # IFFT
-        fframe[:, :n_win] = X[:, :, t]
-        fframe[:, n_win:] = np.conj(X[:, wsize // 2 - 1: 0: -1, t])
-        frame = ifft(fframe)
-        wwin = win / swin[t * tstep:t * tstep + wsize]
-        # Overlap-add
-        x[:, t * tstep: t * tstep + wsize] += np.real(np.conj(frame) * wwin)
+    # IFFT of all frames at once (the negative frequencies are the conjugate
+    # of the positive ones, so only the real part of the IFFT remains)
+    tstep = int(tstep)
+    win, swin = _get_window_norm('istft', int(wsize), tstep, n_step)
+    frames = irfft(X.transpose(0, 2, 1), wsize)
+    frames *= win
+
+    # Overlap-add, tstep samples at a time
+    x_steps = x.reshape(n_signals, -1, tstep)
+    frames = frames.reshape(n_signals, n_step, -1, tstep)
+    for j in range(frames.shape[2]):
+        x_steps[:, j:j + n_step] += frames[:, :, j]
+    x /= swin
 
     # Truncation
     x = x[:, (wsize - tstep) // 2: (wsize - tstep) // 2 + T + 1][:, :Tx].copy()
@@ -6,9 +6,9 @@
 from copy import deepcopy
 import math
 import numpy as np
-from scipy import fftpack
 # XXX explore cuda optimization at some point.
 
+from ..fixes import fft, ifft, fftfreq
 from ..io.pick import _pick_data_channels, pick_info
 from ..utils import verbose, warn, fill_doc, _validate_type
 from ..parallel import parallel_func, check_n_jobs
@@ -42,21 +42,21 @@ def _check_input_st(x_in, n_fft):
 
 def _precompute_st_windows(n_samp, start_f, stop_f, sfreq, width):
     """Precompute stockwell Gaussian windows (in the freq domain)."""
-    tw = fftpack.fftfreq(n_samp, 1. / sfreq) / n_samp
+    tw = fftfreq(n_samp, 1. / sfreq) / n_samp
     tw = np.r_[tw[:1], tw[1:][::-1]]
 
     k = width  # 1 for classical stowckwell transform
-    f_range = np.arange(start_f, stop_f, 1)
-    windows = np.empty((len(f_range), len(tw)), dtype=np.complex128)
-    for i_f, f in enumerate(f_range):
-        if f == 0.:
-            window = np.ones(len(tw))
-        else:
-            window = ((f / (np.sqrt(2. * np.pi) * k)) *
-                      np.exp(-0.5 * (1. / k ** 2.) * (f ** 2.) * tw ** 2.))
-        window /= window.sum()  # normalisation
-        windows[i_f] = fftpack.fft(window)
-    return windows
+    f_range = np.arange(start_f, stop_f, 1)[:, np.newaxis]
+    windows = ((f_range / (np.sqrt(2. * np.pi) * k)) *
+               np.exp(-0.5 * (1. / k ** 2.) * (f_range ** 2.) * tw ** 2.))
+    windows[f_range[:, 0] == 0] = 1.
+    windows /= windows.sum(axis=-1, keepdims=True)  # normalisation
+    return fft(windows, axis=-1)
+
+
+def _st_block_size(n_epochs, n_samp, max_bytes=2 ** 23):
+    """Get the number of frequencies to transform at once."""
+    return max(max_bytes // (16 * n_epochs * n_samp), 1)
 
 
 def _st(x, start_f, windows):
@@ -64,11 +64,11 @@ def _st(x, start_f, windows):
     n_samp = x.shape[-1]
     ST = np.empty(x.shape[:-1] + (len(windows), n_samp), dtype=np.complex128)
     # do the work
-    Fx = fftpack.fft(x)
+    Fx = fft(x)
     XF = np.concatenate([Fx, Fx], axis=-1)
     for i_f, window in enumerate(windows):
         f = start_f + i_f
-        ST[..., i_f, :] = fftpack.ifft(XF[..., f:f + n_samp] * window)
+        ST[..., i_f, :] = ifft(XF[..., f:f + n_samp] * window)
     return ST
 
 
@@ -79,22 +79,60 @@ def _st_power_itc(x, start_f, compute_itc, zero_pad, decim, W):
     n_out = n_out // decim + bool(n_out % decim)
     psd = np.empty((len(W), n_out))
     itc = np.empty_like(psd) if compute_itc else None
-    X = fftpack.fft(x)
-    XX = np.concatenate([X, X], axis=-1)
-    for i_f, window in enumerate(W):
-        f = start_f + i_f
-        ST = fftpack.ifft(XX[:, f:f + n_samp] * window)
+    XX = _st_shifted_spectra(x)
+    _st_power_itc_block(XX, start_f, compute_itc, zero_pad, decim, W,
+                        psd, itc)
+    return psd, itc
+
+
+def _st_shifted_spectra(x):
+    """Compute the spectra of x, repeated twice for circular shifts."""
+    X = fft(x)
+    return np.concatenate([X, X], axis=-1)
+
+
+def _st_power_itc_block(XX, start_f, compute_itc, zero_pad, decim, W,
+                        psd, itc):
+    """Fill power and ITC for a block of frequencies, in place."""
+    n_epochs, n_samp = XX.shape[0], XX.shape[1] // 2
+    # view of the shifted spectra, shape (n_epochs, n_freqs, n_samp)
+    XX = np.lib.stride_tricks.as_strided(
+        XX[:, start_f:], (n_epochs, len(W), n_samp),
+        XX.strides[:1] + XX.strides[1:] * 2, writeable=False)
+    n_block = _st_block_size(n_epochs, n_samp)
+    for fi in range(0, len(W), n_block):
+        sl = slice(fi, fi + n_block)
+        ST = ifft(XX[:, sl] * W[sl], axis=-1)
         if zero_pad > 0:
-            TFR = ST[:, :-zero_pad:decim]
+            TFR = ST[..., :-zero_pad:decim]
         else:
-            TFR = ST[:, ::decim]
-        TFR_abs = np.abs(TFR)
-        TFR_abs[TFR_abs == 0] = 1.
+            TFR = ST[..., ::decim]
+        TFR_pow = TFR.real ** 2
+        TFR_pow += TFR.imag ** 2
+        psd[sl] = np.mean(TFR_pow, axis=0)
         if compute_itc:
+            TFR_abs = np.sqrt(TFR_pow, out=TFR_pow)
+            TFR_abs[TFR_abs == 0] = 1.
             TFR /= TFR_abs
-            itc[i_f] = np.abs(np.mean(TFR, axis=0))
-        TFR_abs *= TFR_abs
-        psd[i_f] = np.mean(TFR_abs, axis=0)
+            itc[sl] = np.abs(np.mean(TFR, axis=0))
+
+
+def _st_power_itc_range(x, start_f, stop_f, sfreq, width, compute_itc,
+                        zero_pad, decim):
+    """Compute ST power and ITC, building the windows one block at a time."""
+    n_epochs, n_samp = x.shape
+    n_out = (n_samp - zero_pad)
+    n_out = n_out // decim + bool(n_out % decim)
+    psd = np.empty((stop_f - start_f, n_out))
+    itc = np.empty_like(psd) if compute_itc else None
+    XX = _st_shifted_spectra(x)
+    n_block = _st_block_size(n_epochs, n_samp)
+    for f in range(start_f, stop_f, n_block):
+        sl = slice(f - start_f, min(f + n_block, stop_f) - start_f)
+        W = _precompute_st_windows(n_samp, f, min(f + n_block, stop_f),
+                                   sfreq, width)
+        _st_power_itc_block(XX, f, compute_itc, zero_pad, decim, W,
+                            psd[sl], None if itc is None else itc[sl])
     return psd, itc
 
 
@@ -176,7 +214,7 @@ def tfr_array_stockwell(data, sfreq, fmin=None, fmax=None, n_fft=None,
     n_out = data.shape[2] // decim + bool(data.shape[-1] % decim)
     data, n_fft_, zero_pad = _check_input_st(data, n_fft)
 
-    freqs = fftpack.fftfreq(n_fft_, 1. / sfreq)
+    freqs = fftfreq(n_fft_, 1. / sfreq)
     if fmin is None:
         fmin = freqs[freqs > 0][0]
     if fmax is None:
@@ -186,19 +224,27 @@ def tfr_array_stockwell(data, sfreq, fmin=None, fmax=None, n_fft=None,
     stop_f = np.abs(freqs - fmax).argmin()
     freqs = freqs[start_f:stop_f]
 
-    W = _precompute_st_windows(data.shape[-1], start_f, stop_f, sfreq, width)
     n_freq = stop_f - start_f
     psd = np.empty((n_channels, n_freq, n_out))
     itc = np.empty((n_channels, n_freq, n_out)) if return_itc else None
 
-    parallel, my_st, _ = parallel_func(_st_power_itc, n_jobs)
-    tfrs = parallel(my_st(data[:, c, :], start_f, return_itc, zero_pad,
-                          decim, W)
-                    for c in range(n_channels))
-    for c, (this_psd, this_itc) in enumerate(iter(tfrs)):
-        psd[c] = this_psd
-        if this_itc is not None:
-            itc[c] = this_itc
+    # with fewer channels than jobs, also split the frequencies across jobs
+    n_jobs = check_n_jobs(n_jobs)
+    n_splits = min(-(-n_jobs // n_channels), n_freq) if n_freq else 1
+    bounds = np.linspace(start_f, stop_f, n_splits + 1).round().astype(int)
+    parallel, my_st, _ = parallel_func(_st_power_itc_range, n_jobs)
+    tfrs = parallel(my_st(data[:, c, :], f_start, f_stop, sfreq, width,
+                          return_itc, zero_pad, decim)
+                    for c in range(n_channels)
+                    for f_start, f_stop in zip(bounds[:-1], bounds[1:]))
+    tfrs = iter(tfrs)
+    for c in range(n_channels):
+        for f_start, f_stop in zip(bounds[:-1], bounds[1:]):
+            this_psd, this_itc = next(tfrs)
+            sl = slice(f_start - start_f, f_stop - start_f)
+            psd[c, sl] = this_psd
+            if this_itc is not None:
+                itc[c, sl] = this_itc
 
     return psd, itc, freqs
 
@@ -230,7 +276,8 @@ def tfr_stockwell(inst, fmin=None, fmax=None, n_fft=None,
     return_itc : bool
         Return intertrial coherence (ITC) as well as averaged power.
     n_jobs : int
-        The number of jobs to run in parallel (over channels).
+        The number of jobs to run in parallel (over channels, and over
+        frequencies when there are fewer channels than jobs).
     %(verbose)s
 
     Returns
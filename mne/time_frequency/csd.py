@@ -15,7 +15,7 @@ from ..io.pick import pick_channels, _picks_to_idx
 from ..utils import logger, verbose, warn, copy_function_doc_to_method_doc
 from ..viz.misc import plot_csd
 from ..time_frequency.multitaper import (_compute_mt_params, _mt_spectra,
-                                         _csd_from_mt, _psd_from_mt_adaptive)
+                                         _psd_from_mt_adaptive)
 from ..parallel import parallel_func
 from ..externals.h5io import read_hdf5, write_hdf5
 
@@ -1131,14 +1131,16 @@ def _execute_csd_function(X, times, frequencies, csd_function, params, n_fft,
     logger.info('Computing cross-spectral density from epochs...')
 
     n_freqs = len(frequencies)
-    csds_mean = np.zeros((n_channels * (n_channels + 1) // 2, n_freqs),
-                         dtype=np.complex128)
+    csds_sum = np.zeros((n_freqs, n_channels, n_channels),
+                        dtype=np.complex128)
 
-    # Prepare the function that does the actual CSD computation for parallel
-    # execution.
+    # Prepare the function that computes the spectra for parallel execution.
     parallel, my_csd, _ = parallel_func(csd_function, n_jobs, verbose=verbose)
 
-    # Compute CSD for each trial
+    # Compute the spectra of each trial. The spectra of several trials are
+    # stacked along the sample axis, so a single matrix product accumulates
+    # the CSD of the whole stack.
+    spectra, n_bytes = list(), 0
     n_blocks = int(np.ceil(n_epochs / float(n_jobs)))
     for i in range(n_blocks):
         epoch_block = X[i * n_jobs:(i + 1) * n_jobs]
@@ -1148,12 +1150,16 @@ def _execute_csd_function(X, times, frequencies, csd_function, params, n_fft,
         else:
             logger.info('    Computing CSD matrix for epoch %d' % (i + 1))
 
-        csds = parallel(my_csd(this_epoch, *params)
-                        for this_epoch in epoch_block)
-
-        # Add CSD matrices in-place
-        csds_mean += np.sum(csds, axis=0)
+        for this_spectra in parallel(my_csd(this_epoch, *params)
+                                     for this_epoch in epoch_block):
+            spectra.append(this_spectra)
+            n_bytes += this_spectra.nbytes
+        if n_bytes >= 2 ** 24 or i == n_blocks - 1:
+            csds_sum += _csd_from_spectra(np.concatenate(spectra, axis=-1))
+            spectra, n_bytes = list(), 0
 
+    triu = np.triu_indices(n_channels)
+    csds_mean = csds_sum[:, triu[0], triu[1]].T
     csds_mean /= n_epochs
     logger.info('[done]')
 
@@ -1165,10 +1171,58 @@ def _execute_csd_function(X, times, frequencies, csd_function, params, n_fft,
                                 n_fft=n_fft, projs=projs)
 
 
+def _normalize_mt_spectra(x_mt, weights):
+    """Weight tapered spectra so that cross-spectra become taper sums.
+
+    The weighted spectra ``z`` are such that ``np.sum(z_x * z_y.conj(),
+    axis=-2)`` equals ``_csd_from_mt(x_mt, y_mt, weights_x, weights_y)``.
+    """
+    z = weights * x_mt
+    z *= np.sqrt(2. / (weights * weights.conj()).real.sum(axis=-2,
+                                                          keepdims=True))
+    return z
+
+
+def _csd_from_spectra(z):
+    """Compute the cross-spectra between all pairs of signals.
+
+    Parameters
+    ----------
+    z : ndarray, shape (n_freqs, n_signals, n_samples)
+        The (weighted) spectra. The samples can be tapers, time points or
+        several epochs stacked together; cross-spectra are summed over them.
+
+    Returns
+    -------
+    csd : ndarray, shape (n_freqs, n_signals, n_signals)
+        The cross-spectral density matrix for each frequency.
+    """
+    z = np.ascontiguousarray(z)
+    return np.matmul(z, z.conj().swapaxes(-1, -2))
+
+
+def _csd_pairs_from_spectra(z, idx_x, idx_y):
+    """Compute the cross-spectra for given pairs of signals.
+
+    Parameters
+    ----------
+    z : ndarray, shape (n_signals, n_samples, ...)
+        The (weighted) spectra. Cross-spectra are summed over the samples.
+    idx_x, idx_y : ndarray of int
+        The signal indices of each pair.
+
+    Returns
+    -------
+    csd : ndarray, shape (n_pairs, ...)
+        The cross-spectra.
+    """
+    return np.einsum('ik...,ik...->i...', z[idx_x], z[idx_y].conj())
+
+
 def _csd_fourier(X, sfreq, n_times, freq_mask, n_fft):
-    """Compute cross spectral density (CSD) using short-time fourier transform.
+    """Compute the spectra for the short-time fourier transform CSD.
 
-    Computes the CSD for a single epoch of data.
+    Computes the spectra for a single epoch of data.
 
     Parameters
     ----------
@@ -1183,42 +1237,28 @@ def _csd_fourier(X, sfreq, n_times, freq_mask, n_fft):
         Which frequencies to use.
     n_fft : int
         Length of the FFT.
+
+    Returns
+    -------
+    spectra : ndarray, shape (n_freqs, n_channels, 1)
+        The scaled spectra, see :func:`_csd_from_spectra`.
     """
     x_mt, _ = _mt_spectra(X, np.hanning(n_times), sfreq, n_fft)
-
-    # Hack so we can sum over axis=-2
-    weights = np.array([1.])[:, np.newaxis, np.newaxis, np.newaxis]
-
     x_mt = x_mt[:, :, freq_mask]
 
-    # Calculating CSD
-    # Tiling x_mt so that we can easily use _csd_from_mt()
-    x_mt = x_mt[:, np.newaxis, :, :]
-    x_mt = np.tile(x_mt, [1, x_mt.shape[0], 1, 1])
-    y_mt = np.transpose(x_mt, axes=[1, 0, 2, 3])
-    weights_y = np.transpose(weights, axes=[1, 0, 2, 3])
-    csds = _csd_from_mt(x_mt, y_mt, weights, weights_y)
-
-    # FIXME: don't compute full matrix in the first place
-    csds = np.array([_sym_mat_to_vector(csds[:, :, i])
-                     for i in range(csds.shape[-1])]).T
-
     # Scaling by number of samples and compensating for loss of power
     # due to windowing (see section 11.5.2 in Bendat & Piersol).
-    csds /= n_times
-    csds *= 8 / 3.
-
     # Scaling by sampling frequency for compatibility with Matlab
-    csds /= sfreq
+    x_mt *= np.sqrt(2. / n_times * 8 / 3. / sfreq)
 
-    return csds
+    return x_mt.transpose(2, 0, 1)
 
 
 def _csd_multitaper(X, sfreq, n_times, window_fun, eigvals, freq_mask, n_fft,
                     adaptive):
-    """Compute cross spectral density (CSD) using multitaper module.
+    """Compute the spectra for the multitaper CSD.
 
-    Computes the CSD for a single epoch of data.
+    Computes the spectra for a single epoch of data.
 
     Parameters
     ----------
@@ -1240,6 +1280,11 @@ def _csd_multitaper(X, sfreq, n_times, window_fun, eigvals, freq_mask, n_fft,
         Length of the FFT.
     adaptive : bool
         Use adaptive weights to combine the tapered spectra into PSD.
+
+    Returns
+    -------
+    spectra : ndarray, shape (n_freqs, n_channels, n_tapers)
+        The weighted spectra, see :func:`_csd_from_spectra`.
     """
     x_mt, _ = _mt_spectra(X, window_fun, sfreq, n_fft)
 
@@ -1247,37 +1292,22 @@ def _csd_multitaper(X, sfreq, n_times, window_fun, eigvals, freq_mask, n_fft,
         # Compute adaptive weights
         _, weights = _psd_from_mt_adaptive(x_mt, eigvals, freq_mask,
                                            return_weights=True)
-        # Tiling weights so that we can easily use _csd_from_mt()
-        weights = weights[:, np.newaxis, :, :]
-        weights = np.tile(weights, [1, x_mt.shape[0], 1, 1])
     else:
         # Do not use adaptive weights
-        weights = np.sqrt(eigvals)[np.newaxis, np.newaxis, :, np.newaxis]
-
-    x_mt = x_mt[:, :, freq_mask]
+        weights = np.sqrt(eigvals)[:, np.newaxis]
 
-    # Calculating CSD
-    # Tiling x_mt so that we can easily use _csd_from_mt()
-    x_mt = x_mt[:, np.newaxis, :, :]
-    x_mt = np.tile(x_mt, [1, x_mt.shape[0], 1, 1])
-    y_mt = np.transpose(x_mt, axes=[1, 0, 2, 3])
-    weights_y = np.transpose(weights, axes=[1, 0, 2, 3])
-    csds = _csd_from_mt(x_mt, y_mt, weights, weights_y)
-
-    # FIXME: don't compute full matrix in the first place
-    csds = np.array([_sym_mat_to_vector(csds[:, :, i])
-                     for i in range(csds.shape[-1])]).T
+    x_mt = _normalize_mt_spectra(x_mt[:, :, freq_mask], weights)
 
     # Scaling by sampling frequency for compatibility with Matlab
-    csds /= sfreq
+    x_mt /= np.sqrt(sfreq)
 
-    return csds
+    return x_mt.transpose(2, 0, 1)
 
 
 def _csd_morlet(data, sfreq, wavelets, tslice=None, use_fft=True, decim=1):
-    """Compute cross spectral density (CSD) using the given Morlet wavelets.
+    """Compute the spectra for the CSD using the given Morlet wavelets.
 
-    Computes the CSD for a single epoch of data.
+    Computes the spectra for a single epoch of data.
 
     Parameters
     ----------
@@ -1305,13 +1335,8 @@ def _csd_morlet(data, sfreq, wavelets, tslice=None, use_fft=True, decim=1):
 
     Returns
     -------
-    csd : ndarray, shape ((n_channels**2 + n_channels) / 2 , n_wavelets)
-        For each wavelet, the upper triangle of the cross spectral density
-        matrix.
-
-    See Also
-    --------
-    _vector_to_sym_mat : For converting the CSD to a full matrix.
+    spectra : ndarray, shape (n_wavelets, n_channels, n_times)
+        The scaled wavelet transforms, see :func:`_csd_from_spectra`.
     """
     # Compute PSD
     psds = cwt(data, wavelets, use_fft=use_fft, decim=decim)
@@ -1323,14 +1348,8 @@ def _csd_morlet(data, sfreq, wavelets, tslice=None, use_fft=True, decim=1):
         tslice = slice(tstart, tstop, tstep)
         psds = psds[:, :, tslice]
 
-    psds_conj = np.conj(psds)
-
-    # Compute the spectral density between all pairs of series
-    n_channels = data.shape[0]
-    csds = np.vstack([np.mean(psds[[i]] * psds_conj[i:], axis=2)
-                      for i in range(n_channels)])
-
-    # Scaling by sampling frequency for compatibility with Matlab
-    csds /= sfreq
+    # Average over time and scale by sampling frequency for compatibility
+    # with Matlab
+    psds /= np.sqrt(psds.shape[2] * sfreq)
 
-    return csds
+    return psds.transpose(1, 0, 2)
@@ -4,11 +4,19 @@
 # Parts of this code were copied from NiTime http://nipy.sourceforge.net/nitime
 
 import operator
+import os
+import os.path as op
+
 import numpy as np
 
 from ..fixes import _get_dpss, rfft, irfft, rfftfreq
 from ..parallel import parallel_func
-from ..utils import sum_squared, warn, verbose, logger, _check_option
+from ..utils import (sum_squared, warn, verbose, logger, _check_option,
+                     _LRUCache, get_config, _get_extra_data_path)
+
+# Tapers and eigenvalues (before low-bias selection) keyed by
+# (N, half_nbw, Kmax), shared by all multitaper functions
+_dpss_cache = _LRUCache(256, max_bytes=256 * 1024 ** 2)
 
 
 def dpss_windows(N, half_nbw, Kmax, low_bias=True, interp_from=None,
@@ -58,13 +66,66 @@ def dpss_windows(N, half_nbw, Kmax, low_bias=True, interp_from=None,
     Slepian, D. Prolate spheroidal wave functions, Fourier analysis, and
     uncertainty V: The discrete case. Bell System Technical Journal,
     Volume 57 (1978), 1371430
+
+    Unless ``interp_from`` is used, the windows are cached in memory (and on
+    disk if the ``MNE_CACHE_DPSS`` config variable is ``'true'``), so
+    repeated calls with the same parameters are cheap.
     """
-    from scipy import interpolate
-    from ..filter import next_fast_len
     # This np.int32 business works around a weird Windows bug, see
     # gh-5039 and https://github.com/scipy/scipy/pull/8608
     Kmax = np.int32(operator.index(Kmax))
     N = np.int32(operator.index(N))
+    if interp_from is None:
+        key = (int(N), float(half_nbw), int(Kmax))
+        out = _dpss_cache.get(key)
+        if out is None:
+            out = _dpss_cache[key] = _get_dpss_table(*key)
+        dpss, eigvals = out[0].copy(), out[1].copy()
+    else:
+        dpss, eigvals = _compute_dpss(N, half_nbw, Kmax, interp_from,
+                                      interp_kind)
+
+    if low_bias:
+        idx = (eigvals > 0.9)
+        if not idx.any():
+            warn('Could not properly use low_bias, keeping lowest-bias taper')
+            idx = [np.argmax(eigvals)]
+        dpss, eigvals = dpss[idx], eigvals[idx]
+    assert len(dpss) > 0  # should never happen
+    assert dpss.shape[1] == N  # old nitime bug
+    return dpss, eigvals
+
+
+def _get_dpss_table(N, half_nbw, Kmax):
+    """Compute the DPSS windows, or read them from the disk cache."""
+    if get_config('MNE_CACHE_DPSS', 'false').lower() != 'true':
+        return _compute_dpss(N, half_nbw, Kmax)
+    fname = op.join(_get_extra_data_path(), 'tables')
+    if not op.isdir(fname):
+        os.makedirs(fname)
+    fname = op.join(fname, 'dpss_%d_%r_%d.bin' % (N, half_nbw, Kmax))
+    if not op.isfile(fname):
+        logger.info('Generating DPSS table...')
+        dpss, eigvals = _compute_dpss(N, half_nbw, Kmax)
+        # write to a temporary file first so that concurrent readers never
+        # see a partially written table
+        fname_tmp = '%s.%d.tmp' % (fname, os.getpid())
+        with open(fname_tmp, 'wb') as fid:
+            fid.write(np.c_[dpss, eigvals].tobytes())
+        os.replace(fname_tmp, fname)
+    else:
+        logger.info('Reading DPSS table...')
+        with open(fname, 'rb', buffering=0) as fid:
+            table = np.fromfile(fid, np.float64)
+        table.shape = (-1, N + 1)
+        dpss, eigvals = table[:, :N].copy(), table[:, N].copy()
+    return dpss, eigvals
+
+
+def _compute_dpss(N, half_nbw, Kmax, interp_from=None, interp_kind='linear'):
+    """Compute all DPSS windows and their eigenvalues."""
+    from scipy import interpolate
+    from ..filter import next_fast_len
     W = float(half_nbw) / N
     nidx = np.arange(N, dtype='d')
 
@@ -107,15 +168,6 @@ def dpss_windows(N, half_nbw, Kmax, low_bias=True, interp_from=None,
     r = 4 * W * np.sinc(2 * W * nidx)
     r[0] = 2 * W
     eigvals = np.dot(dpss_rxx, r)
-
-    if low_bias:
-        idx = (eigvals > 0.9)
-        if not idx.any():
-            warn('Could not properly use low_bias, keeping lowest-bias taper')
-            idx = [np.argmax(eigvals)]
-        dpss, eigvals = dpss[idx], eigvals[idx]
-    assert len(dpss) > 0  # should never happen
-    assert dpss.shape[1] == N  # old nitime bug
     return dpss, eigvals
 
 
@@ -174,53 +226,70 @@ def _psd_from_mt_adaptive(x_mt, eigvals, freq_mask, max_iter=150,
     if return_weights:
         weights = np.empty((n_signals, n_tapers, psd.shape[1]))
 
-    for i, (xk, var) in enumerate(zip(x_mt, x_var)):
-        # combine the SDFs in the traditional way in order to estimate
-        # the variance of the timeseries
-
-        # The process is to iteratively switch solving for the following
-        # two expressions:
-        # (1) Adaptive Multitaper SDF:
-        # S^{mt}(f) = [ sum |d_k(f)|^2 S_k(f) ]/ sum |d_k(f)|^2
-        #
-        # (2) Weights
-        # d_k(f) = [sqrt(lam_k) S^{mt}(f)] / [lam_k S^{mt}(f) + E{B_k(f)}]
-        #
-        # Where lam_k are the eigenvalues corresponding to the DPSS tapers,
-        # and the expected value of the broadband bias function
-        # E{B_k(f)} is replaced by its full-band integration
-        # (1/2pi) int_{-pi}^{pi} E{B_k(f)} = sig^2(1-lam_k)
-
-        # start with an estimate from incomplete data--the first 2 tapers
-        psd_iter = _psd_from_mt(xk[:2, :], rt_eig[:2, np.newaxis])
-
-        err = np.zeros_like(xk)
-        for n in range(max_iter):
-            d_k = (psd_iter / (eigvals[:, np.newaxis] * psd_iter +
-                               (1 - eigvals[:, np.newaxis]) * var))
-            d_k *= rt_eig[:, np.newaxis]
-            # Test for convergence -- this is overly conservative, since
-            # iteration only stops when all frequencies have converged.
-            # A better approach is to iterate separately for each freq, but
-            # that is a nonvectorized algorithm.
-            # Take the RMS difference in weights from the previous iterate
-            # across frequencies. If the maximum RMS error across freqs is
-            # less than 1e-10, then we're converged
-            err -= d_k
-            if np.max(np.mean(err ** 2, axis=0)) < 1e-10:
-                break
-
-            # update the iterative estimate with this d_k
-            psd_iter = _psd_from_mt(xk, d_k)
-            err = d_k
-
-        if n == max_iter - 1:
-            warn('Iterative multi-taper PSD computation did not converge.')
-
-        psd[i, :] = psd_iter
-
+    # combine the SDFs in the traditional way in order to estimate
+    # the variance of the timeseries
+
+    # The process is to iteratively switch solving for the following
+    # two expressions:
+    # (1) Adaptive Multitaper SDF:
+    # S^{mt}(f) = [ sum |d_k(f)|^2 S_k(f) ]/ sum |d_k(f)|^2
+    #
+    # (2) Weights
+    # d_k(f) = [sqrt(lam_k) S^{mt}(f)] / [lam_k S^{mt}(f) + E{B_k(f)}]
+    #
+    # Where lam_k are the eigenvalues corresponding to the DPSS tapers,
+    # and the expected value of the broadband bias function
+    # E{B_k(f)} is replaced by its full-band integration
+    # (1/2pi) int_{-pi}^{pi} E{B_k(f)} = sig^2(1-lam_k)
+    #
+    # All signals are iterated at once, and those that have converged are
+    # taken out of the active set.
+
+    # The weights are real, so the PSD only needs the (real) power of the
+    # tapered spectra, see _psd_from_mt
+    x_pow = x_mt.real ** 2
+    x_pow += x_mt.imag ** 2
+    del x_mt
+
+    # start with an estimate from incomplete data--the first 2 tapers
+    psd_iter = _psd_from_mt_pow(x_pow[:, :2, :], rt_eig[:2, np.newaxis])
+    idx = np.arange(n_signals)
+    xk, var = x_pow, x_var[:, np.newaxis, np.newaxis]
+    eig, rt_eig, bias = (eigvals[:, np.newaxis], rt_eig[:, np.newaxis],
+                         (1 - eigvals)[:, np.newaxis])
+    err = np.zeros_like(xk)
+    for n in range(max_iter):
+        d_k = psd_iter[:, np.newaxis] / (eig * psd_iter[:, np.newaxis] +
+                                         bias * var)
+        d_k *= rt_eig
+        # Test for convergence -- this is overly conservative, since
+        # iteration only stops when all frequencies have converged.
+        # A better approach is to iterate separately for each freq, but
+        # that is a nonvectorized algorithm.
+        # Take the RMS difference in weights from the previous iterate
+        # across frequencies. If the maximum RMS error across freqs is
+        # less than 1e-10, then we're converged
+        err -= d_k
+        converged = np.max(np.mean(err ** 2, axis=1), axis=-1) < 1e-10
+        psd[idx[converged]] = psd_iter[converged]
+        if return_weights:
+            weights[idx[converged]] = d_k[converged]
+        if converged.all():
+            break
+        if converged.any():
+            keep = ~converged
+            idx, xk, var, d_k = idx[keep], xk[keep], var[keep], d_k[keep]
+
+        # update the iterative estimate with this d_k
+        psd_iter = _psd_from_mt_pow(xk, d_k)
+        err = d_k
+    else:
+        psd[idx] = psd_iter
         if return_weights:
-            weights[i, :, :] = d_k
+            weights[idx] = d_k
+
+    if n == max_iter - 1:
+        warn('Iterative multi-taper PSD computation did not converge.')
 
     if return_weights:
         return psd, weights
@@ -250,6 +319,14 @@ def _psd_from_mt(x_mt, weights):
     return psd
 
 
+def _psd_from_mt_pow(x_pow, weights):
+    """Compute PSD from the power of tapered spectra with real weights."""
+    weights = weights * weights
+    psd = (weights * x_pow).sum(axis=-2)
+    psd *= 2 / weights.sum(axis=-2)
+    return psd
+
+
 def _csd_from_mt(x_mt, y_mt, weights_x, weights_y):
     """Compute CSD from tapered spectra.
 
@@ -2,6 +2,7 @@
 #           Denis A. Engemann <denis.engemann@gmail.com>
 # License : BSD 3-clause
 
+from copy import deepcopy
 from functools import partial
 import numpy as np
 
@@ -239,8 +240,17 @@ def psd_welch(inst, fmin=0, fmax=np.inf, tmin=None, tmax=None, n_fft=256,
 
     Notes
     -----
+    For Raw data with ``average='mean'``, the data are read and transformed
+    a few segments at a time, so memory usage does not grow with the
+    duration of the recording.
+
     .. versionadded:: 0.12.0
     """
+    from ..io.base import BaseRaw
+    if isinstance(inst, BaseRaw) and average == 'mean':
+        return _psd_welch_raw(inst, fmin, fmax, tmin, tmax, n_fft, n_overlap,
+                              n_per_seg, picks, proj, n_jobs,
+                              reject_by_annotation)
     # Prep data
     data, sfreq = _check_psd_data(inst, tmin, tmax, picks, proj,
                                   reject_by_annotation=reject_by_annotation)
@@ -249,6 +259,70 @@ def psd_welch(inst, fmin=0, fmax=np.inf, tmin=None, tmax=None, n_fft=256,
                            average=average, n_jobs=n_jobs, verbose=verbose)
 
 
+def _psd_welch_raw(raw, fmin, fmax, tmin, tmax, n_fft, n_overlap, n_per_seg,
+                   picks, proj, n_jobs, reject_by_annotation):
+    """Compute the Welch PSD of Raw data, reading a few segments at a time.
+
+    The periodograms of the segments are summed per channel as they are
+    computed, so only a bounded number of samples is in memory at once.
+    Segments that overlap bad annotations are left out (they are NaN).
+    """
+    from scipy.signal import spectrogram
+    from ..io.proj import setup_proj
+    sfreq = raw.info['sfreq']
+    time_mask = _time_mask(raw.times, tmin, tmax, sfreq=sfreq)
+    picks = _picks_to_idx(raw.info, picks, 'data', with_ref_meg=False)
+    projector = None
+    if proj:
+        projector = setup_proj(deepcopy(raw.info), add_eeg_ref=False,
+                               activate=True)[0]
+    start, stop = np.where(time_mask)[0][[0, -1]] + [0, 1]
+    rba = 'NaN' if reject_by_annotation else None
+
+    n_fft, n_per_seg, n_overlap = _check_nfft(stop - start, n_fft, n_per_seg,
+                                              n_overlap)
+    logger.info("Effective window size : %0.3f (s)" % (n_fft / float(sfreq)))
+    freqs = np.arange(n_fft // 2 + 1, dtype=float) * (sfreq / n_fft)
+    freq_mask = (freqs >= fmin) & (freqs <= fmax)
+    if not freq_mask.any():
+        raise ValueError(
+            f'No frequencies found between fmin={fmin} and fmax={fmax}')
+    freq_sl = slice(*(np.where(freq_mask)[0][[0, -1]] + [0, 1]))
+    del freq_mask
+    freqs = freqs[freq_sl]
+
+    # Read whole segments, so that both the data and the spectra of all
+    # frequencies (before selecting freqs) take ~8 MB at a time
+    step = n_per_seg - n_overlap
+    n_segments = (stop - start - n_overlap) // step
+    n_read = max(2 ** 20 // (len(picks) * max(step, n_fft // 2 + 1)), 1)
+    parallel, my_spect_func, n_jobs = parallel_func(_spect_func, n_jobs=n_jobs)
+    func = partial(spectrogram, noverlap=n_overlap, nperseg=n_per_seg,
+                   nfft=n_fft, fs=sfreq)
+    psds = np.zeros((len(picks), len(freqs)))
+    counts = np.zeros((len(picks), len(freqs)), int)
+    for first in range(0, n_segments, n_read):
+        last = min(first + n_read, n_segments)
+        this_start = start + first * step
+        this_stop = start + (last - 1) * step + n_per_seg
+        if projector is None:
+            data = raw.get_data(picks, this_start, this_stop,
+                                reject_by_annotation=rba)
+        else:
+            data = raw.get_data(None, this_start, this_stop,
+                                reject_by_annotation=rba)
+            data = np.dot(projector, data)[picks]
+        spect = np.concatenate(parallel(
+            my_spect_func(d, func=func, freq_sl=freq_sl, average=None)
+            for d in np.array_split(data, n_jobs)))
+        good = np.isfinite(spect)
+        psds += np.where(good, spect, 0.).sum(axis=-1)
+        counts += good.sum(axis=-1)
+    with np.errstate(invalid='ignore'):  # all segments might be bad
+        psds /= counts
+    return psds, freqs
+
+
 @verbose
 def psd_multitaper(inst, fmin=0, fmax=np.inf, tmin=None, tmax=None,
                    bandwidth=None, adaptive=False, low_bias=True,
@@ -2,9 +2,11 @@ from distutils.version import LooseVersion
 
 import numpy as np
 import pytest
-from numpy.testing import assert_array_almost_equal
+from numpy.testing import (assert_array_almost_equal, assert_array_equal,
+                           assert_allclose)
 
 from mne.time_frequency import psd_multitaper
+from mne.time_frequency import multitaper
 from mne.time_frequency.multitaper import dpss_windows
 from mne.utils import requires_nitime
 from mne.io import RawArray
@@ -36,6 +38,59 @@ def test_dpss_windows():
     assert_array_almost_equal(eigs, eigs_ni)
 
 
+def test_dpss_cache(tmpdir, monkeypatch):
+    """Test caching of DPSS windows in memory and on disk."""
+    multitaper._dpss_cache.clear()
+    dpss, eigs = dpss_windows(500, 3., 5)
+    assert (500, 3., 5) in multitaper._dpss_cache
+    dpss[:] = 0.  # returned arrays are copies
+    dpss_2, eigs_2 = dpss_windows(500, 3., 5)
+    assert dpss_2.any()
+    assert_array_equal(eigs, eigs_2)
+    # low_bias selection is applied to the cached windows
+    dpss_all, eigs_all = dpss_windows(500, 3., 5, low_bias=False)
+    assert len(dpss_all) == 5
+    assert_array_equal(dpss_all[eigs_all > 0.9], dpss_2)
+
+    monkeypatch.setenv('MNE_CACHE_DPSS', 'true')
+    monkeypatch.setattr(multitaper, '_get_extra_data_path',
+                        lambda: str(tmpdir))
+    multitaper._dpss_cache.clear()
+    dpss_disk, eigs_disk = dpss_windows(500, 3., 5, low_bias=False)
+    assert tmpdir.join('tables', 'dpss_500_3.0_5.bin').check()
+    multitaper._dpss_cache.clear()
+    dpss_read, eigs_read = dpss_windows(500, 3., 5, low_bias=False)
+    assert_array_equal(dpss_read, dpss_all)
+    assert_array_equal(eigs_read, eigs_all)
+    assert len(tmpdir.join('tables').listdir()) == 1  # no temporary files
+    multitaper._dpss_cache.clear()
+    # entries larger than the cache are computed but not stored
+    monkeypatch.setattr(multitaper._dpss_cache, 'max_bytes', 1000)
+    dpss_big, _ = dpss_windows(1000, 4, 8, low_bias=False)
+    assert dpss_big.shape == (8, 1000)
+    assert len(multitaper._dpss_cache) == 0
+
+
+def test_psd_from_mt_adaptive():
+    """Test that adaptive weights do not depend on the other signals."""
+    rng = np.random.RandomState(0)
+    x = rng.randn(20, 500) * np.linspace(0.5, 3, 20)[:, np.newaxis]
+    x[:5] += 5 * np.sin(0.3 * np.arange(500))  # converge at another rate
+    dpss, eigvals = dpss_windows(500, 4., 7)
+    x_mt, freqs = multitaper._mt_spectra(x, dpss, 1000.)
+    freq_mask = (freqs > 5) & (freqs < 300)
+    psd, weights = multitaper._psd_from_mt_adaptive(
+        x_mt, eigvals, freq_mask, return_weights=True)
+    for ii in range(len(x)):
+        this_psd, this_weights = multitaper._psd_from_mt_adaptive(
+            x_mt[ii:ii + 1], eigvals, freq_mask, return_weights=True)
+        assert_allclose(psd[ii], this_psd[0], rtol=1e-12)
+        assert_allclose(weights[ii], this_weights[0], rtol=1e-12)
+    with pytest.warns(RuntimeWarning, match='did not converge'):
+        multitaper._psd_from_mt_adaptive(x_mt, eigvals, freq_mask,
+                                         max_iter=2)
+
+
 @requires_nitime
 def test_multitaper_psd():
     """Test multi-taper PSD computation."""
@@ -4,7 +4,8 @@ from numpy.testing import assert_array_almost_equal, assert_allclose
 from scipy.signal import welch
 import pytest
 
-from mne import pick_types, Epochs, read_events
+from mne import (pick_types, Epochs, read_events, create_info,
+                 Annotations)
 from mne.io import RawArray, read_raw_fif
 from mne.utils import run_tests_if_main
 from mne.time_frequency import psd_welch, psd_multitaper, psd_array_welch
@@ -32,6 +33,33 @@ def test_psd_nan():
     assert_allclose(psds[0], psds_2)
 
 
+@pytest.mark.parametrize('kwargs', [
+    dict(),
+    dict(n_fft=512, n_overlap=128, fmin=5., fmax=40.),
+    dict(n_fft=512, n_per_seg=300, n_overlap=100, tmin=3.3, tmax=100.1),
+])
+def test_psd_welch_raw_chunks(kwargs):
+    """Test that Raw PSDs read in chunks match the ones of the array."""
+    rng = np.random.RandomState(0)
+    info = create_info(4, 250., 'eeg')
+    raw = RawArray(rng.randn(4, 250 * 200) * 1e-6, info)
+    raw.set_annotations(Annotations([10, 100.3], [5, 2.1], 'bad'))
+    raw.set_eeg_reference(projection=True)
+    for proj, rba in ((False, True), (True, True), (False, False)):
+        psds, freqs = psd_welch(raw, proj=proj, reject_by_annotation=rba,
+                                **kwargs)
+        this_raw = raw.copy().crop(kwargs.get('tmin', 0),
+                                   kwargs.get('tmax', None))
+        if proj:
+            this_raw.apply_proj()
+        data = this_raw.get_data(reject_by_annotation='NaN' if rba else None)
+        array_kwargs = {key: val for key, val in kwargs.items()
+                        if key not in ('tmin', 'tmax')}
+        psds_2, freqs_2 = psd_array_welch(data, 250., **array_kwargs)
+        assert_allclose(freqs, freqs_2)
+        assert_allclose(psds, psds_2, rtol=1e-8)
+
+
 def test_psd():
     """Tests the welch and multitaper PSD."""
     raw = read_raw_fif(raw_fname)
@@ -1,8 +1,10 @@
 import numpy as np
 from scipy import linalg
-from numpy.testing import assert_almost_equal, assert_array_almost_equal
+from numpy.testing import (assert_almost_equal, assert_array_almost_equal,
+                           assert_allclose)
+import pytest
 
-from mne.time_frequency import stft, istft, stftfreq
+from mne.time_frequency import stft, istft, stftfreq, _stft
 from mne.time_frequency._stft import stft_norm2
 
 
@@ -58,3 +60,59 @@ def test_stft():
         X = stft(x, wsize, tstep)
         xp = istft(X, tstep, T)
         assert xp.shape == x.shape
+
+
+def _stft_loop(x, wsize, tstep):
+    """Compute the STFT one frame at a time."""
+    n_signals, T = x.shape
+    n_step = int(np.ceil(T / float(tstep)))
+    win = np.sin(np.arange(.5, wsize + .5) / wsize * np.pi)
+    swin = np.zeros((n_step - 1) * tstep + wsize)
+    for t in range(n_step):
+        swin[t * tstep:t * tstep + wsize] += win ** 2
+    swin = np.sqrt(wsize * swin)
+    xp = np.zeros((n_signals, wsize + (n_step - 1) * tstep))
+    xp[:, (wsize - tstep) // 2: (wsize - tstep) // 2 + T] = x
+    X = np.zeros((n_signals, wsize // 2 + 1, n_step), np.complex128)
+    for t in range(n_step):
+        wwin = win / swin[t * tstep: t * tstep + wsize]
+        frame = xp[:, t * tstep: t * tstep + wsize] * wwin
+        X[:, :, t] = np.fft.fft(frame)[:, :wsize // 2 + 1]
+    return X
+
+
+def _istft_loop(X, tstep, Tx):
+    """Compute the inverse STFT one frame at a time."""
+    n_signals, n_win, n_step = X.shape
+    wsize = 2 * (n_win - 1)
+    T = n_step * tstep
+    win = np.sin(np.arange(.5, wsize + .5) / wsize * np.pi)
+    swin = np.zeros(T + wsize - tstep)
+    for t in range(n_step):
+        swin[t * tstep:t * tstep + wsize] += win ** 2
+    swin = np.sqrt(swin / wsize)
+    x = np.zeros((n_signals, T + wsize - tstep))
+    for t in range(n_step):
+        fframe = np.concatenate(
+            [X[:, :, t], np.conj(X[:, wsize // 2 - 1: 0: -1, t])], axis=1)
+        wwin = win / swin[t * tstep:t * tstep + wsize]
+        x[:, t * tstep: t * tstep + wsize] += np.real(
+            np.conj(np.fft.ifft(fframe)) * wwin)
+    return x[:, (wsize - tstep) // 2: (wsize - tstep) // 2 + T + 1][:, :Tx]
+
+
+@pytest.mark.parametrize('wsize, tstep', [
+    (16, 8), (16, 4), (12, 6), (24, 8), (12, 2),
+])
+@pytest.mark.parametrize('T', [1, 37, 128, 129])
+def test_stft_loop(wsize, tstep, T):
+    """Test stft and istft against the frame by frame computation."""
+    x = np.random.RandomState(0).randn(3, T)
+    _stft._window_cache.clear()
+    for _ in range(2):  # computed, then cached
+        X = stft(x, wsize, tstep)
+        assert_allclose(X, _stft_loop(x, wsize, tstep), rtol=1e-10,
+                        atol=1e-12)
+        assert_allclose(istft(X, tstep, Tx=T), _istft_loop(X, tstep, T),
+                        rtol=1e-10, atol=1e-12)
+        assert len(_stft._window_cache) == 2  # stft and istft
@@ -8,7 +8,8 @@ import os.path as op
 import pytest
 import numpy as np
 from numpy.testing import (assert_array_almost_equal, assert_allclose,
-                           assert_equal, assert_array_less)
+                           assert_equal, assert_array_less,
+                           assert_array_equal)
 
 from scipy import fftpack
 
@@ -17,7 +18,8 @@ from mne.io import read_raw_fif
 from mne.time_frequency._stockwell import (tfr_stockwell, _st,
                                            _precompute_st_windows,
                                            _check_input_st,
-                                           _st_power_itc)
+                                           _st_power_itc,
+                                           _st_power_itc_range)
 
 from mne.time_frequency import AverageTFR, tfr_array_stockwell
 from mne.utils import run_tests_if_main
@@ -62,6 +64,31 @@ def test_stockwell_st_no_zero_pad():
     _st_power_itc(data, 10, True, 0, 1, W)
 
 
+def test_stockwell_chunks():
+    """Test that frequency blocks and jobs do not change the result."""
+    rng = np.random.RandomState(0)
+    data = rng.randn(5, 1, 128)
+    start_f, stop_f, sfreq, width = 3, 40, 100., 1.5
+    W = _precompute_st_windows(128, start_f, stop_f, sfreq, width)
+    psd, itc = _st_power_itc(data[:, 0], start_f, True, 0, 2, W)
+    for max_bytes in (1, 16 * 5 * 128 * 7):
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr('mne.time_frequency._stockwell._st_block_size',
+                       lambda n_epochs, n_samp: max(
+                           max_bytes // (16 * n_epochs * n_samp), 1))
+            psd_2, itc_2 = _st_power_itc_range(data[:, 0], start_f, stop_f,
+                                               sfreq, width, True, 0, 2)
+        assert_allclose(psd_2, psd, rtol=1e-12)
+        assert_allclose(itc_2, itc, rtol=1e-12)
+    # fewer channels than jobs splits the frequencies across jobs
+    psd, itc, freqs = tfr_array_stockwell(data, sfreq, return_itc=True)
+    psd_2, itc_2, freqs_2 = tfr_array_stockwell(data, sfreq, return_itc=True,
+                                                n_jobs=3)
+    assert_allclose(psd_2, psd, rtol=1e-12)
+    assert_allclose(itc_2, itc, rtol=1e-12)
+    assert_array_equal(freqs_2, freqs)
+
+
 def test_stockwell_core():
     """Test stockwell transform."""
     # adapted from
@@ -731,6 +731,84 @@ def test_compute_tfr_correct(method, decim):
     assert freqs[np.argmax(np.abs(tfr).mean(-1))] == f
 
 
+@pytest.mark.parametrize('decim', (1, 3, 4, slice(1, None, 2),
+                                   slice(5, 700, 7)))
+def test_cwt_batched(decim):
+    """Test that the FFT wavelet engine matches direct convolution."""
+    rng = np.random.RandomState(0)
+    X = rng.randn(5, 500)
+    Ws = morlet(1000., np.arange(20, 200, 17), n_cycles=3.)
+    want = cwt(X, Ws, use_fft=False, decim=decim)
+    assert_allclose(cwt(X, Ws, use_fft=True, decim=decim), want,
+                    rtol=1e-7, atol=1e-10)
+    # 'valid' mode does not decimate inside the inverse transform
+    assert_allclose(cwt(X, Ws, use_fft=True, decim=2, mode='valid'),
+                    cwt(X, Ws, use_fft=False, decim=2, mode='valid'),
+                    rtol=1e-7, atol=1e-10)
+
+
+def test_compute_tfr_reductions():
+    """Test the outputs reduced per block of channels against complex."""
+    rng = np.random.RandomState(0)
+    data = rng.randn(6, 3, 400)
+    kwargs = dict(freqs=np.arange(20, 60, 10.), sfreq=500., n_cycles=3.)
+    tfr = _compute_tfr(data, output='complex', **kwargs)
+    power = np.abs(tfr) ** 2
+    itc = np.abs(np.mean(tfr / np.abs(tfr), axis=0))
+    assert_allclose(_compute_tfr(data, output='phase', **kwargs),
+                    np.angle(tfr), rtol=1e-10)
+    assert_allclose(_compute_tfr(data, output='power', **kwargs), power,
+                    rtol=1e-10)
+    assert_allclose(_compute_tfr(data, output='avg_power', **kwargs),
+                    power.mean(axis=0), rtol=1e-10)
+    assert_allclose(_compute_tfr(data, output='itc', **kwargs), itc,
+                    rtol=1e-10)
+    assert_allclose(_compute_tfr(data, output='avg_power_itc', **kwargs),
+                    power.mean(axis=0) + 1j * itc, rtol=1e-10)
+
+
+def test_tfr_dtype_preload(tmpdir):
+    """Test single precision and memory-mapped single-trial TFRs."""
+    rng = np.random.RandomState(0)
+    info = create_info(4, 500., 'eeg')
+    epochs = EpochsArray(rng.randn(12, 4, 500), info)
+    freqs = np.arange(10, 40, 5.)
+    kwargs = dict(freqs=freqs, n_cycles=3., return_itc=False, average=False)
+    power = tfr_morlet(epochs, **kwargs)
+    power_32 = tfr_morlet(epochs, dtype=np.float32, **kwargs)
+    assert power_32.data.dtype == np.float32
+    assert_allclose(power_32.data, power.data, rtol=1e-5)
+    tfr = tfr_morlet(epochs, output='complex', dtype=np.complex64, **kwargs)
+    assert tfr.data.dtype == np.complex64
+    power_mt = tfr_multitaper(epochs, dtype=np.complex64, **kwargs)
+    assert power_mt.data.dtype == np.float32
+    with pytest.raises(ValueError, match='dtype must be'):
+        tfr_morlet(epochs, dtype=int, **kwargs)
+
+    power_mm = tfr_morlet(epochs, preload=str(tmpdir.join('tfr.dat')),
+                          **kwargs)
+    assert isinstance(power_mm.data, np.memmap)
+    assert_allclose(power_mm.data, power.data)
+    assert_allclose(power_mm.average().data, power.average().data)
+    power_mm.apply_baseline((None, 0.1), mode='logratio')
+    power.apply_baseline((None, 0.1), mode='logratio')
+    assert_allclose(power_mm.data, power.data)
+    power_mm.crop(0.1, 0.5, 15, 30)
+    power.crop(0.1, 0.5, 15, 30)
+    assert isinstance(power_mm.data, np.memmap)
+    assert_allclose(power_mm.data, power.data)
+    # copies do not own the file, the output does
+    power_copy = power_mm.copy()
+    del power_copy
+    assert tmpdir.join('tfr.dat').check()
+    del power_mm
+    assert not tmpdir.join('tfr.dat').check()
+    with pytest.raises(ValueError, match='preload must be True'):
+        tfr_morlet(epochs, preload=False, **kwargs)
+    with pytest.raises(TypeError, match='preload must be'):
+        tfr_multitaper(epochs, preload=1, **kwargs)
+
+
 @requires_pandas
 def test_getitem_epochsTFR():
     """Test GetEpochsMixin in the context of EpochsTFR."""
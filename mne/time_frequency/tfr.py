@@ -12,13 +12,14 @@ Morlet code inspired by Matlab code from Sheraz Khan & Brainstorm & SPM
 from copy import deepcopy
 from functools import partial
 from math import sqrt
+import os
 
 import numpy as np
 from scipy import linalg
 
 from .multitaper import dpss_windows
 
-from ..baseline import rescale
+from ..baseline import rescale, _log_rescale
 from ..fixes import fft, ifft
 from ..parallel import parallel_func
 from ..utils import (logger, verbose, _time_mask, _freq_mask, check_fname,
@@ -199,19 +200,39 @@ def _cwt(X, Ws, mode="same", decim=1, use_fft=True):
     out : array, shape (n_signals, n_freqs, n_time_decim)
         The time-frequency transform of the signals.
     """
+    for tfr in _cwt_gen(X, Ws, mode, decim, use_fft):
+        for this_tfr in tfr:
+            yield this_tfr
+
+
+def _cwt_gen(X, Ws, mode="same", decim=1, use_fft=True):
+    """Compute the cwt of blocks of signals at once.
+
+    Same as :func:`_cwt`, but yields arrays of shape
+    (n_signals_block, n_freqs, n_time_decim). With ``use_fft=True`` the
+    spectra of all signals in a block are multiplied by the whole wavelet
+    bank at once. The centering and decimation are folded into the
+    inverse transform: the wavelet spectra are phase-shifted so that the
+    first kept sample is at index zero, and the product spectrum is
+    aliased down to ``n_fft // decim`` bins before the inverse FFT.
+    """
     _check_option('mode', mode, ['same', 'valid', 'full'])
     decim = _check_decim(decim)
     X = np.asarray(X)
 
     # Precompute wavelets for given frequency range to save time
     n_signals, n_times = X.shape
-    n_times_out = X[:, decim].shape[1]
+    time_idx = np.arange(n_times)[decim]
+    n_times_out = len(time_idx)
     n_freqs = len(Ws)
+    # decimation can be done in the inverse transform for 'same'-like output
+    fold = use_fft and mode != 'valid' and decim.step > 0 and n_times_out
+    step = decim.step if fold else 1
 
     Ws_max_size = max(W.size for W in Ws)
     size = n_times + Ws_max_size - 1
-    # Always use 2**n-sized FFT
-    fsize = 2 ** int(np.ceil(np.log2(size)))
+    # Always use 2**n-sized FFT (after decimation)
+    fsize = step * 2 ** int(np.ceil(np.log2(np.ceil(size / step))))
 
     # precompute FFTs of Ws
     if use_fft:
@@ -230,38 +251,58 @@ def _cwt(X, Ws, mode="same", decim=1, use_fft=True):
             else:
                 raise ValueError(msg)
 
-    # Make generator looping across signals
-    tfr = np.zeros((n_freqs, n_times_out), dtype=np.complex128)
-    for x in X:
-        if use_fft:
-            fft_x = fft(x, fsize)
-
-        # Loop across wavelets
-        for ii, W in enumerate(Ws):
-            if use_fft:
-                ret = ifft(fft_x * fft_Ws[ii])[:n_times + W.size - 1]
-            else:
+    if not use_fft:
+        # Loop across signals and wavelets
+        tfr = np.zeros((1, n_freqs, n_times_out), dtype=np.complex128)
+        for x in X:
+            for ii, W in enumerate(Ws):
                 ret = np.convolve(x, W, mode=mode)
-
-            # Center and decimate decomposition
-            if mode == 'valid':
+                # Center and decimate decomposition
+                if mode == 'valid':
+                    sz = int(abs(W.size - n_times)) + 1
+                    offset = (n_times - sz) // 2
+                    this_slice = slice(offset // decim.step,
+                                       (offset + sz) // decim.step)
+                    tfr[0, ii, this_slice] = ret[decim]
+                elif mode == 'full':
+                    start = (W.size - 1) // 2
+                    end = len(ret) - (W.size // 2)
+                    tfr[0, ii, :] = ret[start:end][decim]
+                else:
+                    tfr[0, ii, :] = ret[decim]
+            yield tfr
+        return
+
+    if fold:
+        # Shift each wavelet so that its first kept sample comes first
+        shifts = np.array([(W.size - 1) // 2 for W in Ws]) + time_idx[0]
+        fft_Ws *= np.exp((2j * np.pi / fsize) *
+                         np.outer(shifts, np.arange(fsize)))
+    # Process as many signals at once as fit in ~16 MB of spectra
+    n_block = int(max(min(2 ** 20 // (n_freqs * fsize), n_signals), 1))
+    tfr = np.zeros((n_block, n_freqs, n_times_out), dtype=np.complex128)
+    for start in range(0, n_signals, n_block):
+        x = X[start:start + n_block]
+        this_tfr = tfr[:len(x)]
+        ret = fft(x, fsize)[:, np.newaxis] * fft_Ws
+        if fold:
+            if step > 1:
+                ret = ret.reshape(len(x), n_freqs, step, fsize // step)
+                ret = ret.sum(axis=2)
+                ret /= step
+            this_tfr[:] = ifft(ret)[..., :n_times_out]
+        else:
+            ret = ifft(ret)
+            for ii, W in enumerate(Ws):
                 sz = int(abs(W.size - n_times)) + 1
                 offset = (n_times - sz) // 2
                 this_slice = slice(offset // decim.step,
                                    (offset + sz) // decim.step)
-                if use_fft:
-                    ret = _centered(ret, sz)
-                tfr[ii, this_slice] = ret[decim]
-            elif mode == 'full' and not use_fft:
-                start = (W.size - 1) // 2
-                end = len(ret) - (W.size // 2)
-                ret = ret[start:end]
-                tfr[ii, :] = ret[decim]
-            else:
-                if use_fft:
-                    ret = _centered(ret, n_times)
-                tfr[ii, :] = ret[decim]
-        yield tfr
+                this_ret = _centered(ret[:, ii, :n_times + W.size - 1],
+                                     (len(x), sz))
+                this_tfr[:, ii, this_slice] = this_ret[:, decim]
+        del ret
+        yield this_tfr
 
 
 # Loop of convolution: single trial
@@ -270,7 +311,7 @@ def _cwt(X, Ws, mode="same", decim=1, use_fft=True):
 def _compute_tfr(epoch_data, freqs, sfreq=1.0, method='morlet',
                  n_cycles=7.0, zero_mean=None, time_bandwidth=None,
                  use_fft=True, decim=1, output='complex', n_jobs=1,
-                 verbose=None):
+                 dtype=None, preload=True, verbose=None):
     """Compute time-frequency transforms.
 
     Parameters
@@ -321,6 +362,10 @@ def _compute_tfr(epoch_data, freqs, sfreq=1.0, method='morlet',
     %(n_jobs)s
         The number of epochs to process at the same time. The parallelization
         is implemented across channels.
+    %(tfr_dtype)s
+    preload : True | str
+        If a string, single-trial outputs are written to a memory-mapped
+        file of that name.
     %(verbose)s
 
     Returns
@@ -332,6 +377,7 @@ def _compute_tfr(epoch_data, freqs, sfreq=1.0, method='morlet',
         'avg_power_itc', the real values code for 'avg_power' and the
         imaginary values code for the 'itc': out = avg_power + i * itc
     """
+    from ..io.base import _allocate_data
     # Check data
     epoch_data = np.asarray(epoch_data)
     if epoch_data.ndim != 3:
@@ -342,6 +388,9 @@ def _compute_tfr(epoch_data, freqs, sfreq=1.0, method='morlet',
     freqs, sfreq, zero_mean, n_cycles, time_bandwidth, decim = \
         _check_tfr_param(freqs, sfreq, method, zero_mean, n_cycles,
                          time_bandwidth, use_fft, decim, output)
+    _validate_type(preload, (bool, 'path-like'), 'preload')
+    if preload is False:
+        raise ValueError('preload must be True or a file name, got False')
 
     decim = _check_decim(decim)
     if (freqs > sfreq / 2.).any():
@@ -367,34 +416,50 @@ def _compute_tfr(epoch_data, freqs, sfreq=1.0, method='morlet',
     # Initialize output
     n_freqs = len(freqs)
     n_epochs, n_chans, n_times = epoch_data[:, :, decim].shape
-    if output in ('power', 'phase', 'avg_power', 'itc'):
-        dtype = np.float64
-    elif output in ('complex', 'avg_power_itc'):
-        # avg_power_itc is stored as power + 1i * itc to keep a
-        # simple dimensionality
-        dtype = np.complex128
+    # avg_power_itc is stored as power + 1i * itc to keep a
+    # simple dimensionality
+    dtype = _check_tfr_dtype(dtype, output)
 
-    if ('avg_' in output) or ('itc' in output):
+    average = ('avg_' in output) or ('itc' in output)
+    if average:
         out = np.empty((n_chans, n_freqs, n_times), dtype)
     else:
-        out = np.empty((n_chans, n_epochs, n_freqs, n_times), dtype)
+        out = _allocate_data(preload, (n_epochs, n_chans, n_freqs, n_times),
+                             dtype)
 
     # Parallel computation
-    parallel, my_cwt, _ = parallel_func(_time_frequency_loop, n_jobs)
-
-    # Parallelization is applied across channels.
-    tfrs = parallel(
-        my_cwt(channel, Ws, output, use_fft, 'same', decim)
-        for channel in epoch_data.transpose(1, 0, 2))
+    parallel, my_cwt, n_jobs = parallel_func(_time_frequency_loop, n_jobs)
+
+    # Parallelization is applied across blocks of channels, n_jobs blocks at
+    # a time so that only those are held in memory before being stored
+    n_block = 2 ** 20 // (n_freqs * n_times * (1 if average else n_epochs))
+    n_block = min(max(n_block, 1), -(-n_chans // n_jobs))
+    for start in range(0, n_chans, n_block * n_jobs):
+        idx = range(start, min(start + n_block * n_jobs, n_chans), n_block)
+        tfrs = parallel(
+            my_cwt(epoch_data[:, ci:ci + n_block], Ws, output, use_fft,
+                   'same', decim) for ci in idx)
+        for ci, tfr in zip(idx, tfrs):
+            if average:
+                out[ci:ci + n_block] = tfr
+            else:
+                out[:, ci:ci + n_block] = tfr
+        del tfrs
+    return out
 
-    # FIXME: to avoid overheads we should use np.array_split()
-    for channel_idx, tfr in enumerate(tfrs):
-        out[channel_idx] = tfr
 
-    if ('avg_' not in output) and ('itc' not in output):
-        # This is to enforce that the first dimension is for epochs
-        out = out.transpose(1, 0, 2, 3)
-    return out
+def _check_tfr_dtype(dtype, output):
+    """Get the output dtype of a TFR, with the requested precision."""
+    is_complex = output in ('complex', 'avg_power_itc')
+    if dtype is None:
+        return np.complex128 if is_complex else np.float64
+    dtype = np.dtype(dtype)
+    if dtype in (np.float32, np.complex64):
+        return np.complex64 if is_complex else np.float32
+    elif dtype in (np.float64, np.complex128):
+        return np.complex128 if is_complex else np.float64
+    raise ValueError('dtype must be None, float32, float64, complex64 or '
+                     'complex128, got %s' % (dtype,))
 
 
 def _check_tfr_param(freqs, sfreq, method, zero_mean, n_cycles,
@@ -469,12 +534,12 @@ def _check_tfr_param(freqs, sfreq, method, zero_mean, n_cycles,
 def _time_frequency_loop(X, Ws, output, use_fft, mode, decim):
     """Aux. function to _compute_tfr.
 
-    Loops time-frequency transform across wavelets and epochs.
+    Loops time-frequency transform across wavelets and blocks of signals.
 
     Parameters
     ----------
-    X : array, shape (n_epochs, n_times)
-        The epochs data of a single channel.
+    X : array, shape (n_epochs, n_chans, n_times)
+        The epochs data of a block of channels.
     Ws : list, shape (n_tapers, n_wavelets, n_times)
         The wavelets.
     output : str
@@ -493,6 +558,13 @@ def _time_frequency_loop(X, Ws, output, use_fft, mode, decim):
         See numpy.convolve.
     decim : slice
         The decimation slice: e.g. power[:, decim]
+
+    Returns
+    -------
+    tfrs : array
+        The single trial outputs, of shape
+        (n_epochs, n_chans, n_freqs, n_times), or the average outputs, of
+        shape (n_chans, n_freqs, n_times).
     """
     # Set output type
     dtype = np.float64
@@ -501,51 +573,69 @@ def _time_frequency_loop(X, Ws, output, use_fft, mode, decim):
 
     # Init outputs
     decim = _check_decim(decim)
-    n_epochs, n_times = X[:, decim].shape
+    n_epochs, n_chans, n_times = X[..., decim].shape
     n_freqs = len(Ws[0])
-    if ('avg_' in output) or ('itc' in output):
-        tfrs = np.zeros((n_freqs, n_times), dtype=dtype)
+    average = ('avg_' in output) or ('itc' in output)
+    if average:
+        tfrs = np.zeros((n_chans, n_freqs, n_times), dtype=dtype)
     else:
-        tfrs = np.zeros((n_epochs, n_freqs, n_times), dtype=dtype)
+        tfrs = np.zeros((n_chans * n_epochs, n_freqs, n_times), dtype=dtype)
+    # the signals of all channels are transformed together, channel by
+    # channel so that the epochs of a channel are contiguous
+    X = X.transpose(1, 0, 2).reshape(n_chans * n_epochs, -1)
 
     # Loops across tapers.
     for W in Ws:
-        coefs = _cwt(X, W, mode, decim=decim, use_fft=use_fft)
+        coefs = _cwt_gen(X, W, mode, decim=decim, use_fft=use_fft)
 
         # Inter-trial phase locking is apparently computed per taper...
         if 'itc' in output:
-            plf = np.zeros((n_freqs, n_times), dtype=np.complex128)
-
-        # Loop across epochs
-        for epoch_idx, tfr in enumerate(coefs):
-            # Transform complex values
-            if output in ['power', 'avg_power']:
-                tfr = (tfr * tfr.conj()).real  # power
-            elif output == 'phase':
-                tfr = np.angle(tfr)
-            elif output == 'avg_power_itc':
-                tfr_abs = np.abs(tfr)
-                plf += tfr / tfr_abs  # phase
-                tfr = tfr_abs ** 2  # power
-            elif output == 'itc':
-                plf += tfr / np.abs(tfr)  # phase
-                continue  # not need to stack anything else than plf
-
-            # Stack or add
-            if ('avg_' in output) or ('itc' in output):
-                tfrs += tfr
+            plf = np.zeros((n_chans, n_freqs, n_times), dtype=np.complex128)
+
+        # Loop across blocks of signals, reducing each block in place
+        start = 0
+        buf = None
+        for tfr in coefs:
+            stop = start + len(tfr)
+            if output == 'complex':
+                this_buf = tfr
             else:
-                tfrs[epoch_idx] += tfr
+                if buf is None:
+                    buf = np.empty(tfr.shape)
+                this_buf = buf[:len(tfr)]
+            if output == 'phase':
+                np.arctan2(tfr.imag, tfr.real, out=this_buf)
+            elif output != 'complex':
+                np.abs(tfr, out=this_buf)
+                if 'itc' in output:
+                    tfr /= this_buf  # phase
+                this_buf *= this_buf  # power
+            if not average:
+                tfrs[start:stop] += this_buf
+            else:
+                # sum the epochs of each channel in the block
+                for ci in range(start // n_epochs,
+                                (stop - 1) // n_epochs + 1):
+                    this_idx = slice(max(ci * n_epochs, start) - start,
+                                     min((ci + 1) * n_epochs, stop) - start)
+                    if 'itc' in output:
+                        plf[ci] += tfr[this_idx].sum(axis=0)
+                    if output != 'itc':
+                        tfrs[ci] += this_buf[this_idx].sum(axis=0)
+            start = stop
 
         # Compute inter trial coherence
         if output == 'avg_power_itc':
-            tfrs += 1j * np.abs(plf)
+            tfrs.imag += np.abs(plf)
         elif output == 'itc':
             tfrs += np.abs(plf)
 
     # Normalization of average metrics
-    if ('avg_' in output) or ('itc' in output):
+    if average:
         tfrs /= n_epochs
+    else:
+        tfrs.shape = (n_chans, n_epochs, n_freqs, n_times)
+        tfrs = tfrs.transpose(1, 0, 2, 3)
 
     # Normalization by number of taper
     tfrs /= len(Ws)
@@ -599,7 +689,7 @@ def cwt(X, Ws, use_fft=True, mode='same', decim=1):
 
 
 def _tfr_aux(method, inst, freqs, decim, return_itc, picks, average,
-             output=None, **tfr_params):
+             output=None, preload=True, **tfr_params):
     from ..epochs import BaseEpochs
     """Help reduce redundancy between tfr_morlet and tfr_multitaper."""
     decim = _check_decim(decim)
@@ -623,7 +713,8 @@ def _tfr_aux(method, inst, freqs, decim, return_itc, picks, average,
                              ' with average=False')
 
     out = _compute_tfr(data, freqs, info['sfreq'], method=method,
-                       output=output, decim=decim, **tfr_params)
+                       output=output, decim=decim, preload=preload,
+                       **tfr_params)
     times = inst.times[decim].copy()
     info['sfreq'] /= decim.step
 
@@ -650,6 +741,8 @@ def _tfr_aux(method, inst, freqs, decim, return_itc, picks, average,
 
         out = EpochsTFR(info, power, times, freqs, method='%s-power' % method,
                         events=evs, event_id=ev_id, metadata=meta)
+        if not isinstance(preload, bool):  # we own the memory-mapped file
+            out._memmap_fname = power.filename
 
     return out
 
@@ -657,7 +750,7 @@ def _tfr_aux(method, inst, freqs, decim, return_itc, picks, average,
 @verbose
 def tfr_morlet(inst, freqs, n_cycles, use_fft=False, return_itc=True, decim=1,
                n_jobs=1, picks=None, zero_mean=True, average=True,
-               output='power', verbose=None):
+               output='power', dtype=None, preload=True, verbose=None):
     """Compute Time-Frequency Representation (TFR) using Morlet wavelets.
 
     Parameters
@@ -694,6 +787,8 @@ def tfr_morlet(inst, freqs, n_cycles, use_fft=False, return_itc=True, decim=1,
         average must be False.
 
         .. versionadded:: 0.15.0
+    %(tfr_dtype)s
+    %(tfr_preload)s
     %(verbose)s
 
     Returns
@@ -713,7 +808,8 @@ def tfr_morlet(inst, freqs, n_cycles, use_fft=False, return_itc=True, decim=1,
     mne.time_frequency.tfr_array_stockwell
     """
     tfr_params = dict(n_cycles=n_cycles, n_jobs=n_jobs, use_fft=use_fft,
-                      zero_mean=zero_mean, output=output)
+                      zero_mean=zero_mean, output=output, dtype=dtype,
+                      preload=preload)
     return _tfr_aux('morlet', inst, freqs, decim, return_itc, picks,
                     average, **tfr_params)
 
@@ -795,7 +891,8 @@ def tfr_array_morlet(epoch_data, sfreq, freqs, n_cycles=7.0,
 @verbose
 def tfr_multitaper(inst, freqs, n_cycles, time_bandwidth=4.0,
                    use_fft=True, return_itc=True, decim=1,
-                   n_jobs=1, picks=None, average=True, verbose=None):
+                   n_jobs=1, picks=None, average=True, dtype=None,
+                   preload=True, verbose=None):
     """Compute Time-Frequency Representation (TFR) using DPSS tapers.
 
     Parameters
@@ -829,6 +926,8 @@ def tfr_multitaper(inst, freqs, n_cycles, time_bandwidth=4.0,
     %(n_jobs)s
     %(picks_good_data)s
     %(tfr_average)s
+    %(tfr_dtype)s
+    %(tfr_preload)s
     %(verbose)s
 
     Returns
@@ -852,7 +951,8 @@ def tfr_multitaper(inst, freqs, n_cycles, time_bandwidth=4.0,
     .. versionadded:: 0.9.0
     """
     tfr_params = dict(n_cycles=n_cycles, n_jobs=n_jobs, use_fft=use_fft,
-                      zero_mean=True, time_bandwidth=time_bandwidth)
+                      zero_mean=True, time_bandwidth=time_bandwidth,
+                      dtype=dtype, preload=preload)
     return _tfr_aux('multitaper', inst, freqs, decim, return_itc, picks,
                     average, **tfr_params)
 
@@ -915,6 +1015,10 @@ class _BaseTFR(ContainsMixin, UpdateChannelsMixin, SizeMixin):
         else:
             freq_mask = slice(None)
 
+        if isinstance(self.data, np.memmap):
+            # crop memory-mapped data without loading them
+            time_mask = _mask_to_slice(time_mask)
+            freq_mask = _mask_to_slice(freq_mask)
         self.times = self.times[time_mask]
         self.freqs = self.freqs[freq_mask]
         # Deal with broadcasting (boolean arrays do not broadcast, but indices
@@ -970,7 +1074,14 @@ class _BaseTFR(ContainsMixin, UpdateChannelsMixin, SizeMixin):
         inst : instance of AverageTFR
             The modified instance.
         """  # noqa: E501
-        rescale(self.data, self.times, baseline, mode, copy=False)
+        if self.data.ndim == 4:
+            # one epoch at a time to limit the size of temporaries
+            logger.info(_log_rescale(baseline, mode))
+            for epoch_data in self.data:
+                rescale(epoch_data, self.times, baseline, mode, copy=False,
+                        verbose=False)
+        else:
+            rescale(self.data, self.times, baseline, mode, copy=False)
         return self
 
     def save(self, fname, overwrite=False):
@@ -2048,6 +2159,20 @@ class EpochsTFR(_BaseTFR, GetEpochsMixin):
         self.preload = True
         self.metadata = metadata
 
+    def __del__(self):  # noqa: D105
+        # remove the memory-mapped file written by tfr_morlet/tfr_multitaper,
+        # unless the data are not (a view of) it anymore, e.g. in a copy
+        filename = self.__dict__.get('_memmap_fname')
+        data_filename = getattr(self.__dict__.get('_data'), 'filename', None)
+        if filename is not None and data_filename == filename:
+            # First, close the file out; happens automatically on del
+            del self._data
+            # Now file can be removed
+            try:
+                os.remove(filename)
+            except OSError:
+                pass  # ignore file that no longer exists
+
     def __repr__(self):  # noqa: D105
         s = "time : [%f, %f]" % (self.times[0], self.times[-1])
         s += ", freq : [%f, %f]" % (self.freqs[0], self.freqs[-1])
@@ -2070,7 +2195,10 @@ class EpochsTFR(_BaseTFR, GetEpochsMixin):
         ave : instance of AverageTFR
             The averaged data.
         """
-        data = np.mean(self.data, axis=0)
+        # one channel at a time, in case the data are memory-mapped
+        data = np.empty(self.data.shape[1:], self.data.dtype)
+        for ci in range(len(data)):
+            data[ci] = np.mean(self.data[:, ci], axis=0)
         return AverageTFR(info=self.info.copy(), data=data,
                           times=self.times.copy(), freqs=self.freqs.copy(),
                           nave=self.data.shape[0], method=self.method,
@@ -2177,6 +2305,15 @@ def _centered(arr, newsize):
     return arr[tuple(myslice)]
 
 
+def _mask_to_slice(mask):
+    """Convert a contiguous boolean mask to a slice if possible."""
+    if isinstance(mask, np.ndarray) and mask.dtype == bool:
+        idx = np.where(mask)[0]
+        if len(idx) and (np.diff(idx) == 1).all():
+            mask = slice(idx[0], idx[-1] + 1)
+    return mask
+
+
 def _preproc_tfr(data, times, freqs, tmin, tmax, fmin, fmax, mode,
                  baseline, vmin, vmax, dB, sfreq, copy=None):
     """Aux Function to prepare tfr computation."""
@@ -1440,6 +1440,20 @@ check_disjoint : bool
     sets before clustering. This may lead to faster clustering, especially if
     the second dimension of ``X`` (usually the "time" dimension) is large.
 """
+docdict['clust_shard'] = """
+shard : tuple of int | None
+    If a tuple ``(index, n_shards)``, only run the permutations of shard
+    ``index`` out of ``n_shards`` disjoint shards of the permutations drawn
+    for the given ``seed``, and return a dict with the observed statistics
+    and clusters and the partial ``H0`` instead of the usual outputs. Shards
+    can be computed on different machines, saved with
+    :func:`mne.stats.write_cluster_shard`, and combined with
+    :func:`mne.stats.merge_cluster_shards`, which gives the same results as
+    a single run. Cannot be used with ``step_down_p > 0``. Default is None,
+    which runs all permutations.
+
+    .. versionadded:: 0.21
+"""
 docdict['clust_buffer'] = """
 buffer_size : int | None
     Block size to use when computing test statistics. This can significantly
@@ -1533,6 +1547,27 @@ average : bool, default True
 
     .. versionadded:: 0.13.0
 """
+docdict['tfr_dtype'] = """
+dtype : dtype | None
+    The precision of the output. ``None`` (default) uses double precision.
+    Passing :class:`numpy.float32` or :class:`numpy.complex64` stores the
+    output (real or complex, depending on ``output``) in single precision,
+    which halves its memory footprint.
+
+    .. versionadded:: 0.21
+"""
+docdict['tfr_preload'] = """
+preload : bool | str
+    Only used when ``average=False``. If True (default), the single-trial
+    TFR is held in memory. If a string, it is the file name of a
+    memory-mapped file in which the TFR is written one channel at a time,
+    which requires less memory. `EpochsTFR.average`, `EpochsTFR.crop` and
+    `EpochsTFR.apply_baseline` work on the memory-mapped data without
+    loading it all at once. The file is removed when the returned
+    `EpochsTFR` is deleted. False is not supported.
+
+    .. versionadded:: 0.21
+"""
 
 # Anonymization
 docdict['anonymize_info_parameters'] = """
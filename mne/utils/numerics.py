@@ -4,6 +4,7 @@
 #
 # License: BSD (3-clause)
 
+from collections import OrderedDict
 from contextlib import contextmanager
 import hashlib
 from io import BytesIO, StringIO
@@ -1046,3 +1047,175 @@ class _ReuseCycle(object):
         else:
             loc = np.searchsorted(self.indices, idx)
             self.indices.insert(loc, idx)
+
+
+class _LRUCache(object):
+    """A dict-like cache that keeps only the most recently used entries.
+
+    Keys must be hashable, e.g. the result of :func:`object_hash` for
+    array-valued inputs. If ``max_bytes`` is given, entries are also evicted
+    once their total :func:`object_size` exceeds it, and entries larger than
+    ``max_bytes`` are not stored at all, so callers should keep their own
+    reference to the value they insert.
+    """
+
+    def __init__(self, max_size, max_bytes=None):
+        self.max_size = _ensure_int(max_size, 'max_size')
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._sizes = dict()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        self._data.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        if self.max_bytes is not None:
+            size = object_size(value)
+            if size > self.max_bytes:
+                self._data.pop(key, None)
+                self._sizes.pop(key, None)
+                return
+            self._sizes[key] = size
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size or (
+                self.max_bytes is not None and
+                sum(self._sizes.values()) > self.max_bytes):
+            self._sizes.pop(self._data.popitem(last=False)[0], None)
+
+    def clear(self):
+        self._data.clear()
+        self._sizes.clear()
+
+
+class _MeanAccumulator(object):
+    """Accumulate the mean (and optionally the std) over batches of data.
+
+    The std uses the pairwise update of Chan et al. (1979) for combining
+    the batch variances, which is numerically stable in a single pass.
+    """
+
+    def __init__(self, std=False):
+        self.std = std
+        self.reset()
+
+    def reset(self):
+        """Forget the data seen so far."""
+        self.n = 0
+        self._sum = self._mean = self._m2 = None
+
+    def update(self, data):
+        """Add a batch of shape (n_batch, ...)."""
+        n_batch = len(data)
+        if n_batch == 0:
+            return
+        if self.n == 0:
+            self._sum = data.sum(axis=0)
+        else:
+            if np.iscomplexobj(data) and not np.iscomplexobj(self._sum):
+                self._sum = self._sum.astype(np.complex128)
+            self._sum += data.sum(axis=0)
+        if self.std:
+            mean = data.mean(axis=0)
+            m2 = (np.abs(data - mean) ** 2).sum(axis=0)
+            if self.n == 0:
+                self._mean, self._m2 = mean, m2
+            else:
+                delta = mean - self._mean
+                n_tot = self.n + n_batch
+                self._mean = self._mean + delta * (n_batch / n_tot)
+                self._m2 += m2 + (np.abs(delta) ** 2 *
+                                  (self.n * n_batch / n_tot))
+        self.n += n_batch
+
+    def finalize(self):
+        """Get the mean (or std) of the data seen so far."""
+        if self.std:
+            return np.sqrt(self._m2 / self.n)
+        return self._sum / self.n
+
+
+class _P2Median(object):
+    """Approximate the median over batches of data in bounded memory.
+
+    This applies the P-square algorithm of Jain & Chlamtac (1985)
+    independently to each element, keeping five markers per element.
+    """
+
+    _dn = np.array([0., 0.25, 0.5, 0.75, 1.])
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget the data seen so far."""
+        self.n = 0
+        self._first = list()
+
+    def update(self, data):
+        """Add a batch of shape (n_batch, ...)."""
+        if np.iscomplexobj(data):
+            raise TypeError('The median cannot be computed for complex data')
+        for x in data:  # the algorithm is sequential
+            self._update(np.array(x, float))
+
+    def _update(self, x):
+        self.n += 1
+        if self.n <= 5:
+            self._first.append(x)
+            if self.n == 5:
+                self._q = np.sort(self._first, axis=0)
+                self._pos = np.empty_like(self._q)
+                self._pos.T[:] = np.arange(5.)
+                self._first = None
+            return
+        q, pos = self._q, self._pos
+        np.minimum(q[0], x, out=q[0])
+        np.maximum(q[4], x, out=q[4])
+        # increment the positions of the markers above the cell of x
+        k = (x >= q[1]).astype(int) + (x >= q[2]) + (x >= q[3])
+        for ii in range(1, 5):
+            pos[ii] += k < ii
+        desired = (self.n - 1) * self._dn
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for ii in range(1, 4):
+                d = desired[ii] - pos[ii]
+                up = (d >= 1) & (pos[ii + 1] - pos[ii] > 1)
+                down = (d <= -1) & (pos[ii - 1] - pos[ii] < -1)
+                move = up | down
+                if not move.any():
+                    continue
+                s = up.astype(float) - down
+                # piecewise-parabolic prediction, or linear if not monotonic
+                q_new = q[ii] + s / (pos[ii + 1] - pos[ii - 1]) * (
+                    (pos[ii] - pos[ii - 1] + s) * (q[ii + 1] - q[ii]) /
+                    (pos[ii + 1] - pos[ii]) +
+                    (pos[ii + 1] - pos[ii] - s) * (q[ii] - q[ii - 1]) /
+                    (pos[ii] - pos[ii - 1]))
+                linear = ~((q[ii - 1] < q_new) & (q_new < q[ii + 1]))
+                q_adj = np.where(s > 0, q[ii + 1], q[ii - 1])
+                pos_adj = np.where(s > 0, pos[ii + 1], pos[ii - 1])
+                q_new[linear] = (q[ii] + s * (q_adj - q[ii]) /
+                                 (pos_adj - pos[ii]))[linear]
+                q[ii] = np.where(move, q_new, q[ii])
+                pos[ii] += s
+
+    def finalize(self):
+        """Get the (approximate) median of the data seen so far."""
+        if self.n < 5:
+            return np.median(self._first, axis=0)
+        return self._q[2].copy()
@@ -26,7 +26,7 @@ import matplotlib.pyplot as plt
 
 import mne
 from mne.stats import (spatio_temporal_cluster_test, f_threshold_mway_rm,
-                       f_mway_rm, summarize_clusters_stc)
+                       make_f_mway_rm_stat_fun, summarize_clusters_stc)
 
 from mne.minimum_norm import apply_inverse, read_inverse_operator
 from mne.datasets import sample
@@ -165,8 +165,6 @@ factor_levels = [2, 2]
 # is that the clustering function expects ``stat_fun`` to return a 1-D array.
 # To get clusters for both, you must create a loop.
 effects = 'A:B'
-# Tell the ANOVA not to compute p-values which we don't need for clustering
-return_pvals = False
 
 # a few more convenient bindings
 n_times = X[0].shape[1]
@@ -179,18 +177,15 @@ n_conditions = 4
 # array, necessitated by the clustering procedure. The ANOVA however expects an
 # input array of dimensions: subjects X conditions X observations (optional).
 #
-# The following function catches the list input and swaps the first and the
-# second dimension, and finally calls ANOVA.
+# :func:`mne.stats.make_f_mway_rm_stat_fun` returns a function that catches
+# the list input, sets up the contrasts of the ANOVA once, and computes only
+# the F-values, which is all the clustering function needs.
 #
 # .. note:: For further details on this ANOVA function consider the
 #           corresponding
 #           :ref:`time-frequency tutorial <tut-timefreq-twoway-anova>`.
 
-
-def stat_fun(*args):
-    # get f-values only.
-    return f_mway_rm(np.swapaxes(args, 1, 0), factor_levels=factor_levels,
-                     effects=effects, return_pvals=return_pvals)[0]
+stat_fun = make_f_mway_rm_stat_fun(factor_levels, effects)
 
 
 ###############################################################################
@@ -31,7 +31,8 @@ import matplotlib.pyplot as plt
 
 import mne
 from mne.time_frequency import tfr_morlet
-from mne.stats import f_threshold_mway_rm, f_mway_rm, fdr_correction
+from mne.stats import (f_threshold_mway_rm, f_mway_rm, fdr_correction,
+                       make_f_mway_rm_stat_fun)
 from mne.datasets import sample
 
 print(__doc__)
@@ -180,16 +181,12 @@ effects = 'A:B'
 # Inside the clustering function each condition will be passed as flattened
 # array, necessitated by the clustering procedure. The ANOVA however expects an
 # input array of dimensions: subjects X conditions X observations (optional).
-# The following function catches the list input and swaps the first and
-# the second dimension and finally calls the ANOVA function.
+# :func:`mne.stats.make_f_mway_rm_stat_fun` returns a function that catches
+# the list input and computes the F-values of the ANOVA, with the contrasts
+# set up only once for all permutations.
 
+stat_fun = make_f_mway_rm_stat_fun(factor_levels, effects)
 
-def stat_fun(*args):
-    return f_mway_rm(np.swapaxes(args, 1, 0), factor_levels=factor_levels,
-                     effects=effects, return_pvals=False)[0]
-
-
-# The ANOVA returns a tuple f-values and p-values, we will pick the former.
 pthresh = 0.001  # set threshold rather high to save some time
 f_thresh = f_threshold_mway_rm(n_replications, factor_levels, effects,
                                pthresh)